@@ -7,11 +7,21 @@ import json
 import os
 import sys
 import time
+from collections import deque
 from vosk import Model, KaldiRecognizer
 
 # Ruta al modelo de voz (cambia esto según tu sistema)
 VOSK_MODEL_PATH = "modelos/vosk-es"
 
+# Palabra de activación y energía mínima (RMS) para considerar que hay voz
+PALABRA_CLAVE = "jarvis"
+UMBRAL_ENERGIA = 300
+
+# Conversación con Gemma: historial de la sesión acotado por un presupuesto de tokens
+MENSAJE_SISTEMA = {"role": "system", "content": "Actuá como un asistente argentino muy piola, con respuestas naturales y empáticas."}
+PRESUPUESTO_TOKENS = 1500
+historial = deque()
+
 # Inicializamos Text to Speech con acento argentino
 engine = pyttsx3.init()
 engine.setProperty('rate', 160)  # velocidad
@@ -30,6 +40,8 @@ if not os.path.exists(VOSK_MODEL_PATH):
 
 model = Model(VOSK_MODEL_PATH)
 rec = KaldiRecognizer(model, 16000)
+# Reconocedor liviano que solo conoce la palabra clave: es el único que corre en reposo
+rec_clave = KaldiRecognizer(model, 16000, json.dumps([PALABRA_CLAVE, "[unk]"]))
 q = queue.Queue()
 
 def callback(indata, frames, time, status):
@@ -37,60 +49,108 @@ def callback(indata, frames, time, status):
         print(status, file=sys.stderr)
     q.put(bytes(indata))
 
+def vaciar_cola():
+    while not q.empty():
+        q.get_nowait()
+
+def hay_voz(bloque):
+    muestras = np.frombuffer(bloque, dtype=np.int16).astype(np.float32)
+    return muestras.size > 0 and np.sqrt(np.mean(muestras * muestras)) >= UMBRAL_ENERGIA
+
+def esperar_activacion():
+    print(f"💤 Decí '{PALABRA_CLAVE}' cuando me necesites...")
+    previos = deque(maxlen=3)  # audio justo antes de la voz, para no cortar la palabra
+    silencio = 0
+    while True:
+        bloque = q.get()
+        silencio = 0 if hay_voz(bloque) else silencio + 1
+        if silencio > 5:
+            previos.append(bloque)
+            continue
+
+        bloques = list(previos) + [bloque]
+        previos.clear()
+        for pendiente in bloques:
+            if rec_clave.AcceptWaveform(pendiente):
+                texto = json.loads(rec_clave.Result()).get("text", "")
+            else:
+                texto = json.loads(rec_clave.PartialResult()).get("partial", "")
+            if PALABRA_CLAVE in texto.split():
+                rec_clave.Reset()
+                # Lo que quedó en la cola pertenece a la palabra clave, no a la pregunta
+                vaciar_cola()
+                return
+
 def escuchar_microfono(timeout=15):
     print("🎤 Esperando tu pregunta (tomate tu tiempo)...")
-    with sd.RawInputStream(samplerate=16000, blocksize=8000, dtype='int16',
-                           channels=1, callback=callback):
-        data = bytes()
-        start_time = time.time()
+    limite = time.time() + timeout
 
-        while True:
-            if time.time() - start_time > timeout:
-                print("⏱️ Tiempo de escucha agotado.")
-                break
-            try:
-                data += q.get(timeout=timeout)
-                if rec.AcceptWaveform(data):
-                    result = json.loads(rec.Result())
-                    texto = result.get("text", "")
-                    if texto:
-                        print(f"🗣️ Dijiste: {texto}")
-                        return texto
-            except queue.Empty:
-                pass
+    while True:
+        restante = limite - time.time()
+        if restante <= 0:
+            print("⏱️ Tiempo de escucha agotado.")
+            break
+        try:
+            # Cada bloque se le pasa una sola vez al reconocedor, que decodifica de forma incremental
+            if rec.AcceptWaveform(q.get(timeout=restante)):
+                result = json.loads(rec.Result())
+                texto = result.get("text", "")
+                if texto:
+                    print(f"🗣️ Dijiste: {texto}")
+                    return texto
+        except queue.Empty:
+            pass
+    rec.Reset()
     return ""
 
 def responder_voz(texto):
     print(f"🤖 Jarvis dice: {texto}")
     engine.say(texto)
     engine.runAndWait()
+    # El micrófono sigue abierto: se descarta lo que grabó mientras hablaba
+    vaciar_cola()
+
+def recortar_historial():
+    """Descarta los turnos más viejos hasta entrar en el presupuesto (~4 caracteres por token)"""
+    while len(historial) > 1 and sum(len(m["content"]) for m in historial) // 4 > PRESUPUESTO_TOKENS:
+        historial.popleft()
+        if historial and historial[0]["role"] == "assistant":
+            historial.popleft()
 
 def responder_con_gemma(prompt):
     print("🧠 Pensando con Gemma...")
+    historial.append({"role": "user", "content": prompt})
+    recortar_historial()
+    # El mensaje de sistema es siempre el mismo objeto y va primero: el prefijo no cambia
+    # entre consultas y Ollama reutiliza lo ya procesado en vez de repetir todo el prompt
     respuesta = ollama.chat(
         model="gemma:2b",
-        messages=[
-            {"role": "system", "content": "Actuá como un asistente argentino muy piola, con respuestas naturales y empáticas."},
-            {"role": "user", "content": prompt}
-        ]
+        messages=[MENSAJE_SISTEMA, *historial],
+        keep_alive="30m"
     )
-    return respuesta['message']['content']
+    texto = respuesta['message']['content']
+    historial.append({"role": "assistant", "content": texto})
+    return texto
 
 def main():
     print("🧠 JARVIS ARG comenzando...\nDecí algo cuando estés listo (tarda más en escucharte).")
 
-    while True:
-        texto_usuario = escuchar_microfono(timeout=20)
-        if not texto_usuario:
-            responder_voz("No te entendí, ¿podés repetir más claro?")
-            continue
+    # Un único flujo de entrada durante toda la sesión, en vez de abrir el dispositivo por pregunta
+    with sd.RawInputStream(samplerate=16000, blocksize=1600, dtype='int16',
+                           channels=1, callback=callback):
+        while True:
+            esperar_activacion()
+            texto_usuario = escuchar_microfono(timeout=20)
+            if not texto_usuario:
+                responder_voz("No te entendí, ¿podés repetir más claro?")
+                continue
 
-        if "salir" in texto_usuario.lower():
-            responder_voz("Listo, nos vemos, maestro.")
-            break
+            if "salir" in texto_usuario.lower():
+                responder_voz("Listo, nos vemos, maestro.")
+                break
 
-        respuesta = responder_con_gemma(texto_usuario)
-        responder_voz(respuesta)
+            respuesta = responder_con_gemma(texto_usuario)
+            responder_voz(respuesta)
 
 if __name__ == "__main__":
     main()
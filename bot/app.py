@@ -1,30 +1,88 @@
+import io
 import os
-import time
+import re
+import hashlib
+import threading
 import pygame
 import speech_recognition as sr
 from gtts import gTTS
 import webbrowser
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from inference import InferenceWorker
+from shared import Metrics, StartupProfiler
+from playback import Speaker
+from renderer import Renderer, load_eye_animations
 
-# Configuración inicial
-pygame.init()
-screen = pygame.display.set_mode((800, 400))
-pygame.display.set_caption("DeepSeek R1 Assistant")
+# Perfil de arranque: tiempo de import e inicialización por componente (el mismo que Jarvis)
+profiler = StartupProfiler()
 
-# Cargar imágenes de los ojos (ajusta las rutas según tu estructura)
-def load_eye_assets():
-    return {
-        "normal": pygame.image.load("static/ojos_normal.png").convert_alpha(),
-        "buscar": pygame.image.load("static/ojos_buscar.png").convert_alpha(),
-        "hablar": pygame.image.load("static/ojos_hablar.png").convert_alpha(),
-    }
+def report_startup(milestone):
+    profiler.mark(milestone)
+    profiler.report()
 
-eyes = load_eye_assets()
-current_eye_state = "normal"
+# Tramos y latencias por etapa (DEEPSEEK_METRICS=1): traza JSONL y /metrics en localhost
+metrics = Metrics(
+    enabled=os.environ.get("DEEPSEEK_METRICS") == "1",
+    trace_path="deepseek_trace.jsonl",
+    prefix="deepseek"
+)
 
-# Cargar modelo DeepSeek R1 (asegúrate de tener el modelo en /models)
-tokenizer = AutoTokenizer.from_pretrained("models/deepseek-r1")
-model = AutoModelForCausalLM.from_pretrained("models/deepseek-r1")
+renderer = None
+
+# Configuración inicial: la ventana se abre primero, sin esperar al modelo
+def init_display():
+    global renderer
+    with profiler.measure("ventana pygame"):
+        # gTTS genera mp3 mono a 24 kHz: el mezclador se abre igual y no remuestrea
+        pygame.mixer.pre_init(frequency=24000, channels=1)
+        pygame.init()
+        screen = pygame.display.set_mode((800, 400))
+        pygame.display.set_caption("DeepSeek R1 Assistant")
+    # Cuadros de los ojos (ajusta las rutas según tu estructura): static/ojos_<estado>_<n>.png
+    with profiler.measure("imágenes de los ojos"):
+        eyes = load_eye_animations("static")
+    # F3 (o DEEPSEEK_OVERLAY=1) muestra los tiempos de cuadro
+    renderer = Renderer(screen, eyes, fps=60, overlay=os.environ.get("DEEPSEEK_OVERLAY") == "1")
+
+def set_eye_state(state):
+    """Cambia la animación desde cualquier hilo; la ventana la aplica en su próximo cuadro"""
+    if renderer is not None:
+        renderer.post_state(state)
+
+# Estado de los ojos cuando no suena nada ("buscar" mientras se genera un resumen)
+resting_eye_state = "normal"
+
+def set_resting_eye_state(state):
+    global resting_eye_state
+    resting_eye_state = state
+    if not speaker.current:
+        set_eye_state(state)
+
+# Modelo DeepSeek R1 (asegúrate de tener el modelo en /models): carga y genera en su propio hilo
+inference = InferenceWorker(
+    "models/deepseek-r1",
+    max_new_tokens=96,
+    timed=profiler.measure,
+    on_ready=lambda worker: report_startup("modelo listo" if worker.available else "sin modelo")
+)
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+def stream_sentences(pieces):
+    """Agrupa el texto que va generando el modelo en oraciones; omite el razonamiento <think>"""
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        if buffer.lstrip().startswith("<think>"):
+            if "</think>" not in buffer:
+                continue
+            buffer = buffer.split("</think>", 1)[1]
+        parts = SENTENCE_END.split(buffer)
+        for sentence in parts[:-1]:
+            if sentence.strip():
+                yield sentence.strip()
+        buffer = parts[-1]
+    if buffer.strip() and not buffer.lstrip().startswith("<think>"):
+        yield buffer.strip()
 
 # Reconocimiento de voz
 def listen():
@@ -35,75 +93,166 @@ def listen():
         audio = recognizer.listen(source, timeout=5)
         
         try:
-            text = recognizer.recognize_google(audio, language="es-ES").lower()
+            with metrics.span("asr"):
+                text = recognizer.recognize_google(audio, language="es-ES").lower()
             print(f"Usuario: {text}")
             return text
         except sr.UnknownValueError:
+            metrics.count("asr_sin_texto")
             print("No te entendí.")
             return ""
         except sr.RequestError:
+            metrics.count("asr_errores")
             print("Error en el servicio de voz.")
             return ""
 
-# Síntesis de voz
-def speak(text):
-    global current_eye_state
-    current_eye_state = "hablar"
-    tts = gTTS(text=text, lang="es", slow=False)
-    tts.save("response.mp3")
-    os.system("start response.mp3" if os.name == 'nt' else "afplay response.mp3")
-    time.sleep(len(text) * 0.05)  # Ajusta según la duración del audio
-    current_eye_state = "normal"
+# Caché de audio: cada frase se sintetiza con gTTS una sola vez
+AUDIO_CACHE_DIR = "audio_cache"
+AUDIO_CACHE_MAX_BYTES = 50 * 1024 * 1024
+FIXED_PHRASES = ["¿En qué puedo ayudarte?", "Hasta luego. Desconectando.", "No entendí el comando."]
+_audio_cache_lock = threading.Lock()
+
+def tts_path(text, lang="es", slow=False):
+    """Ruta del mp3 de la frase, direccionada por contenido (texto + idioma + velocidad)"""
+    key = hashlib.sha1(f"{lang}|{slow}|{text}".encode("utf-8")).hexdigest()
+    return os.path.join(AUDIO_CACHE_DIR, key + ".mp3")
+
+def synthesize(text, lang="es", slow=False):
+    """mp3 de la frase en memoria: de la caché o recién sintetizado (y guardado para la próxima)"""
+    path = tts_path(text, lang, slow)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)  # el mtime marca el último uso para el desalojo
+        return data
+    except FileNotFoundError:
+        pass
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=lang, slow=slow).write_to_fp(buffer)
+    data = buffer.getvalue()
+    with _audio_cache_lock:
+        os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        evict_audio_cache()
+    return data
+
+def evict_audio_cache():
+    """Borra los mp3 menos usados si la caché supera su tamaño máximo"""
+    files = [entry for entry in os.scandir(AUDIO_CACHE_DIR) if entry.name.endswith(".mp3")]
+    total = sum(entry.stat().st_size for entry in files)
+    for entry in sorted(files, key=lambda e: e.stat().st_mtime):
+        if total <= AUDIO_CACHE_MAX_BYTES:
+            break
+        total -= entry.stat().st_size
+        os.remove(entry.path)
+
+def prerender_phrases():
+    for phrase in FIXED_PHRASES:
+        try:
+            synthesize(phrase)
+        except Exception as e:
+            print(f"No se pudo pre-sintetizar '{phrase}': {e}")
+
+# Síntesis de voz: se reproduce dentro del proceso y los ojos siguen al audio real
+speaker = Speaker(
+    synthesize,
+    on_start=lambda utterance: set_eye_state("hablar"),
+    on_idle=lambda: set_eye_state(resting_eye_state),
+    metrics=metrics
+)
+
+def speak(text, wait=True):
+    """Dice la frase; con wait=False vuelve enseguida y la siguiente se sintetiza mientras suena esta"""
+    utterance = speaker.say(text)
+    if wait:
+        utterance.wait()
+    return utterance
 
 # Búsqueda web + resumen con R1
 def search_and_summarize(query):
-    global current_eye_state
-    current_eye_state = "buscar"
+    set_resting_eye_state("buscar")
     
     # Abrir búsqueda en Google
-    webbrowser.open(f"https://www.google.com/search?q={query}")
-    
-    # Generar resumen con DeepSeek R1
-    input_ids = tokenizer.encode(f"Resume brevemente: {query}", return_tensors="pt")
-    output = model.generate(input_ids, max_length=150)
-    summary = tokenizer.decode(output[0], skip_special_tokens=True)
-    
-    speak(f"Según mi búsqueda: {summary}")
-    current_eye_state = "normal"
+    with metrics.span("web.busqueda"):
+        webbrowser.open(f"https://www.google.com/search?q={query}")
+
+    if not inference.available:
+        # Todavía cargando (o no se pudo cargar): queda la búsqueda abierta, sin resumen
+        speak("Te abrí la búsqueda. Todavía estoy cargando el modelo para resumirla." if not inference.ready.is_set()
+              else "Te abrí la búsqueda, pero no pude cargar el modelo para resumirla.")
+        set_resting_eye_state("normal")
+        return
+
+    # Resumen con DeepSeek R1: cada oración se encola apenas el modelo la termina; se
+    # sintetiza mientras suena la anterior y el modelo sigue generando en paralelo
+    span = metrics.start("llm")
+    request = inference.submit(query)
+    try:
+        for i, sentence in enumerate(stream_sentences(request)):
+            if i == 0:
+                span.mark("primera_oracion")
+            speak(f"Según mi búsqueda: {sentence}" if i == 0 else sentence, wait=False)
+    except Exception as e:
+        print(f"Error al generar el resumen: {e}")
+        metrics.count("llm_errores")
+        span.set(error=type(e).__name__)
+        speak("No pude resumir la búsqueda.", wait=False)
+    metrics.observe("llm.cola", request.queue_time)
+    metrics.observe("llm.ttft", request.first_token_latency)
+    metrics.observe("llm.total", request.elapsed)
+    span.set(tokens=request.tokens, lote=request.batch_size).end()
+    set_resting_eye_state("normal")
+    # No se vuelve a escuchar hasta que termine de hablar
+    speaker.wait_idle()
+
+# Escucha y comandos: corren en su propio hilo para que la ventana nunca se congele
+def assistant_loop(stop):
+    while not stop.is_set():
+        try:
+            handle_command(listen(), stop)
+        except sr.WaitTimeoutError:
+            # Nadie habló dentro del tiempo de espera: se vuelve a escuchar
+            metrics.count("escucha_timeouts")
+            continue
+
+def handle_command(command, stop):
+    if "deepseek" not in command:
+        return
+    with metrics.span("turno"):
+        # speak() vuelve cuando el audio terminó de verdad: ya no hace falta una pausa fija
+        speak("¿En qué puedo ayudarte?")
+        new_command = listen()
+
+        if "busca" in new_command:
+            query = new_command.replace("busca", "").strip()
+            if query:
+                search_and_summarize(query)
+        elif "adiós" in new_command:
+            speak("Hasta luego. Desconectando.")
+            stop.set()
+        else:
+            speak("No entendí el comando.")
 
 # Bucle principal
 def main():
-    global current_eye_state
-    running = True
-    
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-        
-        # Dibujar ojos según el estado actual
-        screen.fill((0, 0, 0))
-        screen.blit(eyes[current_eye_state], (300, 100))
-        pygame.display.flip()
-        
-        # Escuchar comandos
-        command = listen()
-        
-        if "deepseek" in command:
-            speak("¿En qué puedo ayudarte?")
-            time.sleep(1)
-            new_command = listen()
-            
-            if "busca" in new_command:
-                query = new_command.replace("busca", "").strip()
-                if query:
-                    search_and_summarize(query)
-            elif "adiós" in new_command:
-                speak("Hasta luego. Desconectando.")
-                running = False
-            else:
-                speak("No entendí el comando.")
-    
+    stop = threading.Event()
+    init_display()
+    if metrics.enabled:
+        metrics.serve(int(os.environ.get("DEEPSEEK_METRICS_PORT", 9465)))
+    speaker.start()
+    inference.start()
+    threading.Thread(target=prerender_phrases, daemon=True).start()
+    threading.Thread(target=assistant_loop, args=(stop,), daemon=True).start()
+    report_startup("ventana lista")
+
+    # La ventana tiene su propio bucle a 60 fps; los demás hilos solo le mandan estados
+    renderer.run(stop)
+
+    inference.stop()
+    speaker.stop()
+    metrics.close()
     pygame.quit()
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+"""Micro-lotes en InferenceWorker: rendimiento y latencia según el tamaño máximo del lote.
+
+Con el mismo modelo diminuto de bench_inference (pesos aleatorios, sin descargas) se
+mandan varios pedidos a la vez y se varía `max_batch` de 1 (de a uno, como antes) a 16.
+Se informa tokens por segundo en total, pedidos por segundo y percentiles de la latencia
+al primer token y del pedido completo. También se verifica que en float32 el texto de
+cada pedido sea el mismo con lote que sin lote (el relleno no cambia el resultado); en
+int8 puede variar, porque la cuantización dinámica calcula la escala de las activaciones
+para todo el lote.
+Uso (desde bot/): python benchmarks/bench_batching.py [--pedidos 16] [--tokens 48]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_inference import QUERIES, build_tiny_model
+from inference import InferenceWorker
+
+BATCH_SIZES = (1, 2, 4, 8, 16)
+EXTRA = ["la historia", "el clima", "cómo funciona un motor", "la computación en madrid",
+         "motor eléctrico y clima", "historia del clima en madrid"]
+
+
+def run(path, max_batch, queries, max_new_tokens, quantize):
+    worker = InferenceWorker(path, max_new_tokens=max_new_tokens, quantize=quantize, max_batch=max_batch,
+                             batch_window=0.005).start()
+    worker.ready.wait()
+    "".join(worker.submit(queries[0], max_new_tokens=4))  # calentamiento
+    requests = [worker.submit(query) for query in queries]
+    texts = ["".join(request) for request in requests]
+    worker.stop()
+    first_submitted = min(request.submitted for request in requests)
+    wall = max(request.submitted + request.elapsed for request in requests) - first_submitted
+    return requests, texts, wall
+
+
+def report(max_batch, requests, wall):
+    tokens = sum(request.tokens for request in requests)
+    ttft = np.array([request.first_token_latency for request in requests]) * 1000
+    total = np.array([request.elapsed for request in requests]) * 1000
+    batches = sorted({request.batch_size for request in requests})
+    print(f"  {max_batch:>5} {str(batches):>12} {tokens / wall:9.1f} {len(requests) / wall:8.2f} "
+          f"{np.percentile(ttft, 50):8.0f} {np.percentile(ttft, 95):8.0f} "
+          f"{np.percentile(total, 50):8.0f} {np.percentile(total, 95):8.0f}")
+    return tokens / wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pedidos", type=int, default=16, help="pedidos simultáneos")
+    parser.add_argument("--tokens", type=int, default=48, help="max_new_tokens por pedido")
+    args = parser.parse_args()
+    pool = QUERIES + EXTRA
+    queries = [pool[i % len(pool)] for i in range(args.pedidos)]
+
+    with tempfile.TemporaryDirectory() as path:
+        build_tiny_model(path)
+        print(f"{args.pedidos} pedidos a la vez, {args.tokens} tokens cada uno, {torch.get_num_threads()} hilos de torch")
+        for quantize in (True, False):
+            print(f"\n{'int8' if quantize else 'float32'}:")
+            print(f"  {'lote':>5} {'lotes reales':>12} {'tokens/s':>9} {'pedidos/s':>8} "
+                  f"{'1er p50':>8} {'1er p95':>8} {'tot p50':>8} {'tot p95':>8}")
+            results = {}
+            for max_batch in BATCH_SIZES:
+                requests, texts, wall = run(path, max_batch, queries, args.tokens, quantize)
+                results[max_batch] = (report(max_batch, requests, wall), texts)
+            baseline, reference = results[1]
+            best = max(results, key=lambda size: results[size][0])
+            same = sum(a == b for a, b in zip(results[best][1], reference))
+            print(f"  (ms; mejor lote {best}: {results[best][0] / baseline:.1f}x los tokens/s de a uno; "
+                  f"{same}/{len(reference)} textos idénticos a los generados de a uno)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Generación en CPU: model.generate anterior vs. InferenceWorker, con un modelo diminuto local.
+
+El modelo (tipo Llama, pesos aleatorios) y su tokenizador se arman al vuelo y se guardan
+en un directorio temporal, así no hace falta descargar nada. Se mide la latencia al primer
+token, los tokens por segundo y la pausa más larga de un bucle de 60 fps en el hilo
+principal mientras se genera (lo que se congelaría la ventana).
+Uso (desde bot/): python benchmarks/bench_inference.py
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import torch
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import AutoModelForCausalLM, AutoTokenizer, LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import InferenceWorker
+
+QUERIES = ["el clima en madrid", "la historia de la computación", "cómo funciona un motor eléctrico"]
+MAX_NEW_TOKENS = 96
+WORDS = ("resume brevemente : el la de en que y a los se del las un por con no una su para es al lo como "
+         "más pero sus le ya o este sí porque esta entre cuando muy sin sobre también me hasta hay donde "
+         "clima madrid historia computación cómo funciona motor eléctrico").split()
+
+
+def build_tiny_model(path):
+    vocab = {"[UNK]": 0, "<s>": 1, "</s>": 2}
+    for word in WORDS + [f"palabra{i}" for i in range(4000)]:
+        vocab.setdefault(word, len(vocab))
+    backend = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    backend.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    tokenizer = PreTrainedTokenizerFast(tokenizer_object=backend, unk_token="[UNK]", bos_token="<s>",
+                                        eos_token="</s>")
+    tokenizer.save_pretrained(path)
+
+    torch.manual_seed(0)
+    config = LlamaConfig(vocab_size=len(vocab), hidden_size=512, intermediate_size=1408, num_hidden_layers=6,
+                         num_attention_heads=8, num_key_value_heads=8, max_position_embeddings=512)
+    model = LlamaForCausalLM(config)
+    # Con pesos aleatorios el fin de secuencia llega al azar: se genera siempre la longitud pedida
+    model.generation_config.eos_token_id = None
+    model.save_pretrained(path)
+
+
+def main_thread_pause(work):
+    """Corre `work` en otro hilo y mide la pausa más larga de un bucle a 60 fps en este"""
+    done = threading.Event()
+    result = {}
+    threading.Thread(target=lambda: (result.update(value=work()), done.set()), daemon=True).start()
+    longest = 0.0
+    last = time.perf_counter()
+    while not done.is_set():
+        time.sleep(1 / 60)
+        now = time.perf_counter()
+        longest = max(longest, now - last)
+        last = now
+    return result["value"], longest
+
+
+def legacy(path):
+    """Comportamiento anterior: float32, sin inference_mode, max_length y sin streaming"""
+    tokenizer = AutoTokenizer.from_pretrained(path)
+    model = AutoModelForCausalLM.from_pretrained(path)
+    samples = []
+    for query in QUERIES:
+        input_ids = tokenizer.encode(f"Resume brevemente: {query}", return_tensors="pt")
+        start = time.perf_counter()
+        output = model.generate(input_ids, max_length=150, pad_token_id=tokenizer.eos_token_id)
+        elapsed = time.perf_counter() - start
+        # Sin streaming, el primer token recién está disponible al final
+        samples.append((elapsed, elapsed, output.shape[1] - input_ids.shape[1]))
+    return samples
+
+
+def worker(path, **options):
+    inference = InferenceWorker(path, max_new_tokens=MAX_NEW_TOKENS, **options).start()
+    inference.ready.wait()
+    samples = []
+    for query in QUERIES:
+        request = inference.submit(query)
+        "".join(request)
+        samples.append((request.first_token_latency, request.elapsed, request.tokens))
+    inference.stop()
+    return samples
+
+
+def report(name, samples, pause):
+    first = sorted(s[0] for s in samples)[len(samples) // 2]
+    tokens_per_s = sum(s[2] for s in samples) / sum(s[1] for s in samples)
+    print(f"{name:<34} primer token {first * 1000:7.0f} ms | {tokens_per_s:6.1f} tokens/s | "
+          f"pausa máx. del hilo principal {pause * 1000:6.0f} ms")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as path:
+        build_tiny_model(path)
+        print(f"Modelo diminuto: {sum(p.numel() for p in LlamaForCausalLM.from_pretrained(path).parameters()) / 1e6:.1f} M "
+              f"parámetros, {torch.get_num_threads()} hilos de torch por defecto")
+        samples = legacy(path)
+        # Antes generaba en el hilo de la ventana: cada resumen la congelaba entero
+        report("anterior (en el hilo principal)", samples, max(s[1] for s in samples))
+        report("InferenceWorker float32", *main_thread_pause(lambda: worker(path, quantize=False)))
+        report("InferenceWorker int8", *main_thread_pause(lambda: worker(path)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""speak() anterior (sintetizar, lanzar el reproductor y dormir len(texto)*0.05) vs. Speaker.
+
+Sin red ni placa de sonido: la síntesis se simula con una espera (la ida y vuelta de gTTS)
+y un wav en memoria de duración realista; el audio sale por SDL_AUDIODRIVER=dummy, que lo
+consume a velocidad real. Se mide el tiempo total de un resumen de varias oraciones, el
+silencio entre oraciones y el error entre lo que los ojos muestran "hablar" y lo que
+realmente suena.
+Uso (desde bot/): python benchmarks/bench_playback.py
+"""
+import io
+import os
+import sys
+import time
+import wave
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playback import Speaker
+
+RATE = 24000
+SYNTH_LATENCY = 0.35  # ida y vuelta típica de gTTS
+SECONDS_PER_CHAR = 0.065  # voz en español de gTTS, aprox.
+SENTENCES = [
+    "Según mi búsqueda: el clima en Madrid será soleado.",
+    "Las máximas rondarán los veinte grados.",
+    "Por la noche refresca bastante.",
+    "No se esperan lluvias hasta el fin de semana.",
+]
+
+
+def fake_synthesize(text):
+    """Como gTTS: espera la respuesta y devuelve el audio codificado en bytes"""
+    time.sleep(SYNTH_LATENCY)
+    samples = np.arange(int(len(text) * SECONDS_PER_CHAR * RATE))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes((np.sin(samples * 0.06) * 6000).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def legacy():
+    """Comportamiento anterior: cada oración espera su síntesis y una duración adivinada.
+
+    El reproductor externo no bloqueaba, así que el audio real se superponía con la
+    síntesis de la siguiente (o se cortaba); los ojos seguían la duración adivinada.
+    """
+    start = time.perf_counter()
+    errors, eyes = [], []
+    for text in SENTENCES:
+        eyes_on = time.perf_counter()
+        audio = fake_synthesize(text)
+        real = len(audio) / 2 / RATE
+        time.sleep(len(text) * 0.05)
+        eyes.append(time.perf_counter() - eyes_on - real)
+        errors.append(len(text) * 0.05 - real)
+    return time.perf_counter() - start, errors, eyes, [SYNTH_LATENCY] * (len(SENTENCES) - 1)
+
+
+def pipelined():
+    eye_events = []
+    speaker = Speaker(fake_synthesize, on_start=lambda u: eye_events.append(("hablar", time.perf_counter())),
+                      on_idle=lambda: eye_events.append(("normal", time.perf_counter()))).start()
+    start = time.perf_counter()
+    utterances = [speaker.say(text) for text in SENTENCES]
+    speaker.wait_idle()
+    total = time.perf_counter() - start
+    speaker.stop()
+
+    # Desde el primer "hablar" hasta el "normal" final vs. el audio que sonó
+    first_on = eye_events[0][1]
+    last_off = [t for state, t in eye_events if state == "normal"][-1]
+    audio = utterances[-1].finished - utterances[0].started
+    errors = [u.duration - len(u.text) * SECONDS_PER_CHAR for u in utterances]
+    gaps = [b.started - a.finished for a, b in zip(utterances, utterances[1:])]
+    return total, errors, [(last_off - first_on) - audio], gaps
+
+
+def report(name, total, errors, eyes, gaps):
+    print(f"{name:<9} total {total:5.2f} s | error de duración máx. {max(abs(e) for e in errors) * 1000:5.0f} ms | "
+          f"ojos 'hablar' vs. audio {max(abs(e) for e in eyes) * 1000:5.0f} ms | "
+          f"silencio entre oraciones {max(gaps) * 1000:5.0f} ms")
+
+
+def main():
+    pygame.mixer.init(frequency=RATE, channels=1)
+    audio = sum(len(text) * SECONDS_PER_CHAR for text in SENTENCES)
+    print(f"{len(SENTENCES)} oraciones, {audio:.2f} s de audio, síntesis de {SYNTH_LATENCY * 1000:.0f} ms cada una")
+    report("anterior", *legacy())
+    report("Speaker", *pipelined())
+    pygame.mixer.quit()
+
+
+if __name__ == "__main__":
+    main()
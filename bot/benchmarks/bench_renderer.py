@@ -0,0 +1,109 @@
+"""Bucle anterior (dibujar y luego escuchar) vs. Renderer, sin pantalla (SDL_VIDEODRIVER=dummy).
+
+Un guion simulado escucha (bloquea), habla y busca cambiando el estado de los ojos. Se
+mide cuántos cuadros se dibujaron en cada estado, cuánto tarda un cambio de estado en
+llegar a la pantalla, el tiempo por cuadro y qué parte de la ventana se actualiza.
+También comprueba que la animación cambia los píxeles de los ojos.
+Uso (desde bot/): python benchmarks/bench_renderer.py
+"""
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from renderer import Renderer, load_eye_animations
+
+SIZE = (800, 400)
+LISTEN = 0.6
+# (estado, segundos): lo que hace el asistente después de cada escucha; al terminar vuelve a "normal"
+SCRIPT = [("hablar", 0.5), ("buscar", 0.8), ("hablar", 0.5)]
+
+
+def legacy(screen, eyes):
+    """Comportamiento anterior: un cuadro completo y después listen()/speak() bloqueando el bucle"""
+    state = {"value": "normal"}
+    counts = {name: 0 for name in eyes}
+    frame_times = []
+    for name, seconds in SCRIPT:
+        start = time.perf_counter()
+        pygame.event.get()
+        screen.fill((0, 0, 0))
+        screen.blit(eyes[state["value"]][0], (300, 100))
+        pygame.display.flip()
+        frame_times.append((time.perf_counter() - start) * 1000)
+        counts[state["value"]] += 1
+        time.sleep(LISTEN)  # listen()
+        state["value"] = name  # speak()/buscar cambian el estado y bloquean...
+        time.sleep(seconds)
+        state["value"] = "normal"  # ...y lo restauran antes del próximo cuadro
+    return counts, frame_times, [None], 1.0
+
+
+def decoupled(screen, eyes):
+    renderer = Renderer(screen, eyes, overlay=True)
+    stop = threading.Event()
+    posted = {}
+    latencies = []
+
+    def assistant():
+        for name, seconds in SCRIPT:
+            time.sleep(LISTEN)
+            posted[name] = time.perf_counter()
+            renderer.post_state(name)
+            time.sleep(seconds)
+            posted["normal"] = time.perf_counter()
+            renderer.post_state("normal")
+        stop.set()
+
+    counts = {name: 0 for name in eyes}
+    threading.Thread(target=assistant, daemon=True).start()
+    screen.fill((0, 0, 0))
+    pygame.display.flip()
+    last_state = renderer.state
+    while not stop.is_set():
+        pygame.event.get()
+        renderer.step()
+        if renderer.state != last_state:
+            latencies.append((time.perf_counter() - posted[renderer.state]) * 1000)
+            last_state = renderer.state
+        counts[renderer.state] += 1
+        renderer.clock.tick(renderer.fps)
+    share = renderer.updated_pixels / (renderer.frames * SIZE[0] * SIZE[1])
+    return counts, list(renderer.frame_times), latencies, share
+
+
+def animation_changes_pixels(screen, eyes):
+    renderer = Renderer(screen, eyes)
+    renderer.post_state("buscar")
+    renderer.step(now=0.0)
+    first = pygame.image.tostring(screen, "RGB")
+    renderer.step(now=renderer.frame_period * 3)
+    return first != pygame.image.tostring(screen, "RGB")
+
+
+def report(name, counts, frame_times, latencies, share):
+    frame_times = sorted(frame_times)
+    latency = "nunca" if latencies == [None] else f"{max(latencies):.1f} ms"
+    print(f"{name:<10} cuadros por estado {counts} | cuadro medio {sum(frame_times) / len(frame_times):.2f} ms, "
+          f"máx. {frame_times[-1]:.2f} ms | cambio de estado visible en {latency} | "
+          f"{share * 100:.1f}% de la ventana por cuadro")
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode(SIZE)
+    eyes = load_eye_animations("static")
+    report("anterior", *legacy(screen, eyes))
+    report("Renderer", *decoupled(screen, eyes))
+    print(f"La animación cambia los píxeles de los ojos: {'sí' if animation_changes_pixels(screen, eyes) else 'NO'}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import copy
+import os
+import queue
+import threading
+import time
+from contextlib import nullcontext
+
+SUMMARY_PREFIX = "Resume brevemente:"
+
+
+class InferenceRequest:
+    """Una generación encolada; iterarla devuelve el texto a medida que sale del modelo"""
+
+    def __init__(self, query, max_new_tokens):
+        self.query = query
+        self.max_new_tokens = max_new_tokens
+        self.cancelled = threading.Event()
+        self.error = None
+        self.submitted = time.perf_counter()
+        self.queue_time = None  # espera hasta que el hilo del modelo lo toma
+        self.batch_size = None  # con cuántos pedidos compartió el lote
+        self.first_token_latency = None
+        self.tokens = 0
+        self.elapsed = None
+        self._pieces = queue.Queue()
+
+    def push(self, text):
+        if self.first_token_latency is None:
+            self.first_token_latency = time.perf_counter() - self.submitted
+        self._pieces.put(text)
+
+    def finish(self, error=None):
+        if self.elapsed is not None:
+            return
+        self.error = error
+        self.elapsed = time.perf_counter() - self.submitted
+        self._pieces.put(None)
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def __iter__(self):
+        while True:
+            piece = self._pieces.get()
+            if piece is None:
+                if self.error is not None:
+                    raise self.error
+                return
+            yield piece
+
+
+class _TextStream:
+    """Texto de una secuencia a medida que salen sus tokens; como TextStreamer, entrega
+    hasta el último espacio para no cortar palabras ni caracteres a medio decodificar"""
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+        self.ids = []
+        self.sent = 0
+
+    def add(self, token_id):
+        self.ids.append(token_id)
+        text = self.tokenizer.decode(self.ids, skip_special_tokens=True)
+        if text.endswith("\ufffd"):
+            return ""
+        end = len(text) if text.endswith("\n") else text.rfind(" ") + 1
+        if end <= self.sent:
+            return ""
+        piece, self.sent = text[self.sent:end], end
+        return piece
+
+    def flush(self):
+        text = self.tokenizer.decode(self.ids, skip_special_tokens=True)
+        piece, self.sent = text[self.sent:], len(text)
+        return piece
+
+
+class InferenceWorker:
+    """Modelo local en un hilo propio: la ventana y la escucha no se congelan mientras genera.
+
+    Optimizaciones para CPU: cuantización dinámica int8 de las capas lineales,
+    `torch.inference_mode`, cantidad de hilos de torch acotada, `max_new_tokens` y el
+    caché KV del prefijo fijo ("Resume brevemente:") calculado una sola vez al cargar.
+    Los pedidos que llegan dentro de `batch_window` segundos (hasta `max_batch`) se
+    generan juntos en un lote: cada paso del modelo es una sola multiplicación de
+    matrices para todos, cada secuencia termina por su cuenta y sale del lote.
+    """
+
+    def __init__(self, model_path, prefix=SUMMARY_PREFIX, max_new_tokens=96, quantize=True, threads=None,
+                 max_batch=8, batch_window=0.01, timed=None, on_ready=None):
+        self.model_path = model_path
+        self.prefix = prefix
+        self.max_new_tokens = max_new_tokens
+        self.quantize = quantize
+        self.max_batch = max(1, max_batch)
+        self.batch_window = batch_window
+        # Un hilo por núcleo físico (aprox.) y el resto libre para la ventana y el audio
+        self.threads = threads or max(1, (os.cpu_count() or 2) // 2)
+        self.timed = timed or (lambda component, phase="init": nullcontext())
+        self.on_ready = on_ready
+        self.tokenizer = None
+        self.model = None
+        self.ready = threading.Event()  # terminó la carga (con o sin éxito)
+        self._requests = queue.Queue()
+        self._prefix_ids = None
+        self._prefix_cache = None
+        self._pad_id = None
+        self._eos_ids = set()
+        self._thread = None
+
+    @property
+    def available(self):
+        return self.ready.is_set() and self.model is not None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="inferencia", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, query, max_new_tokens=None):
+        """Encola el resumen de `query`; se puede iterar enseguida, aunque el modelo siga cargando"""
+        request = InferenceRequest(query, max_new_tokens or self.max_new_tokens)
+        self._requests.put(request)
+        return request
+
+    def stop(self):
+        self._requests.put(None)
+
+    def _run(self):
+        try:
+            self._load()
+        except Exception as e:
+            print(f"No se pudo cargar el modelo: {e}")
+        finally:
+            self.ready.set()
+            if self.on_ready:
+                self.on_ready(self)
+
+        while True:
+            batch, stopping = self._next_batch()
+            started = time.perf_counter()
+            for request in batch:
+                request.queue_time = started - request.submitted
+                request.batch_size = len(batch)
+            if batch and self.model is None:
+                for request in batch:
+                    request.finish(RuntimeError("el modelo no está disponible"))
+            elif batch:
+                try:
+                    self._generate_batch(batch)
+                except Exception as e:
+                    for request in batch:
+                        request.finish(e)
+            if stopping:
+                return
+
+    def _next_batch(self):
+        """El próximo pedido más los que lleguen dentro de la ventana; (lote, hay que parar)"""
+        request = self._requests.get()
+        if request is None:
+            return [], True
+        batch = [request]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                return batch, True
+            batch.append(request)
+        return batch, False
+
+    def _load(self):
+        with self.timed("transformers", "import"):
+            import torch
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+        self._torch = torch
+        torch.set_num_threads(self.threads)
+        with self.timed("modelo deepseek-r1"):
+            tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+            # La cuantización dinámica parte de pesos float32 (el checkpoint puede venir en bf16)
+            model = AutoModelForCausalLM.from_pretrained(self.model_path).float()
+            model.eval()
+        if self.quantize:
+            with self.timed("cuantización int8"):
+                model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.tokenizer = tokenizer
+        self.model = model
+        with self.timed("caché del prefijo"):
+            self._prefix_ids, self._prefix_cache = self._encode_prefix()
+        self._pad_id = tokenizer.pad_token_id or tokenizer.eos_token_id or 0
+        eos = model.generation_config.eos_token_id
+        self._eos_ids = set(eos if isinstance(eos, (list, tuple)) else [] if eos is None else [eos])
+
+    def _encode_prefix(self):
+        """Pasa el prefijo fijo por el modelo una vez y guarda sus claves y valores (caché KV)"""
+        prefix_ids = self.tokenizer(self.prefix, return_tensors="pt").input_ids
+        with self._torch.inference_mode():
+            output = self.model(prefix_ids, use_cache=True)
+        return prefix_ids, output.past_key_values
+
+    def _generate_batch(self, requests):
+        """Decodificación voraz de todo el lote, paso a paso, con el caché KV del prefijo"""
+        torch = self._torch
+        # El prefijo y cada consulta se tokenizan por separado: así los primeros tokens
+        # coinciden siempre con los del caché y solo se procesan las consultas
+        queries = [self.tokenizer(" " + request.query, add_special_tokens=False).input_ids for request in requests]
+        width = max(len(ids) for ids in queries)
+        # Relleno a la izquierda de cada consulta (entre el prefijo y ella), tapado por la máscara
+        input_ids = torch.tensor([[self._pad_id] * (width - len(ids)) + ids for ids in queries])
+        query_mask = torch.tensor([[0] * (width - len(ids)) + [1] * len(ids) for ids in queries])
+        prefix_length = self._prefix_ids.shape[1]
+        attention_mask = torch.cat([torch.ones(len(requests), prefix_length, dtype=torch.long), query_mask], dim=1)
+        positions = prefix_length + (query_mask.cumsum(-1) - 1).clamp(min=0)
+
+        # El modelo agrega al caché: se usa una copia y el original queda para el próximo lote
+        cache = copy.deepcopy(self._prefix_cache)
+        cache.batch_repeat_interleave(len(requests))
+        streams = [_TextStream(self.tokenizer) for _ in requests]
+        active = list(range(len(requests)))  # fila del lote -> pedido
+
+        with torch.inference_mode():
+            while active:
+                logits = self.model(input_ids, attention_mask=attention_mask, position_ids=positions,
+                                    past_key_values=cache, use_cache=True).logits[:, -1]
+                next_ids = logits.argmax(-1)
+                keep = []
+                for row, index in enumerate(active):
+                    request, token = requests[index], int(next_ids[row])
+                    finished = token in self._eos_ids or request.cancelled.is_set()
+                    if not finished:
+                        request.tokens += 1
+                        text = streams[index].add(token)
+                        if text:
+                            request.push(text)
+                        finished = request.tokens >= request.max_new_tokens
+                    if finished:
+                        text = streams[index].flush()
+                        if text:
+                            request.push(text)
+                        request.finish()
+                    else:
+                        keep.append(row)
+
+                if not keep:
+                    return
+                if len(keep) < len(active):
+                    # Las secuencias terminadas salen del lote: los pasos siguientes son más baratos
+                    rows = torch.tensor(keep)
+                    cache.batch_select_indices(rows)
+                    next_ids, attention_mask, positions = next_ids[rows], attention_mask[rows], positions[rows]
+                    active = [active[row] for row in keep]
+                input_ids = next_ids[:, None]
+                attention_mask = torch.cat([attention_mask, attention_mask.new_ones(len(active), 1)], dim=1)
+                positions = positions[:, -1:] + 1
@@ -0,0 +1,163 @@
+import io
+import queue
+import threading
+import time
+
+import pygame
+
+from shared import NULL_METRICS
+
+
+class Utterance:
+    """Una frase encolada para decir; su avance sale de la duración real del audio"""
+
+    def __init__(self, text, span):
+        self.text = text
+        self.span = span  # abierto al encolar: cuelga del turno que pidió la frase
+        self.sound = None
+        self.duration = None
+        self.error = None
+        self.queued = time.perf_counter()
+        self.started = None
+        self.finished = None
+        self.synthesized = threading.Event()
+        self.done = threading.Event()
+
+    @property
+    def position(self):
+        """Segundos reproducidos"""
+        if self.started is None:
+            return 0.0
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return min(end - self.started, self.duration)
+
+    @property
+    def progress(self):
+        """Fracción reproducida (0 a 1)"""
+        if not self.duration:
+            return 1.0 if self.done.is_set() else 0.0
+        return self.position / self.duration
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+
+class Speaker:
+    """Voz dentro del proceso: sintetiza y reproduce en dos hilos encadenados.
+
+    `synthesize(text)` devuelve el audio codificado (mp3 de gTTS, wav...) en bytes; se
+    decodifica desde memoria con pygame.mixer, sin archivos temporales ni procesos
+    externos. Mientras suena una frase ya se sintetiza la siguiente. `on_start` y
+    `on_finish` reciben cada Utterance cuando empieza y termina de sonar de verdad, y
+    `on_idle` avisa cuando no queda nada por decir. Con SDL_AUDIODRIVER=dummy funciona
+    sin placa de sonido. En `metrics` quedan la síntesis ("tts.sintesis"), la espera
+    hasta sonar ("tts.cola") y la reproducción ("tts.reproduccion") de cada frase.
+    """
+
+    def __init__(self, synthesize, on_start=None, on_finish=None, on_idle=None, frequency=24000, poll=0.005,
+                 metrics=None):
+        self.synthesize = synthesize
+        self.metrics = metrics or NULL_METRICS
+        self.on_start = on_start
+        self.on_finish = on_finish
+        self.on_idle = on_idle
+        self.frequency = frequency  # gTTS genera mp3 mono a 24 kHz: así no hay que remuestrear
+        self.poll = poll
+        self.current = None
+        self._to_synthesize = queue.Queue()
+        self._to_play = queue.Queue()
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._generation = 0  # se incrementa al cancelar: lo encolado antes se descarta
+        self._channel = None
+        self._threads = []
+
+    def start(self):
+        if not self._threads:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init(frequency=self.frequency, channels=1)
+            self._channel = pygame.mixer.Channel(0)
+            for name, target in (("síntesis", self._synthesize_loop), ("reproducción", self._play_loop)):
+                thread = threading.Thread(target=target, name=name, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def say(self, text):
+        """Encola la frase y vuelve enseguida; la Utterance permite esperarla o ver su avance"""
+        utterance = Utterance(text, self.metrics.start("tts", caracteres=len(text)))
+        with self._idle:
+            self._pending += 1
+        self._to_synthesize.put((self._generation, utterance))
+        return utterance
+
+    def wait_idle(self, timeout=None):
+        """Espera a que termine de sonar todo lo encolado"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def cancel(self):
+        """Corta la frase actual y descarta las que esperaban"""
+        self._generation += 1
+        if self._channel is not None:
+            self._channel.stop()
+
+    def stop(self):
+        self.cancel()
+        self._to_synthesize.put(None)
+
+    def _synthesize_loop(self):
+        while True:
+            item = self._to_synthesize.get()
+            if item is None:
+                self._to_play.put(None)
+                return
+            generation, utterance = item
+            if generation == self._generation:
+                start = time.perf_counter()
+                try:
+                    utterance.sound = pygame.mixer.Sound(file=io.BytesIO(self.synthesize(utterance.text)))
+                    utterance.duration = utterance.sound.get_length()
+                except Exception as e:
+                    utterance.error = e
+                    utterance.span.set(error=type(e).__name__)
+                    print(f"No se pudo sintetizar '{utterance.text}': {e}")
+                self.metrics.observe("tts.sintesis", time.perf_counter() - start)
+                utterance.span.mark("sintetizada")
+            utterance.synthesized.set()
+            self._to_play.put((generation, utterance))
+
+    def _play_loop(self):
+        while True:
+            item = self._to_play.get()
+            if item is None:
+                return
+            generation, utterance = item
+            if utterance.sound is not None and generation == self._generation:
+                self.current = utterance
+                self._channel.play(utterance.sound)
+                utterance.started = time.perf_counter()
+                self.metrics.observe("tts.cola", utterance.started - utterance.queued)
+                utterance.span.mark("sonando")
+                if self.on_start:
+                    self.on_start(utterance)
+                while self._channel.get_busy() and generation == self._generation:
+                    time.sleep(self.poll)
+                utterance.finished = time.perf_counter()
+                self.current = None
+                self.metrics.observe("tts.reproduccion", utterance.finished - utterance.started)
+                utterance.span.set(audio_s=round(utterance.duration, 3),
+                                   cortada=generation != self._generation)
+                if self.on_finish:
+                    self.on_finish(utterance)
+            elif utterance.error is None:
+                utterance.span.set(descartada=True)
+            utterance.span.end()
+            utterance.done.set()
+            with self._idle:
+                self._pending -= 1
+                idle = self._pending == 0
+                if idle:
+                    self._idle.notify_all()
+            if idle and self.on_idle:
+                self.on_idle()
@@ -0,0 +1,169 @@
+import math
+import os
+import queue
+import re
+import time
+from collections import deque
+
+import pygame
+
+BACKGROUND = (0, 0, 0)
+EYE_STATES = ("normal", "buscar", "hablar")
+
+
+def _procedural_frames(state, size, count=12):
+    """Ojos dibujados si no hay imágenes: parpadeo, mirada que recorre o pulso al hablar"""
+    width, height = size
+    frames = []
+    for i in range(count):
+        phase = i / count
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        openness, offset = 1.0, 0
+        if state == "normal":
+            # Parpadeo breve al final del ciclo
+            openness = 0.15 if phase > 0.85 else 1.0
+        elif state == "buscar":
+            offset = int(math.sin(phase * 2 * math.pi) * width * 0.08)
+        elif state == "hablar":
+            openness = 0.75 + 0.25 * abs(math.sin(phase * 2 * math.pi))
+        eye_h = max(2, int(height * 0.8 * openness))
+        for cx in (width // 4, 3 * width // 4):
+            rect = pygame.Rect(0, 0, width // 3, eye_h)
+            rect.center = (cx, height // 2)
+            pygame.draw.ellipse(surface, (235, 235, 235), rect)
+            if eye_h > 8:
+                pygame.draw.circle(surface, (20, 120, 255), (cx + offset, height // 2), min(eye_h, width // 3) // 4)
+        frames.append(surface)
+    return frames
+
+
+def load_eye_animations(static_dir="static", size=(200, 100)):
+    """Secuencia de cuadros por estado: static/ojos_<estado>_<n>.png, o la imagen única, o dibujados"""
+    animations = {}
+    names = os.listdir(static_dir) if os.path.isdir(static_dir) else []
+    for state in EYE_STATES:
+        # Otros archivos con el mismo prefijo (ojos_normal_a.png, copias...) no son cuadros
+        frame = re.compile(rf"ojos_{state}_(\d+)\.png")
+        numbered = sorted((int(match.group(1)), name) for name in names if (match := frame.fullmatch(name)))
+        paths = [os.path.join(static_dir, name) for _, name in numbered]
+        single = os.path.join(static_dir, f"ojos_{state}.png")
+        if not paths and os.path.exists(single):
+            paths = [single]
+        if paths:
+            animations[state] = [pygame.image.load(path).convert_alpha() for path in paths]
+        else:
+            animations[state] = _procedural_frames(state, size)
+    return animations
+
+
+class Renderer:
+    """Dibuja los ojos con su propio reloj, separado de la escucha, la voz y la inferencia.
+
+    Los otros hilos cambian el estado con `post_state` (una cola segura entre hilos); el
+    bucle la vacía en cada cuadro. Solo se redibujan las zonas que cambiaron (dirty rects)
+    y `overlay` muestra los tiempos de cuadro para detectar tirones.
+    """
+
+    def __init__(self, screen, animations, position=(300, 100), fps=60, animation_fps=12, overlay=False):
+        self.screen = screen
+        self.animations = animations
+        self.position = position
+        self.fps = fps
+        self.frame_period = 1.0 / animation_fps
+        self.overlay = overlay
+        self.state = "normal"
+        self.clock = pygame.time.Clock()
+        self.font = None
+
+        self._events = queue.SimpleQueue()
+        self._state_started = time.perf_counter()
+        self._shown = None  # (estado, índice) del cuadro en pantalla
+        self._eye_rect = None
+        self._overlay_rect = None
+        self._overlay_updated = 0.0
+        self.frame_times = deque(maxlen=240)  # ms de trabajo por cuadro
+        self.frames = 0
+        self.updated_pixels = 0
+
+    def post_state(self, state):
+        """Seguro desde cualquier hilo"""
+        self._events.put(state)
+
+    def run(self, stop):
+        self.screen.fill(BACKGROUND)
+        pygame.display.flip()
+        while not stop.is_set():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    stop.set()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.toggle_overlay()
+            self.step()
+            self.clock.tick(self.fps)
+
+    def step(self, now=None):
+        """Un cuadro: aplica cambios de estado y redibuja solo lo que cambió"""
+        start = time.perf_counter()
+        now = start if now is None else now
+        while True:
+            try:
+                state = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if state != self.state and state in self.animations:
+                self.state = state
+                self._state_started = now
+
+        frames = self.animations[self.state]
+        index = int((now - self._state_started) / self.frame_period) % len(frames)
+        dirty = []
+        if self._shown != (self.state, index):
+            frame = frames[index]
+            rect = frame.get_rect(topleft=self.position)
+            # Se borra el cuadro anterior (puede ser de otro tamaño) y se dibuja el nuevo
+            area = rect.union(self._eye_rect) if self._eye_rect else rect
+            self.screen.fill(BACKGROUND, area)
+            self.screen.blit(frame, rect)
+            dirty.append(area)
+            self._eye_rect = rect
+            self._shown = (self.state, index)
+
+        if self.overlay and now - self._overlay_updated >= 0.25:
+            dirty.append(self._draw_overlay())
+            self._overlay_updated = now
+
+        if dirty:
+            pygame.display.update(dirty)
+            self.updated_pixels += sum(rect.width * rect.height for rect in dirty)
+        self.frames += 1
+        self.frame_times.append((time.perf_counter() - start) * 1000)
+
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        if not self.overlay and self._overlay_rect:
+            self.screen.fill(BACKGROUND, self._overlay_rect)
+            pygame.display.update(self._overlay_rect)
+            self._overlay_rect = None
+
+    def stats(self):
+        times = sorted(self.frame_times) or [0.0]
+        return {
+            "fps": self.clock.get_fps(),
+            "frame_ms_avg": sum(times) / len(times),
+            "frame_ms_max": times[-1],
+            "frame_ms_p95": times[min(len(times) - 1, int(len(times) * 0.95))],
+        }
+
+    def _draw_overlay(self):
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+        stats = self.stats()
+        text = (f"{stats['fps']:4.0f} fps  cuadro {stats['frame_ms_avg']:4.1f} ms "
+                f"(máx. {stats['frame_ms_max']:4.1f})  {self.state}")
+        label = self.font.render(text, True, (0, 255, 0), BACKGROUND)
+        rect = label.get_rect(topleft=(8, 8))
+        area = rect.union(self._overlay_rect) if self._overlay_rect else rect
+        self.screen.fill(BACKGROUND, area)
+        self.screen.blit(label, rect)
+        self._overlay_rect = rect
+        return area
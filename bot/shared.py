@@ -0,0 +1,13 @@
+"""Módulos de jarvis/utils que el bot usa tal cual, sin copiarlos: métricas y perfil de arranque.
+
+Agrega jarvis/ al path una sola vez; el resto del bot importa desde acá.
+"""
+import os
+import sys
+
+JARVIS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "jarvis")
+if JARVIS_DIR not in sys.path:
+    sys.path.insert(0, JARVIS_DIR)
+
+from utils.metrics import NULL_METRICS, Metrics
+from utils.startup import StartupProfiler
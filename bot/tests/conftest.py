@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Sin pantalla ni placa de sonido: pygame usa los controladores de SDL que no muestran nada
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Los módulos del bot se importan como desde bot/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
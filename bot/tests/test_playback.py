@@ -0,0 +1,124 @@
+import io
+import threading
+import time
+import wave
+
+import numpy as np
+import pygame
+import pytest
+
+from playback import Speaker
+from shared import Metrics
+
+RATE = 24000
+SECONDS_PER_CHAR = 0.01
+
+
+def synthesize(text):
+    """Audio de `len(text) * SECONDS_PER_CHAR` segundos, como lo devolvería gTTS"""
+    if text == "falla":
+        raise RuntimeError("sin conexión")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(np.zeros(int(len(text) * SECONDS_PER_CHAR * RATE), dtype=np.int16).tobytes())
+    return buffer.getvalue()
+
+
+class Events:
+    def __init__(self):
+        self.log = []
+        self.idle = threading.Event()
+
+    def start(self, utterance):
+        self.log.append(("empieza", utterance.text))
+
+    def finish(self, utterance):
+        self.log.append(("termina", utterance.text))
+
+    def on_idle(self):
+        self.log.append(("libre", None))
+        self.idle.set()
+
+
+@pytest.fixture
+def events():
+    return Events()
+
+
+@pytest.fixture
+def metrics():
+    return Metrics()
+
+
+@pytest.fixture
+def speaker(events, metrics):
+    speaker = Speaker(synthesize, on_start=events.start, on_finish=events.finish, on_idle=events.on_idle,
+                      frequency=RATE, metrics=metrics).start()
+    yield speaker
+    speaker.stop()
+    for thread in speaker._threads:
+        thread.join(1)
+    pygame.mixer.quit()
+
+
+def test_sentences_play_in_order_for_their_real_duration(speaker, events):
+    first = speaker.say("a" * 20)
+    second = speaker.say("b" * 10)
+    assert speaker.wait_idle(timeout=2)
+    assert first.duration == pytest.approx(0.2, abs=0.01)
+    assert first.finished - first.started == pytest.approx(0.2, abs=0.05)
+    assert second.started >= first.finished
+    assert first.progress == second.progress == 1.0
+    assert events.log == [("empieza", "a" * 20), ("termina", "a" * 20),
+                          ("empieza", "b" * 10), ("termina", "b" * 10), ("libre", None)]
+
+
+def test_cancel_cuts_the_current_sentence_and_drops_the_rest(speaker, events, metrics):
+    playing = speaker.say("a" * 100)  # 1 s
+    waiting = [speaker.say("b" * 20), speaker.say("c" * 20)]
+    assert playing.synthesized.wait(1)
+    while speaker.current is None:
+        time.sleep(0.005)
+    speaker.cancel()
+    assert speaker.wait_idle(timeout=1)
+    assert playing.position < 0.5 and playing.progress < 0.5
+    assert all(u.done.is_set() and u.started is None for u in waiting)
+    assert events.log == [("empieza", "a" * 100), ("termina", "a" * 100), ("libre", None)]
+    assert metrics.snapshot()["histograms"]["tts.reproduccion"]["count"] == 1
+
+    # Lo que se pide después de cancelar suena normalmente
+    events.idle.clear()
+    after = speaker.say("d" * 10)
+    assert after.wait(1) and after.started is not None
+    assert events.idle.wait(1)
+
+
+def test_synthesis_errors_are_skipped(speaker, events):
+    broken = speaker.say("falla")
+    ok = speaker.say("b" * 10)
+    assert speaker.wait_idle(timeout=2)
+    assert isinstance(broken.error, RuntimeError) and broken.started is None and broken.done.is_set()
+    assert ok.started is not None
+    assert events.log == [("empieza", "b" * 10), ("termina", "b" * 10), ("libre", None)]
+
+
+def test_idle_is_reported_once_per_burst(speaker, events):
+    for text in ("a" * 5, "b" * 5, "c" * 5):
+        speaker.say(text)
+    assert events.idle.wait(2)
+    assert speaker.wait_idle(timeout=0)
+    assert [event for event, _ in events.log].count("libre") == 1
+    assert speaker._pending == 0
+
+
+def test_timings_are_recorded(speaker, metrics):
+    speaker.say("a" * 5)
+    speaker.say("falla")
+    assert speaker.wait_idle(timeout=2)
+    histograms = metrics.snapshot()["histograms"]
+    assert histograms["tts.sintesis"]["count"] == 2
+    assert histograms["tts.cola"]["count"] == histograms["tts.reproduccion"]["count"] == 1
+    assert histograms["tts"]["count"] == 2
@@ -0,0 +1,122 @@
+import pygame
+import pytest
+
+from renderer import BACKGROUND, Renderer, load_eye_animations
+
+POSITION = (300, 100)
+
+
+@pytest.fixture
+def screen():
+    pygame.display.init()
+    yield pygame.display.set_mode((800, 400))
+    pygame.display.quit()
+
+
+@pytest.fixture
+def updates(monkeypatch):
+    """Zonas que cada cuadro mandó a la pantalla"""
+    calls = []
+    update = pygame.display.update
+
+    def record(rects):
+        calls.append([rects] if isinstance(rects, pygame.Rect) else list(rects))
+        update(rects)
+
+    monkeypatch.setattr(pygame.display, "update", record)
+    return calls
+
+
+def make_renderer(screen, tmp_path, **kwargs):
+    # Sin imágenes en el directorio: ojos dibujados de 200x100
+    return Renderer(screen, load_eye_animations(str(tmp_path)), position=POSITION, **kwargs)
+
+
+def eye_rect():
+    return pygame.Rect(POSITION, (200, 100))
+
+
+def clock(renderer):
+    """Momentos relativos al arranque del renderer (que cuenta con perf_counter)"""
+    start = renderer._state_started
+    return lambda seconds: start + seconds
+
+
+def test_first_frame_draws_only_the_eyes(screen, tmp_path, updates):
+    renderer = make_renderer(screen, tmp_path)
+    at = clock(renderer)
+    renderer.step(now=at(0.0))
+    assert updates == [[eye_rect()]]
+    assert screen.get_at((POSITION[0] + 50, POSITION[1] + 50))[:3] != BACKGROUND  # ojo izquierdo
+    assert screen.get_at((10, 10))[:3] == BACKGROUND
+    assert renderer.updated_pixels == 200 * 100
+
+
+def test_nothing_is_redrawn_until_the_animation_advances(screen, tmp_path, updates):
+    renderer = make_renderer(screen, tmp_path, animation_fps=10)
+    at = clock(renderer)
+    renderer.step(now=at(0.0))
+    renderer.step(now=at(0.05))
+    assert len(updates) == 1
+    renderer.step(now=at(0.1))
+    assert updates[-1] == [eye_rect()]
+    assert renderer.frames == 3
+
+
+def test_posted_state_applies_on_the_next_frame(screen, tmp_path, updates):
+    renderer = make_renderer(screen, tmp_path)
+    at = clock(renderer)
+    renderer.step(now=at(0.0))
+    renderer.post_state("hablar")
+    renderer.post_state("no_existe")  # los estados sin animación se ignoran
+    assert renderer.state == "normal"
+
+    renderer.step(now=at(0.01))
+    assert renderer.state == "hablar"
+    assert renderer._shown == ("hablar", 0)
+    assert updates[-1] == [eye_rect()]
+
+
+def test_state_change_restarts_the_animation(screen, tmp_path):
+    renderer = make_renderer(screen, tmp_path, animation_fps=10)
+    at = clock(renderer)
+    renderer.step(now=at(0.0))
+    renderer.step(now=at(0.35))
+    assert renderer._shown == ("normal", 3)
+    renderer.post_state("buscar")
+    renderer.step(now=at(0.4))
+    assert renderer._shown == ("buscar", 0)
+
+
+def test_smaller_frame_clears_what_the_previous_one_covered(screen, tmp_path, updates):
+    animations = load_eye_animations(str(tmp_path))
+    animations["hablar"] = [pygame.Surface((50, 20))]
+    renderer = Renderer(screen, animations, position=POSITION)
+    at = clock(renderer)
+    renderer.step(now=at(0.0))
+    renderer.post_state("hablar")
+    renderer.step(now=at(0.01))
+    assert updates[-1] == [eye_rect()]  # la unión con el cuadro anterior, más grande
+    assert screen.get_at((POSITION[0] + 150, POSITION[1] + 50))[:3] == BACKGROUND
+
+
+def test_overlay_adds_its_own_rect(screen, tmp_path, updates):
+    pygame.font.init()
+    renderer = make_renderer(screen, tmp_path, overlay=True)
+    at = clock(renderer)
+    renderer.step(now=at(1.0))
+    assert len(updates[-1]) == 2
+    assert updates[-1][1].topleft == (8, 8)
+
+    renderer.toggle_overlay()
+    assert updates[-1][0].topleft == (8, 8)
+    assert screen.get_at((10, 10))[:3] == BACKGROUND
+
+
+def test_eye_frames_are_loaded_in_numeric_order_ignoring_other_files(screen, tmp_path):
+    for name, width in (("ojos_normal_10.png", 30), ("ojos_normal_2.png", 20), ("ojos_normal_a.png", 99),
+                        ("ojos_normal_3.png.bak", 99)):
+        pygame.image.save(pygame.Surface((width, 10)), str(tmp_path / name))
+    animations = load_eye_animations(str(tmp_path))
+    assert [frame.get_width() for frame in animations["normal"]] == [20, 30]
+    assert len(animations["hablar"]) == 12  # sin imágenes: dibujados
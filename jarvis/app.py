@@ -1,19 +1,34 @@
-import time
+import asyncio
 import threading
+import time
 import json
 from datetime import datetime
-import requests
 from utils.voice_engine import VoiceEngine
+from utils.browser_session import BrowserSession
 from utils.web_controller import WebController
-from utils.learning_engine import LearningEngine
+from utils.web_lookup import WebLookup
 from utils.response_manager import ResponseManager
-
-
-class Jarvis:
-    def __init__(self):
-        # Cargar configuración
-        with open('config.json') as config_file:
-            self.config = json.load(config_file)
+from utils.wake_word import WakeWordDetector
+from utils.recognizers import create_recognizer, load_vosk_model
+from utils.speech_scheduler import PRIORITY_ANSWER
+from utils.audio_cache import AudioCache
+from utils.orchestrator import Orchestrator, iterate_in_thread
+from utils.llm_client import OllamaClient
+from utils.conversation import ConversationManager
+from utils.intent_router import IntentRouter
+from utils.startup import StartupProfiler, Component
+from utils.metrics import Metrics
+from utils.warmup import WarmupScheduler
+from utils.pipeline import CommandPipeline, record_llm_timing
+
+
+class Jarvis(CommandPipeline):
+    def __init__(self, config=None, voice=None, web=None, learning=None, lookup=None, metrics=None):
+        # Cargar configuración (los módulos se pueden inyectar, p. ej. dobles de prueba)
+        if config is None:
+            with open('config.json') as config_file:
+                config = json.load(config_file)
+        self.config = config
 
         self.name = "Jarvis"
         self.activation_word = self.config.get("activation_word", "jarvis")
@@ -21,235 +36,379 @@ class Jarvis:
         self.is_active = False
         self.last_activation = 0
         self.response_delay = self.config.get("response_delay", 1.5)
-
-        # Inicializar módulos
-        self.voice = VoiceEngine()
-        self.web = WebController()
-        self.learning = LearningEngine()
+        self.ollama_settings = self.config.get("ollama", {})
+        self.profiler = StartupProfiler()
+        # Tramos y latencias por etapa (ASR, ruteo, caché, LLM, web, voz); apagadas no cuestan nada
+        self.metrics = metrics or Metrics.from_config(self.config.get("metrics", {}))
+
+        # Etapa 1: lo necesario para escuchar la palabra de activación
+        with self.profiler.measure("voz"):
+            self.voice = voice or VoiceEngine(
+                recognizer_backend=create_recognizer(self.config.get("speech_recognition", {})),
+                audio_cache=self._load_audio_cache(),
+                metrics=self.metrics
+            )
+        with self.profiler.measure("palabra de activación"):
+            self.wake_word = self._load_wake_word()
+
+        # Etapa 2: el aprendizaje (sklearn + preferencias) carga en segundo plano; mientras
+        # tanto no hay respuestas aprendidas ni correcciones y lo que se registra se encola
+        self._learning = (Component.loaded("aprendizaje", learning) if learning
+                          else Component("aprendizaje", self._load_learning, self.profiler).start())
+        with self.profiler.measure("web"):
+            self.web = web or self._load_web_controller()
+            self.lookup = lookup or self._load_web_lookup()
         self.response_manager = ResponseManager()
-        self.model = self._load_ai_model()
+        self.router = IntentRouter()
+        self._learning.when_ready(self._on_learning_ready)
+        self.voice.prerender(self._fixed_phrases())
+        with self.profiler.measure("modelo"):
+            self.model = self._load_ai_model()
+        self.conversation = ConversationManager(
+            system_prompt=f"Eres {self.name}, el asistente de voz de {self.user_name}. Responde en español, breve y natural.",
+            token_budget=self.ollama_settings.get("context_tokens", 1536)
+        )
 
         # Estado de la conversación
-        self.current_task = None
         self.is_processing = False
+        self._partial_intent = None
+        self._standby_reader = None
         self.last_interaction = time.time()
+        # Modelo residente, navegador y respuestas precalculadas según los hábitos aprendidos
+        self.warmup = self._load_warmup()
+
+        self.orchestrator = Orchestrator(
+            listen=self._next_event,
+            handle=self._handle_event,
+            on_supersede=self.voice.scheduler.clear,
+            background=[self._background_tasks]
+        )
 
+        self.profiler.mark("listo para escuchar")
+        threading.Thread(target=self._report_startup, daemon=True).start()
         print(f"{self.name} inicializado. Di '{self.activation_word}' para activarme.")
 
+    @property
+    def learning(self):
+        """LearningEngine, o None mientras sigue cargando"""
+        return self._learning.value
+
+    def _load_learning(self):
+        # Importarlo acá saca a sklearn del camino crítico del arranque
+        module = self.profiler.import_module("utils.learning_engine", "aprendizaje")
+        return module.LearningEngine()
+
+    def _on_learning_ready(self, learning):
+        self._update_router(learning.preferences)
+        learning.on_learn(self._update_router)
+
+    def _report_startup(self):
+        """Cuando termina de cargar todo, informa los tiempos y los agrega al historial de arranques"""
+        self._learning.wait()
+        self.profiler.mark("todo cargado")
+        settings = self.config.get("startup", {})
+        if settings.get("report", True):
+            self.profiler.report()
+        if settings.get("profile_log"):
+            self.profiler.save(settings["profile_log"])
+
+    def _load_audio_cache(self):
+        """Caché en disco de frases fijas ya sintetizadas"""
+        settings = self.config.get("audio_cache", {})
+        if not settings.get("enabled", True):
+            return None
+        return AudioCache(settings.get("dir", "audio_cache"), int(settings.get("max_mb", 50) * 1024 * 1024))
+
+    def _fixed_phrases(self):
+        """Frases que Jarvis repite tal cual y conviene tener pre-sintetizadas"""
+        return self.response_manager.get_fixed_phrases() + [
+            f"¿En qué puedo ayudarte, {self.user_name}?",
+            f"Hasta luego, {self.user_name}.",
+            "Estoy aquí cuando me necesites.",
+            "Estoy buscando la información...",
+            "Déjame pensar un momento...",
+            "De acuerdo.",
+            self.FALLBACK_RESPONSE
+        ]
+
+    def _load_web_controller(self):
+        """Navegador sin abrir todavía: arranca en segundo plano cuando hace falta"""
+        settings = self.config.get("web_settings", {})
+        session = BrowserSession(
+            headless=settings.get("headless", False),
+            profile_dir=settings.get("profile_dir", "navegador"),
+            warm_urls={"buscar": "https://www.google.com", "youtube": "https://www.youtube.com"},
+            page_load_timeout=settings.get("timeout", 15)
+        )
+        return WebController(session, wait_timeout=settings.get("wait_timeout", 10))
+
+    def _load_web_lookup(self):
+        """Búsquedas y videos por HTTP: el navegador queda solo para reproducir"""
+        settings = self.config.get("web_settings", {})
+        return WebLookup(
+            search_url=settings.get("search_url", "https://html.duckduckgo.com/html/?q="),
+            youtube_url=settings.get("youtube_url", "https://www.youtube.com"),
+            ttl=settings.get("lookup_ttl", 600)
+        )
+
     def _load_ai_model(self):
-        """Carga proxy para usar el modelo Gemma a través de Ollama"""
-        def generate(prompt):
-            try:
-                response = requests.post("http://localhost:11434/api/generate", json={
-                    "model": "gemma:2b",
-                    "prompt": prompt,
-                    "stream": False
-                }, timeout=15)
-                return response.json().get("response", "")
-            except Exception as e:
-                print(f"Error al generar respuesta: {e}")
-                return "No pude generar una respuesta en este momento."
-        return type("GemmaModel", (), {"generate": staticmethod(generate)})
+        """Cliente de Ollama para el modelo Gemma (conexiones persistentes, keep_alive)"""
+        settings = self.ollama_settings
+        return OllamaClient(
+            url=settings.get("url", "http://localhost:11434"),
+            model=settings.get("model", "gemma:2b"),
+            timeout=settings.get("timeout", 15),
+            connect_timeout=settings.get("connect_timeout", 5),
+            keep_alive=settings.get("keep_alive", 1800),
+            retries=settings.get("retries", 2),
+            backoff=settings.get("backoff", 0.5),
+            on_timing=lambda timing: record_llm_timing(self.metrics, timing)
+        )
 
-    def listen_loop(self):
-        while True:
-            if not self.is_active and time.time() - self.last_interaction > 300:
-                time.sleep(0.5)
-                continue
+    def _load_warmup(self):
+        settings = self.config.get("warmup", {})
+        enabled = settings.get("enabled", True)
+        prewarm = self.config.get("web_settings", {}).get("prewarm", True)
+        return WarmupScheduler(
+            warm_model=self._warm_up_model,
+            warm_browser=self.web.warm_up if prewarm else None,
+            prefetch=self._prefetch if enabled else None,
+            lead=settings.get("lead_minutes", 10) * 60,
+            idle=settings.get("idle_minutes", 10) * 60,
+            threshold=settings.get("threshold", 0.25),
+            # Apagado nunca aprende hábitos: modelo siempre caliente, como antes
+            min_days=settings.get("min_days", 3) if enabled else float("inf"),
+            prefetch_limit=settings.get("prefetch", 5)
+        )
 
-            print("\nEscuchando... (Modo activo)" if self.is_active else "\nEscuchando... (Modo espera)")
-            text = self.voice.listen(timeout=3 if self.is_active else 1)
+    def _load_wake_word(self):
+        """Detector local de la palabra de activación; None si Vosk o el modelo no están"""
+        settings = self.config.get("wake_word", {})
+        if not settings.get("enabled", True):
+            return None
+        try:
+            model = load_vosk_model(settings.get("model_path", "modelos/vosk-es"))
+        except Exception as e:
+            print(f"Detector de activación local no disponible ({e}); se usará el reconocimiento en línea.")
+            return None
+        return WakeWordDetector(
+            self.activation_word, model,
+            energy_threshold=settings.get("energy_threshold", 300)
+        )
 
-            if text and self.activation_word in text.lower():
-                self._activate_assistant()
-                continue
+    def _next_event(self):
+        """Escucha bloqueante (corre en el hilo del orquestador): próximo evento o None"""
+        if not self.is_active and self.wake_word:
+            # En espera solo corre el detector local: nada de audio sale a la nube
+            if self._standby_reader is None:
+                print(f"\nEsperando '{self.activation_word}'... (Modo espera)")
+                self._standby_reader = self.voice.audio_reader()
+            if not self.wake_word.wait(self._standby_reader):
+                return None
+            self._standby_reader = None
+            # La palabra clave no forma parte del comando
+            self.voice.discard_pending_audio()
+            return self._activation_event()
+
+        print("\nEscuchando... (Modo activo)" if self.is_active else "\nEscuchando... (Modo espera)")
+        self._partial_intent = None
+        start = time.perf_counter()
+        text = self.voice.listen(
+            timeout=3 if self.is_active else 1,
+            on_partial=self._on_partial_text if self.is_active else None
+        )
+        if not text:
+            self.metrics.count("escucha_sin_texto")
+            return None
+        self.metrics.observe("escucha", time.perf_counter() - start)
+        # Del fin del enunciado al texto: lo que el usuario espera al reconocimiento
+        self.metrics.observe("asr", self.voice.last_recognition_latency)
+        if self.activation_word in text.lower():
+            return self._activation_event()
+        if self.is_active:
+            return ("command", text, self._partial_intent)
+        return None
+
+    def _activation_event(self):
+        # Se marca acá y no al procesar el evento: la escucha sigue enseguida en este hilo
+        # y lo que se diga después de la palabra clave ya es un comando
+        self.is_active = True
+        return ("activate",)
 
-            if self.is_active and text:
-                self._process_user_command(text)
+    async def _handle_event(self, event):
+        with self.metrics.span("turno", evento=event[0]) as span:
+            if event[0] == "activate":
+                self._activate_assistant()
+            else:
+                span.set(asr_ms=round((self.voice.last_recognition_latency or 0.0) * 1000, 1))
+                await self._handle_command(event[1], event[2])
 
     def _activate_assistant(self):
         self.is_active = True
         self.last_activation = time.time()
-        self.voice.speak(f"¿En qué puedo ayudarte, {self.user_name}?")
+        if self.last_activation - self.last_interaction > self.warmup.idle:
+            # Primera activación de la sesión: saludo según la hora (ya sintetizado por _prefetch)
+            self.voice.speak(self._greeting(self.last_activation))
+        else:
+            self.voice.speak(f"¿En qué puedo ayudarte, {self.user_name}?")
         self.last_interaction = time.time()
+        self.warmup.note_interaction()
 
-    def _process_user_command(self, text):
-        self.last_interaction = time.time()
-        self.voice.speak(self.response_manager.get_acknowledgement())
+    def _greeting(self, moment):
+        greeting = self.response_manager.get_time_based_greeting(datetime.fromtimestamp(moment))
+        return f"{greeting}, {self.user_name}. ¿En qué puedo ayudarte?"
 
-        processing_thread = threading.Thread(
-            target=self._handle_command_processing,
-            args=(text,)
-        )
-        processing_thread.start()
-        self._provide_processing_feedback(text)
-        processing_thread.join()
+    def _update_router(self, preferences):
+        self.router.update(preferences['corrections'], preferences['media_patterns'])
+
+    def _match_quick_intent(self, text):
+        return self.router.route(text).name
+
+    def _on_partial_text(self, partial):
+        """Reconoce la intención con el texto parcial, antes de que el usuario termine de hablar"""
+        intent = self._match_quick_intent(partial)
+        if intent and intent != self._partial_intent:
+            self._partial_intent = intent
+            if intent in ("buscar", "reproducir"):
+                # El navegador se prepara mientras el usuario sigue dictando la búsqueda
+                self.web.warm_up()
+
+    async def _handle_command(self, text, partial_intent=None):
+        """Procesa un comando; si llega otro mientras tanto, el orquestador cancela esta tarea"""
+        self.last_interaction = time.time()
+        self.warmup.note_interaction()
+        with self.metrics.span("ruteo") as span:
+            route = self.router.route(text)
+            span.set(intencion=route.name)
+        if route.name == "cancelar":
+            # El comando anterior ya se canceló al llegar este
+            self.voice.speak("De acuerdo.", priority=PRIORITY_ANSWER)
+            return
+
+        intent = route.name or partial_intent
+        if intent not in ("hora", "fecha"):
+            # La hora y la fecha se responden al instante: no hace falta relleno
+            self.voice.speak(self.response_manager.get_acknowledgement(), filler=True)
 
-    def _handle_command_processing(self, text):
         self.is_processing = True
+        feedback = asyncio.create_task(self._processing_feedback(intent))
+        cancelled = False
         try:
-            quick_action_response = self._check_quick_actions(text)
+            quick_action_response = self._check_quick_actions(text, route)
             if quick_action_response:
-                self.voice.speak(quick_action_response)
+                self.voice.speak(quick_action_response, priority=PRIORITY_ANSWER)
                 return
 
-            start_time = time.time()
-            cached_response = self.learning.get_personalized_response(text)
-            if cached_response:
-                self.voice.speak(cached_response)
-                return
-
-            if time.time() - start_time > 1.5:
-                self.voice.speak("Estoy analizando tu solicitud...")
-
-            full_response = self._generate_ai_response(text)
-
-            action_result = self._execute_associated_actions(text, full_response)
-            final_response = action_result if action_result else full_response
-            self.voice.speak(final_response)
-
-            self.learning.log_interaction(
+            sources = None
+            if route.name == "buscar" and route.slots.get('query'):
+                # Los resultados se leen por HTTP y el modelo los resume en voz
+                sources = await asyncio.to_thread(self._search_sources, route.slots['query'])
+
+            # Las acciones web no usan el texto del modelo: se resuelven sin esperar al LLM
+            action_result = None if sources else await asyncio.to_thread(
+                self._execute_associated_actions, text, route)
+            if action_result:
+                final_response = action_result
+                self.voice.speak(final_response, priority=PRIORITY_ANSWER)
+            else:
+                final_response = await self._speak_ai_response(text, sources)
+
+            self._learning.when_ready(lambda learning: learning.log_interaction(
                 command=text,
                 response=final_response,
                 success=True
-            )
+            ))
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
         except Exception as e:
             error_msg = f"Disculpa {self.user_name}, hubo un error al procesar tu solicitud."
-            self.voice.speak(error_msg)
-            self.learning.log_interaction(text, error_msg, False)
+            self.voice.speak(error_msg, priority=PRIORITY_ANSWER)
+            self._learning.when_ready(lambda learning: learning.log_interaction(text, error_msg, False))
         finally:
+            feedback.cancel()
             self.is_processing = False
-            self._deactivate_if_inactive()
-
-    def _provide_processing_feedback(self, text):
-        time.sleep(0.3)
-        feedback_given = False
-        while self.is_processing:
-            if time.time() - self.last_interaction > 3 and not feedback_given:
-                if "buscar" in text.lower() or "información" in text.lower():
-                    self.voice.speak("Estoy buscando la información...")
-                else:
-                    self.voice.speak("Déjame pensar un momento...")
-                feedback_given = True
-            time.sleep(0.1)
-
-    def _check_quick_actions(self, text):
-        text_lower = text.lower()
-
-        if "hora" in text_lower:
-            current_time = datetime.now().strftime("%H:%M")
-            return f"Son las {current_time}, {self.user_name}."
-
-        if "fecha" in text_lower:
-            current_date = datetime.now().strftime("%d de %B de %Y")
-            return f"Hoy es {current_date}."
-
-        cached_response = self.learning.get_personalized_response(text)
-        if cached_response:
-            return cached_response
-
-        return None
-
-    def _generate_ai_response(self, text):
-        processed_text = self._enhance_input(text)
-        response = None
-
-        def generate():
-            nonlocal response
-            response = self.model.generate(processed_text)
-
-        gen_thread = threading.Thread(target=generate)
-        gen_thread.start()
-        gen_thread.join(timeout=5)
-
-        if not response:
-            return "Disculpa la demora, estoy teniendo dificultades. ¿Podrías repetir o reformular tu solicitud?"
-        return self._enhance_response(response)
-
-    def _enhance_input(self, text):
-        for wrong, correct in self.learning.preferences['corrections'].items():
-            if wrong in text.lower():
-                text = text.replace(wrong, correct)
-
-        user_profile = self.learning.get_user_profile()
-        context = f"[Usuario: {self.user_name}, Temas favoritos: {', '.join(user_profile['favorite_topics'])}, Patrón de interacción: {user_profile['interaction_pattern']}] "
-        return context + text
-
-    def _enhance_response(self, response):
-        if not response.startswith(self.user_name):
-            response = f"{self.user_name}, {response}"
-
-        if self.learning.preferences.get('informal_style', False):
-            response = response.replace("puedo ayudarte", "te puedo ayudar")
-            response = response.replace("disculpa", "perdoná")
-
-        if len(response.split()) > 30:
-            sentences = response.split('. ')
-            response = '. '.join(sentences[:2]) + '.' if len(sentences) > 2 else response
-
+            if not cancelled:
+                self._deactivate_if_inactive()
+
+    async def _processing_feedback(self, intent):
+        """Relleno de espera si el comando lleva más de 3 s; se cancela al terminar"""
+        await asyncio.sleep(max(0.0, self.last_interaction + 3 - time.time()))
+        if intent == "buscar":
+            self.voice.speak("Estoy buscando la información...", filler=True)
+        else:
+            self.voice.speak("Déjame pensar un momento...", filler=True)
+
+    async def _speak_ai_response(self, text, sources=None):
+        """Envía cada oración a la cola de voz apenas llega, sin esperar la respuesta completa"""
+        spoken = []
+        async for sentence in iterate_in_thread(lambda: self._stream_ai_sentences(text, sources)):
+            self.voice.speak(sentence, priority=PRIORITY_ANSWER)
+            spoken.append(sentence)
+
+        if not spoken:
+            self.voice.speak(self.FALLBACK_RESPONSE, priority=PRIORITY_ANSWER)
+            return self.FALLBACK_RESPONSE
+
+        response = " ".join(spoken)
+        if not sources:
+            # Un resumen de resultados web envejece: no se guarda en la caché de respuestas
+            self._learning.when_ready(lambda learning: learning.remember_response(text, response))
         return response
 
-    def _execute_associated_actions(self, text, response):
-        text_lower = text.lower()
-
-        if any(cmd in text_lower for cmd in ["reproduce", "pon", "abre video", "mirar"]):
-            query = self._extract_media_query(text_lower)
-            if query:
-                self.web.play_youtube(query)
-                return f"Listo {self.user_name}, estoy reproduciendo {query} en YouTube."
-
-        elif "busca" in text_lower or "buscar" in text_lower:
-            query = text_lower.replace("busca", "").replace("buscar", "").strip()
-            if query:
-                self.web.search_web(query)
-                return f"Encontré esto sobre {query}. ¿Te sirve la información?"
-
-        return None
-
-    def _extract_media_query(self, text):
-        for pattern in self.learning.preferences.get('media_patterns', []):
-            if pattern in text:
-                return text.split(pattern)[1].strip()
-
-        for trigger in ["reproduce", "pon", "abre"]:
-            if trigger in text:
-                return text.split(trigger)[1].strip()
-
-        return None
-
     def _deactivate_if_inactive(self):
         if time.time() - self.last_interaction > self.response_delay:
             self.is_active = False
             self.voice.speak("Estoy aquí cuando me necesites.")
 
     def run(self):
-        listen_thread = threading.Thread(target=self.listen_loop)
-        listen_thread.daemon = True
-        listen_thread.start()
-
-        background_thread = threading.Thread(target=self._background_tasks)
-        background_thread.daemon = True
-        background_thread.start()
-
         try:
-            while True:
-                time.sleep(1)
+            asyncio.run(self.orchestrator.run())
         except KeyboardInterrupt:
             print("\nApagando Jarvis...")
             self.voice.speak(f"Hasta luego, {self.user_name}.")
+            if self.learning:
+                self.learning.close()
+            self.metrics.close()
 
-    def _background_tasks(self):
+    async def _background_tasks(self, interval=30):
+        # Recién arrancado es probable que se lo use: cuenta como actividad
+        self.warmup.note_interaction()
         while True:
-            if not self.is_active and time.time() - self.last_interaction > 60:
-                self._warm_up_model()
-            self.learning.analyze_interaction_patterns()
-            time.sleep(30)
+            await asyncio.to_thread(self._maintenance)
+            await asyncio.to_thread(self.warmup.tick)
+            await asyncio.sleep(interval)
+
+    def _maintenance(self):
+        if not self.learning:
+            return
+        self.learning.analyze_interaction_patterns()
+        self.learning.response_cache.purge_expired()
+        self.warmup.update(self.learning.preferences)
+
+    def _prefetch(self, commands, moment):
+        """Antes de una franja habitual: el saludo de esa hora sintetizado y las respuestas probables listas"""
+        self.voice.prerender([self._greeting(moment)])
+        for command in commands:
+            route = self.router.route(command)
+            try:
+                if route.name == "buscar" and route.slots.get('query'):
+                    # Queda en la caché de WebLookup; el resumen se genera al pedirlo
+                    self.lookup.search(route.slots['query'])
+                elif route.name is None and self.learning.response_cache.nearest(command) is None:
+                    # nearest no cuenta aciertos ni mueve la entrada en el LRU: la consulta es especulativa
+                    answer = self._prefetch_answer(command)
+                    if answer:
+                        self.learning.remember_response(command, answer)
+            except Exception as e:
+                print(f"No se pudo precalcular '{command}': {e}")
 
     def _warm_up_model(self):
+        """Mantiene el modelo cargado en Ollama sin generar texto"""
         try:
-            self.model.generate("Mantener modelo activo")
-        except:
-            pass
+            self.model.keep_warm()
+        except Exception as e:
+            print(f"No se pudo precargar el modelo: {e}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,72 @@
+"""Tiempo de procesamiento del prompt (prefill) a lo largo de una sesión de 20 turnos.
+
+Contra FakeOllamaServer, que cobra `PREFILL_PER_TOKEN` por cada token de prompt no
+cacheado. Se compara reenviar todo el historial en cada consulta (sin caché de prompt)
+con ConversationManager, que arrastra el `context` de Ollama y mantiene fijo el prefijo,
+tanto con respuestas completas como cortadas (sin `context`, solo caché de prefijo).
+Uso (desde jarvis/): python benchmarks/bench_conversation.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.conversation import ConversationManager
+from utils.fakes import FakeOllamaServer
+from utils.llm_client import OllamaClient
+
+TURNS = 20
+PREFILL_PER_TOKEN = 0.002  # ~500 tokens/s, del orden de un modelo de 2B en CPU
+SYSTEM = "Eres Jarvis, el asistente de voz de Señor. Responde en español, breve y natural."
+PROFILE = "[Usuario: Señor, Temas favoritos: música, clima, Patrón de interacción: noche]"
+ANSWER = ("Claro, te cuento lo más importante sobre eso. Hay varios puntos a tener en cuenta "
+          "y el principal es que depende del contexto. Si querés, lo vemos con más detalle.")
+
+
+def question(turn):
+    return f"Pregunta {turn}: ¿qué más me podés contar sobre el tema {turn} que vimos recién?"
+
+
+def full_history(client):
+    """Sin memoria del lado del servidor: cada consulta reenvía instrucciones e historial"""
+    history = ""
+    for turn in range(1, TURNS + 1):
+        prompt = history + f"Usuario: {question(turn)}\n"
+        answer = client.generate(prompt, system=f"{SYSTEM}\n{PROFILE}")
+        history = prompt + f"Asistente: {answer}\n"
+        yield client.last_timing
+
+
+def managed(client, conversation, keep_context=True):
+    conversation.set_profile(PROFILE)
+    for turn in range(1, TURNS + 1):
+        request = conversation.build(question(turn))
+        done = {}
+        answer = "".join(client.stream(request.pop("prompt"), on_done=done.update, **request))
+        conversation.record(question(turn), answer, done.get("context") if keep_context else None)
+        yield client.last_timing
+
+
+def report(name, timings):
+    prefill = [t['prefill'] for t in timings]
+    tokens = [t['prompt_tokens'] for t in timings]
+    marks = "  ".join(f"t{i}={prefill[i - 1] * 1000:5.0f}ms" for i in (1, 5, 10, 20))
+    print(f"{name:<34} {marks}  total {sum(prefill):5.2f} s  ({sum(tokens)} tokens de prompt)")
+
+
+def main():
+    print(f"Prefill por turno ({TURNS} turnos, {PREFILL_PER_TOKEN * 1000:.0f} ms por token no cacheado)")
+    with FakeOllamaServer(ANSWER, prefill_per_token=PREFILL_PER_TOKEN, prompt_cache=False) as server:
+        report("historial completo, sin caché", list(full_history(OllamaClient(server.url))))
+    with FakeOllamaServer(ANSWER, prefill_per_token=PREFILL_PER_TOKEN) as server:
+        conversation = ConversationManager(SYSTEM, token_budget=1536)
+        report("ConversationManager + context", list(managed(OllamaClient(server.url), conversation)))
+        print(f"  (prompts armados desde cero: {conversation.resets})")
+    with FakeOllamaServer(ANSWER, prefill_per_token=PREFILL_PER_TOKEN) as server:
+        conversation = ConversationManager(SYSTEM, token_budget=1536)
+        report("ConversationManager, sin context",
+               list(managed(OllamaClient(server.url), conversation, keep_context=False)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Búsquedas lineales de subcadenas vs. IntentRouter, según la cantidad de cosas aprendidas.
+
+El ruteo anterior recorría por cada comando todas las correcciones y todos los
+media_patterns con `in`, más las listas fijas de disparadores; IntentRouter compila
+todo en tres expresiones (trie con límites de palabra) y las reutiliza hasta que
+LearningEngine aprende algo nuevo. Se mide el costo por comando y el de recompilar.
+Uso (desde jarvis/): python benchmarks/bench_intent_router.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.intent_router import IntentRouter
+
+SIZES = [0, 10, 100, 1000, 10000]
+COMMANDS = [
+    "qué hora es",
+    "pon música de queen",
+    "busca el clima en madrid",
+    "cuéntame un chiste",
+    "ahora ponte cómodo y dime la fecha",
+    "reproduce lo último de coldplay",
+]
+RUNS = 2000
+
+
+def random_word(rng, length=6):
+    return "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(length))
+
+
+def learned(size, seed=0):
+    rng = random.Random(seed)
+    corrections = {random_word(rng): random_word(rng) for _ in range(size)}
+    media_patterns = [f"pon {random_word(rng)}" for _ in range(size)]
+    return corrections, media_patterns
+
+
+def linear_route(text, corrections, media_patterns):
+    """Comportamiento anterior: _enhance_input + _check_quick_actions + _execute_associated_actions"""
+    for wrong, correct in corrections.items():
+        if wrong in text.lower():
+            text = text.replace(wrong, correct)
+    text_lower = text.lower()
+    if "hora" in text_lower:
+        return "hora", None
+    if "fecha" in text_lower:
+        return "fecha", None
+    if any(cmd in text_lower for cmd in ["reproduce", "pon", "abre video", "mirar"]):
+        for pattern in media_patterns:
+            if pattern in text_lower:
+                return "reproduce", text_lower.split(pattern)[1].strip()
+        for trigger in ["reproduce", "pon", "abre"]:
+            if trigger in text_lower:
+                return "reproduce", text_lower.split(trigger)[1].strip()
+    elif "busca" in text_lower or "buscar" in text_lower:
+        return "busca", text_lower.replace("busca", "").replace("buscar", "").strip()
+    return None, None
+
+
+def per_command_us(route):
+    start = time.perf_counter()
+    for i in range(RUNS):
+        route(COMMANDS[i % len(COMMANDS)])
+    return (time.perf_counter() - start) / RUNS * 1e6
+
+
+def main():
+    print(f"Costo por comando ({RUNS} comandos) según correcciones y patrones aprendidos")
+    print(f"{'aprendidos':>10} {'lineal':>12} {'IntentRouter':>14} {'compilar':>12}")
+    for size in SIZES:
+        corrections, media_patterns = learned(size)
+        linear = per_command_us(lambda text: linear_route(text, corrections, media_patterns))
+        start = time.perf_counter()
+        router = IntentRouter(corrections, media_patterns)
+        compile_ms = (time.perf_counter() - start) * 1000
+        routed = per_command_us(router.route)
+        print(f"{size:>10} {linear:>9.1f} µs {routed:>11.1f} µs {compile_ms:>9.1f} ms")
+
+    corrections, media_patterns = learned(100)
+    router = IntentRouter(corrections, media_patterns)
+    before = router.compilations
+    router.update(corrections, media_patterns)
+    unchanged = router.compilations - before
+    router.update(corrections, media_patterns + ["pon algo"])
+    print(f"Recompilaciones: sin cambios {unchanged}, con un patrón nuevo {router.compilations - before - unchanged}")
+
+    print("\nDiferencias de ruteo (lineal -> IntentRouter):")
+    for text in COMMANDS:
+        old = linear_route(text, {}, [])
+        new = IntentRouter().route(text)
+        print(f"  {text!r}: {old[0]} {old[1]!r} -> {new.name} {new.slots.get('query')!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""requests.post por consulta vs. OllamaClient, contra FakeOllamaServer.
+
+Mide la latencia de consultas cortas seguidas (conexión nueva vs. reutilizada), cuántas
+llamadas llegan al servidor cuando varios piden el mismo prompt a la vez y cuánto cuesta
+mantener el modelo cargado (generación de relleno vs. keep_alive sin prompt).
+Uso (desde jarvis/): python benchmarks/bench_llm_client.py
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fakes import FakeOllamaServer
+from utils.llm_client import OllamaClient
+
+RUNS = 200
+CONCURRENT = 8
+# Lo que tarda el servidor en empezar a generar: el costo que paga cada generación de relleno
+GENERATION_DELAY = 0.2
+
+
+def bare_generate(url, prompt):
+    """Comportamiento anterior: una conexión TCP nueva por consulta"""
+    response = requests.post(url + "/api/generate", json={
+        "model": "gemma:2b", "prompt": prompt, "stream": False
+    }, timeout=15)
+    return response.json().get("response", "")
+
+
+def measure(call):
+    samples = []
+    for i in range(RUNS):
+        start = time.perf_counter()
+        call(f"consulta {i % 5}")
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    with FakeOllamaServer("Hola. Respuesta corta.") as server:
+        client = OllamaClient(server.url)
+        bare_ms = measure(lambda prompt: bare_generate(server.url, prompt))
+        bare_connections = len(server.connections)
+        server.connections.clear()
+        pooled_ms = measure(client.generate)
+        print(f"Consulta corta, mediana: requests.post {bare_ms:.2f} ms ({bare_connections} conexiones) | "
+              f"OllamaClient {pooled_ms:.2f} ms ({len(server.connections)} conexiones)")
+        timing = client.last_timing
+        print(f"  última consulta: cola {timing['queue'] * 1000:.2f} ms, ttft {timing['ttft'] * 1000:.2f} ms, "
+              f"total {timing['total'] * 1000:.2f} ms, {timing['tokens_per_s']:.0f} fragmentos/s")
+
+    with FakeOllamaServer("Hola. Respuesta compartida.", first_token_delay=GENERATION_DELAY) as server:
+        client = OllamaClient(server.url)
+        threads = [threading.Thread(target=client.generate, args=("¿qué hora es?",)) for _ in range(CONCURRENT)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print(f"{CONCURRENT} pedidos idénticos simultáneos -> {len(server.requests)} llamada(s) al servidor")
+
+        start = time.perf_counter()
+        bare_generate(server.url, "Mantener modelo activo")
+        dummy_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        client.preload()
+        preload_ms = (time.perf_counter() - start) * 1000
+        print(f"Mantener el modelo cargado: generación de relleno {dummy_ms:.1f} ms | keep_alive {preload_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Costo por ciclo de analyze_interaction_patterns con un log de millones de líneas.
+
+Compara el reescaneo completo anterior con el análisis incremental por offset.
+Uso (desde jarvis/): python benchmarks/bench_log_analysis.py [líneas]
+"""
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.learning_engine import LearningEngine
+
+COMMANDS = ["qué hora es", "pon música tranquila", "busca recetas de empanadas",
+            "reproduce las noticias", "contame un chiste", "cómo está el clima"]
+
+
+def write_lines(path, start, count):
+    with open(path, 'a') as f:
+        for i in range(start, start + count):
+            f.write(json.dumps({
+                'timestamp': "2026-01-01T00:00:00",
+                'command': COMMANDS[i % len(COMMANDS)],
+                'response': f"respuesta {i}",
+                'success': True
+            }) + "\n")
+
+
+def legacy_tick(engine):
+    """Implementación anterior: relee y decodifica todo el log en cada ciclo"""
+    with open(engine.interaction_log, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                if any(cmd in entry['command'].lower() for cmd in ["reproduce", "pon"]):
+                    engine._extract_media_pattern(entry['command'])
+            except:
+                continue
+    engine.save_data()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(lines=2_000_000, ticks=20, appended=10):
+    with tempfile.TemporaryDirectory() as data_dir:
+        engine = LearningEngine(data_dir=data_dir)
+        write_lines(engine.interaction_log, 0, lines)
+        print(f"Log: {lines:,} líneas, {os.path.getsize(engine.interaction_log) / 1e6:.0f} MB")
+
+        print(f"Reescaneo completo (anterior): {timed(lambda: legacy_tick(engine)) * 1000:10.1f} ms/ciclo")
+        print(f"Primer ciclo incremental:      {timed(engine.analyze_interaction_patterns) * 1000:10.1f} ms")
+
+        costs = []
+        total = lines
+        for _ in range(ticks):
+            write_lines(engine.interaction_log, total, appended)
+            total += appended
+            costs.append(timed(engine.analyze_interaction_patterns))
+        print(f"Ciclo incremental (+{appended} líneas): {statistics.median(costs) * 1000:9.3f} ms/ciclo (mediana)")
+
+        # Rotación: el log se renombra y se empieza uno nuevo
+        os.replace(engine.interaction_log, engine.interaction_log + ".1")
+        write_lines(engine.interaction_log, 0, appended)
+        print(f"Ciclo tras rotación:           {timed(engine.analyze_interaction_patterns) * 1000:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000)
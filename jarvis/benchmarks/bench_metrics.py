@@ -0,0 +1,140 @@
+"""Costo de la instrumentación (Metrics) y lo que muestra de un turno de Jarvis.
+
+1. Costo por tramo con las métricas apagadas, encendidas y encendidas con traza JSONL.
+2. Precisión de los percentiles del histograma log-lineal frente a los exactos.
+3. Turnos reales de Jarvis contra FakeOllamaServer, FakeWebServer y un TTS simulado:
+   latencia por etapa, el endpoint /metrics (formato Prometheus) y el árbol de tramos
+   de un turno leído de la traza.
+Uso (desde jarvis/): python benchmarks/bench_metrics.py
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fakes import FakeOllamaServer, FakeRecognizer, FakeTTSBackend, FakeWebController, FakeWebServer
+from utils.learning_engine import LearningEngine
+from utils.metrics import Histogram, Metrics
+from utils.voice_engine import VoiceEngine
+from utils.web_lookup import WebLookup
+from app import Jarvis
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "web")
+SPANS = 200_000
+COMMANDS = ["explícame la fotosíntesis", "qué hora es", "busca el clima en madrid", "cuéntame un dato curioso"]
+ANSWER = "Claro, te cuento. La fotosíntesis convierte luz en energía química. Ocurre en los cloroplastos."
+
+
+def span_cost(metrics):
+    start = time.perf_counter()
+    for _ in range(SPANS):
+        with metrics.span("ruteo") as span:
+            span.set(intencion="hora")
+    return (time.perf_counter() - start) / SPANS * 1e9
+
+
+def overhead(workdir):
+    baseline = time.perf_counter()
+    for _ in range(SPANS):
+        pass
+    empty = (time.perf_counter() - baseline) / SPANS * 1e9
+    print("Costo por tramo (ns, descontado el bucle vacío):")
+    for name, metrics in (("apagadas", Metrics(enabled=False)),
+                          ("encendidas", Metrics()),
+                          ("encendidas + traza JSONL", Metrics(trace_path=os.path.join(workdir, "costo.jsonl")))):
+        print(f"  {name:<26} {span_cost(metrics) - empty:8.0f} ns")
+        metrics.close()
+
+
+def accuracy():
+    rng = np.random.default_rng(0)
+    samples = rng.lognormal(mean=np.log(0.25), sigma=0.8, size=100_000)  # latencias de ~250 ms con cola larga
+    histogram = Histogram()
+    for value in samples:
+        histogram.record(float(value))
+    print(f"\nPercentiles de {len(samples)} latencias (histograma de {len(histogram.counts)} cubetas vs. exactos):")
+    for q in (50, 95, 99, 99.9):
+        exact = float(np.percentile(samples, q))
+        estimate = histogram.percentile(q)
+        print(f"  p{q:<5} {estimate * 1000:8.2f} ms vs. {exact * 1000:8.2f} ms  "
+              f"(error {abs(estimate - exact) / exact * 100:.2f}%)")
+
+
+def pipeline(workdir):
+    trace_path = os.path.join(workdir, "jarvis_trace.jsonl")
+    metrics = Metrics(trace_path=trace_path)
+    host, port = metrics.serve(0)
+    config = {"wake_word": {"enabled": False}, "audio_cache": {"enabled": False}, "startup": {"report": False}}
+    with FakeOllamaServer(ANSWER, token_delay=0.01, first_token_delay=0.15) as ollama, \
+            FakeWebServer(FIXTURES) as web:
+        config["ollama"] = {"url": ollama.url}
+        voice = VoiceEngine(recognizer_backend=FakeRecognizer([]),
+                            tts_backend=FakeTTSBackend(seconds_per_char=0.004, synth_delay=0.05), metrics=metrics)
+        jarvis = Jarvis(config=config, voice=voice, web=FakeWebController(action_delay=0.02),
+                        learning=LearningEngine(), lookup=WebLookup(search_url=web.url + "/buscar?q="),
+                        metrics=metrics)
+
+        async def session():
+            for command in COMMANDS * 3:
+                jarvis.is_active = True
+                await jarvis._handle_event(("command", command, None))
+                await asyncio.to_thread(voice.scheduler.wait_idle)
+
+        asyncio.run(session())
+        jarvis.learning.close()
+
+    print(f"\n{len(COMMANDS) * 3} turnos, latencia por etapa (ms):")
+    print(f"  {'etapa':<18} {'n':>4} {'p50':>8} {'p95':>8} {'máx.':>8}")
+    for name, summary in sorted(metrics.snapshot()["histograms"].items()):
+        print(f"  {name:<18} {summary['count']:4d} {summary['p50'] * 1000:8.1f} {summary['p95'] * 1000:8.1f} "
+              f"{summary['max'] * 1000:8.1f}")
+    print(f"  contadores: {metrics.snapshot()['counters']}")
+
+    body = urllib.request.urlopen(f"http://{host}:{port}/metrics").read().decode("utf-8")
+    print(f"\nGET /metrics ({len(body.splitlines())} líneas), por ejemplo:")
+    for line in body.splitlines():
+        if line.startswith("jarvis_llm_ttft") or line.startswith("jarvis_cache_respuestas"):
+            print(f"  {line}")
+    metrics.close()
+
+    with open(trace_path, encoding="utf-8") as f:
+        spans = [json.loads(line) for line in f]
+    turn = next(s for s in spans if s["name"] == "turno" and s.get("evento") == "command")
+    searched = [s for s in spans if s["name"] == "web.busqueda"]
+    turn = next((s for s in spans if s["span"] == searched[0]["parent"]), turn) if searched else turn
+    children = {}
+    for s in spans:
+        if s["trace"] == turn["trace"]:
+            children.setdefault(s["parent"], []).append(s)
+
+    def show(span, depth):
+        extra = {k: v for k, v in span.items() if k not in ("trace", "span", "parent", "name", "start", "ms")}
+        print(f"  {'  ' * depth}{span['name']:<{22 - 2 * depth}} {span['ms']:8.1f} ms  {extra}")
+        for child in sorted(children.get(span["span"], []), key=lambda s: s["start"]):
+            show(child, depth + 1)
+
+    print(f"\nTramos de un turno ({len(spans)} líneas en la traza):")
+    show(turn, 0)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)  # LearningEngine guarda sus archivos en el directorio actual
+        try:
+            overhead(workdir)
+            accuracy()
+            pipeline(workdir)
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Diseño con hilos y sondeo vs. orquestador asíncrono: demora de respuesta y CPU en reposo.
+
+Una sesión guionada con audio sintético (WAV en tiempo real), reconocedor, modelo
+(FakeOllamaServer) y TTS simulados. El tercer comando llega mientras el modelo todavía
+responde al segundo: con hilos espera a que termine; el orquestador lo atiende de
+inmediato y cancela el anterior. Cada diseño corre en un proceso aparte para medir su CPU.
+Uso (desde jarvis/): python benchmarks/bench_orchestrator.py
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio_source import WavFileSource
+from utils.fakes import FakeOllamaServer, FakeRecognizer, FakeTTSBackend, FakeWebController
+from utils.learning_engine import LearningEngine
+from utils.speech_scheduler import PRIORITY_ANSWER
+from utils.voice_engine import VoiceEngine
+from app import Jarvis
+
+SAMPLERATE = 16000
+# (inicio en s, lo que dice el usuario, comienzo de la respuesta esperada)
+SCRIPT = [
+    (0.5, "jarvis", "¿En qué puedo ayudarte"),
+    (3.0, "explícame la fotosíntesis", "Claro"),
+    (5.0, "qué hora es", "Son las"),
+    (10.0, "cuéntame un dato curioso", "Claro"),
+]
+BURST_SECONDS = 0.6
+AUDIO_SECONDS = 24.0
+IDLE_WINDOW = (15.0, 23.0)  # solo silencio: mide el costo de estar escuchando sin hacer nada
+
+
+def write_session_wav(path):
+    audio = np.zeros(int(AUDIO_SECONDS * SAMPLERATE), dtype=np.int16)
+    t = np.arange(int(BURST_SECONDS * SAMPLERATE)) / SAMPLERATE
+    burst = (4000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    for start, _, _ in SCRIPT:
+        i = int(start * SAMPLERATE)
+        audio[i:i + len(burst)] = burst
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLERATE)
+        wav.writeframes(audio.tobytes())
+
+
+class ThreadedCore:
+    """Diseño anterior: un hilo por comando, escucha bloqueada hasta que termina y sondeo cada 100 ms"""
+
+    def __init__(self, jarvis):
+        self.jarvis = jarvis
+        self.running = True
+
+    def listen_loop(self):
+        j = self.jarvis
+        while self.running:
+            j._partial_intent = None
+            text = j.voice.listen(timeout=3 if j.is_active else 1,
+                                  on_partial=j._on_partial_text if j.is_active else None)
+            if text and j.activation_word in text.lower():
+                j._activate_assistant()
+                continue
+            if j.is_active and text:
+                self.process(text)
+
+    def process(self, text):
+        j = self.jarvis
+        j.last_interaction = time.time()
+        intent = j._match_quick_intent(text) or j._partial_intent
+        if intent not in ("hora", "fecha"):
+            j.voice.speak(j.response_manager.get_acknowledgement(), filler=True)
+        worker = threading.Thread(target=self.handle, args=(text,))
+        worker.start()
+        self.feedback(text)
+        worker.join()
+
+    def handle(self, text):
+        j = self.jarvis
+        j.is_processing = True
+        try:
+            quick = j._check_quick_actions(text)
+            if quick:
+                j.voice.speak(quick, priority=PRIORITY_ANSWER)
+                return
+            final = j._execute_associated_actions(text, None)
+            if final:
+                j.voice.speak(final, priority=PRIORITY_ANSWER)
+            else:
+                spoken = []
+                for sentence in j._stream_ai_sentences(text):
+                    j.voice.speak(sentence, priority=PRIORITY_ANSWER)
+                    spoken.append(sentence)
+                final = " ".join(spoken) or j.FALLBACK_RESPONSE
+            j.learning.log_interaction(text, final, True)
+        finally:
+            j.is_processing = False
+            j._deactivate_if_inactive()
+
+    def feedback(self, text):
+        j = self.jarvis
+        time.sleep(0.3)
+        given = False
+        while j.is_processing:
+            if time.time() - j.last_interaction > 3 and not given:
+                j.voice.speak("Déjame pensar un momento...", filler=True)
+                given = True
+            time.sleep(0.1)
+
+    def background(self):
+        while self.running:
+            self.jarvis._maintenance()
+            time.sleep(30)
+
+    def start(self):
+        threading.Thread(target=self.listen_loop, daemon=True).start()
+        threading.Thread(target=self.background, daemon=True).start()
+
+        def main_loop():
+            while self.running:
+                time.sleep(1)
+        threading.Thread(target=main_loop, daemon=True).start()
+
+    def stop(self):
+        self.running = False
+
+
+def run_design(design):
+    tmp = tempfile.mkdtemp()
+    wav_path = os.path.join(tmp, "session.wav")
+    write_session_wav(wav_path)
+
+    server = FakeOllamaServer("Claro. La respuesta llega por partes. Y termina aquí.",
+                              token_delay=0.15, first_token_delay=1.5).__enter__()
+    source = WavFileSource(wav_path, realtime=True)
+    recognizer = FakeRecognizer([text for _, text, _ in SCRIPT])
+    tts = FakeTTSBackend(seconds_per_char=0.02)
+    voice = VoiceEngine(audio_source=source, recognizer_backend=recognizer, tts_backend=tts)
+    config = {
+        "activation_word": "jarvis",
+        "user_name": "Señor",
+        "response_delay": 60,
+        "ollama": {"url": server.url, "model": "fake", "timeout": 5},
+        "wake_word": {"enabled": False},
+    }
+    jarvis = Jarvis(config=config, voice=voice, web=FakeWebController(),
+                    learning=LearningEngine(data_dir=os.path.join(tmp, "user_data")))
+
+    if design == "threads":
+        core = ThreadedCore(jarvis)
+        core.start()
+        stop = core.stop
+    else:
+        threading.Thread(target=lambda: asyncio.run(jarvis.orchestrator.run()), daemon=True).start()
+        stop = jarvis.orchestrator.stop
+
+    while source.started_at is None:
+        time.sleep(0.01)
+    origin = source.started_at
+    cpu_start = time.process_time()
+
+    def sleep_until(offset):
+        time.sleep(max(0.0, origin + offset - time.perf_counter()))
+
+    sleep_until(IDLE_WINDOW[0])
+    idle_cpu = time.process_time()
+    sleep_until(IDLE_WINDOW[1])
+    idle_cpu = (time.process_time() - idle_cpu) / (IDLE_WINDOW[1] - IDLE_WINDOW[0])
+    total_cpu = time.process_time() - cpu_start
+    stop()
+    server.stop()
+
+    turnaround = []
+    for (_, text, expected), (_, end_sample) in zip(SCRIPT, recognizer.results):
+        spoken_at = origin + end_sample / SAMPLERATE
+        starts = [t for said, t in tts.started if expected in said and t >= spoken_at]
+        turnaround.append(round(starts[0] - spoken_at, 3) if starts else None)
+    return {
+        "design": design,
+        "turnaround_s": turnaround,
+        "idle_cpu_pct": round(idle_cpu * 100, 2),
+        "total_cpu_s": round(total_cpu, 3),
+        "spoken": [text for text, _ in tts.spoken],
+    }
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--design":
+        print(json.dumps(run_design(sys.argv[2]), ensure_ascii=False))
+        return
+
+    results = {}
+    for design in ("threads", "async"):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--design", design],
+                                capture_output=True, text=True, check=True).stdout
+        results[design] = json.loads(output.strip().splitlines()[-1])
+
+    print("Demora desde el fin de cada enunciado hasta que empieza su respuesta (s):")
+    for i, (_, text, _) in enumerate(SCRIPT):
+        row = []
+        for design in ("threads", "async"):
+            value = results[design]["turnaround_s"][i]
+            row.append(f"{design}={'cancelado' if value is None else f'{value:.3f}'}")
+        print(f"  {text:<28} " + "  ".join(row))
+    for design in ("threads", "async"):
+        r = results[design]
+        print(f"{design:>8}: CPU en reposo {r['idle_cpu_pct']:.2f}%  CPU total {r['total_cpu_s']:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
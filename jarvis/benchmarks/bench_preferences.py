@@ -0,0 +1,80 @@
+"""Tiempo de guardado y carga de preferencias: pickle completo vs. PreferenceStore.
+
+Uso (desde jarvis/): python benchmarks/bench_preferences.py
+"""
+import os
+import pickle
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.preference_store import PreferenceStore, Preferences
+
+
+def make_preferences(n):
+    return {
+        'frequent_commands': defaultdict(int, {f"comando {i}": i % 17 for i in range(n)}),
+        'preferred_responses': {f"pregunta {i}": f"respuesta {i}" for i in range(n // 10)},
+        'corrections': {f"palabra{i}": f"corrección{i}" for i in range(n // 100)},
+        'dislikes': set(),
+        'preferred_topics': defaultdict(int, {f"tema {i}": i for i in range(100)}),
+        'interaction_times': [1_700_000_000.0 + i for i in range(n)],
+        'command_patterns': defaultdict(list, {f"patrón {i}": [f"uso {j}" for j in range(20)] for i in range(n // 10)}),
+        'media_patterns': [f"pon cosa{i}" for i in range(50)],
+    }
+
+
+def median_ms(fn, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def bench(n):
+    with tempfile.TemporaryDirectory() as data_dir:
+        legacy = make_preferences(n)
+        pkl = os.path.join(data_dir, "prefs.pkl")
+
+        def pickle_save():
+            legacy['media_patterns'].append("pon algo")
+            with open(pkl, 'wb') as f:
+                pickle.dump(legacy, f)
+
+        def pickle_load():
+            with open(pkl, 'rb') as f:
+                pickle.load(f)
+
+        pickle_save_ms = median_ms(pickle_save)
+        pickle_load_ms = median_ms(pickle_load)
+        pickle_size = os.path.getsize(pkl)
+
+        with open(pkl, 'wb') as f:
+            pickle.dump(legacy, f)
+        db = os.path.join(data_dir, "prefs.db")
+        store = PreferenceStore(db, legacy_pickle=pkl)
+        preferences = Preferences(store)
+
+        def store_save():
+            preferences['media_patterns'].append("pon algo")
+            preferences['frequent_commands']["comando 1"] += 1
+            store.save(preferences)
+
+        store_save_ms = median_ms(store_save)
+        store_load_ms = median_ms(lambda: Preferences(PreferenceStore(db)))
+        store.close()
+
+        print(f"{n:>7} entradas | pickle: guardar {pickle_save_ms:8.2f} ms, cargar {pickle_load_ms:8.2f} ms, "
+              f"{pickle_size / 1e6:6.2f} MB | store: guardar {store_save_ms:6.2f} ms, cargar {store_load_ms:6.2f} ms, "
+              f"{os.path.getsize(db) / 1e6:6.2f} MB")
+
+
+if __name__ == "__main__":
+    for size in (1_000, 10_000, 100_000):
+        bench(size)
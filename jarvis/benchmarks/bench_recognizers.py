@@ -0,0 +1,68 @@
+"""Latencia desde el fin del enunciado hasta el texto, por backend de reconocimiento.
+
+Reproduce WAVs (16 bits mono) en tiempo real por la misma cadena que usa VoiceEngine
+(captura -> VAD -> backend) y mide cuánto tarda el texto una vez que el VAD cierra el
+enunciado. Vosk decodifica mientras llega el audio; Google recibe todo al final.
+Uso (desde jarvis/): python benchmarks/bench_recognizers.py modelos/vosk-es a.wav [b.wav ...] [--google]
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio_source import WavFileSource
+from utils.audio_stream import AudioCapture, VoiceActivityDetector
+from utils.recognizers import GoogleRecognizer, VoskRecognizer
+
+
+def transcribe(backend, path):
+    capture = AudioCapture(WavFileSource(path, realtime=True))
+    vad = VoiceActivityDetector(capture)
+    capture.start()
+    partials = []
+    session = backend.start(capture.samplerate)
+
+    def on_audio(pcm):
+        partial = session.feed(pcm)
+        if partial and (not partials or partials[-1] != partial):
+            partials.append(partial)
+
+    try:
+        utterance = vad.next_utterance(timeout=10, on_audio=on_audio)
+        if utterance is None:
+            session.cancel()
+            return None, None, 0
+        end_of_speech = time.perf_counter()
+        text = session.finish(utterance)
+        return text, time.perf_counter() - end_of_speech, len(partials)
+    finally:
+        capture.stop()
+
+
+def main(args):
+    use_google = "--google" in args
+    args = [a for a in args if a != "--google"]
+    if len(args) < 2:
+        sys.exit(__doc__)
+
+    backends = {'vosk': VoskRecognizer(args[0])}
+    if use_google:
+        backends['google'] = GoogleRecognizer()
+
+    for name, backend in backends.items():
+        latencies = []
+        for path in args[1:]:
+            text, latency, partial_count = transcribe(backend, path)
+            if latency is not None:
+                latencies.append(latency)
+            print(f"[{name}] {os.path.basename(path)}: {text!r} "
+                  f"({partial_count} parciales, {latency * 1000 if latency else 0:.0f} ms)")
+        if latencies:
+            print(f"[{name}] fin de voz -> texto: mediana {statistics.median(latencies) * 1000:.0f} ms, "
+                  f"máx {max(latencies) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
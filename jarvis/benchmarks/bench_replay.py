@@ -0,0 +1,266 @@
+"""Repetición determinista de un corpus de comandos a través de Jarvis, por escenario.
+
+Cada escenario del corpus (acciones rápidas, caché, respuestas del modelo, búsqueda,
+multimedia) corre en un proceso aparte contra dobles locales: reconocedor guionado
+(FakeRecognizer), FakeOllamaServer con latencia y ritmo de tokens configurables,
+FakeTTSBackend, FakeWebController y FakeWebServer. Los servidores viven en este proceso,
+así la CPU y la memoria de cada escenario son solo las de Jarvis. Se informa p50/p95/p99
+del turno (del fin de la frase del usuario a la respuesta completa) y del primer audio de
+la respuesta, la CPU por turno y el RSS; todo se guarda en JSON y se compara con la
+corrida anterior (o con --base) para detectar regresiones.
+Con --wav los comandos de texto se convierten en audio sintético y pasan por la captura
+y el VAD reales (en tiempo real: tarda más).
+Uso (desde jarvis/): python benchmarks/bench_replay.py [--corpus c.json] [--salida r.json] [--base r.json] [--wav]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio_source import WavFileSource
+from utils.fakes import FakeOllamaServer, FakeRecognizer, FakeTTSBackend, FakeWebController, FakeWebServer
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+CORPUS = os.path.join(BENCH_DIR, "fixtures", "replay", "corpus.json")
+WEB_FIXTURES = os.path.join(BENCH_DIR, "fixtures", "web")
+OUTPUT = os.path.join(BENCH_DIR, "replay_resultados.json")
+SAMPLERATE = 16000
+# Lo que se compara entre corridas: (grupo, clave)
+TRACKED = [("turno_ms", "p50"), ("turno_ms", "p95"), ("primer_audio_ms", "p50"), ("primer_audio_ms", "p95"),
+           ("cpu_ms_por_turno", None), ("rss_mb", None)]
+
+
+class ReplayTTS(FakeTTSBackend):
+    """TTS simulado que anota cuándo empieza a sonar la primera frase que no es relleno"""
+
+    def __init__(self, seconds_per_char, synth_delay):
+        super().__init__(seconds_per_char=seconds_per_char, synth_delay=synth_delay)
+        self.fillers = set()
+        self.first_answer = None
+
+    def say(self, text, interrupted=None):
+        if self.first_answer is None and text not in self.fillers:
+            self.first_answer = time.perf_counter()
+        super().say(text, interrupted)
+
+
+def write_command_wav(path, seconds=0.8, silence=1.4):
+    """Ráfaga de voz sintética seguida del silencio que el VAD necesita para cerrar el enunciado"""
+    t = np.arange(int(seconds * SAMPLERATE)) / SAMPLERATE
+    burst = (4000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    audio = np.concatenate([np.zeros(SAMPLERATE // 5, dtype=np.int16), burst,
+                            np.zeros(int(silence * SAMPLERATE), dtype=np.int16)])
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLERATE)
+        wav.writeframes(audio.tobytes())
+
+
+def recognize(text, wav_path, delay):
+    """Texto reconocido y el instante en que el usuario terminó de hablar"""
+    if wav_path is None:
+        start = time.perf_counter()
+        return FakeRecognizer([text], delay=delay).start(SAMPLERATE).finish(None), start
+
+    from utils.voice_engine import VoiceEngine
+    voice = VoiceEngine(audio_source=WavFileSource(wav_path, realtime=True),
+                        recognizer_backend=FakeRecognizer([text], delay=delay), tts_backend=FakeTTSBackend())
+    recognized = voice.listen(timeout=5)
+    voice.capture.stop()
+    return recognized, time.perf_counter() - (voice.last_recognition_latency or 0.0)
+
+
+def percentiles(values):
+    if not values:
+        return None
+    return {f"p{q}": round(float(np.percentile(values, q)), 2) for q in (50, 95, 99)}
+
+
+def memory_mb():
+    """RSS actual y pico del proceso en MB (None donde no se puede leer)"""
+    current = peak = None
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    current = int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB en Linux
+    except ImportError:
+        pass
+    return current, peak
+
+
+def run_scenario(corpus, corpus_dir, name, ollama_url, web_url, use_wav):
+    """Corre un escenario (en el proceso hijo) y devuelve sus mediciones"""
+    from utils.learning_engine import LearningEngine
+    from utils.response_cache import ResponseCache
+    from utils.web_lookup import WebLookup
+    from utils.voice_engine import VoiceEngine
+    from app import Jarvis
+
+    random.seed(0)  # los rellenos se eligen al azar: misma secuencia en cada corrida
+    settings = corpus["escenarios"][name]
+    workdir = tempfile.mkdtemp()
+    tts = ReplayTTS(seconds_per_char=1 / corpus["tts"]["caracteres_por_s"],
+                    synth_delay=corpus["tts"]["sintesis_ms"] / 1000)
+    voice = VoiceEngine(recognizer_backend=FakeRecognizer([]), tts_backend=tts)
+    learning = LearningEngine(data_dir=os.path.join(workdir, "user_data"))
+    for command, response in settings.get("aprendidas", {}).items():
+        learning.remember_response(command, response)
+    config = {
+        "response_delay": 3600,
+        "ollama": {"url": ollama_url, "model": "fake", "timeout": 10},
+        "wake_word": {"enabled": False},
+        "audio_cache": {"enabled": False},
+        "startup": {"report": False},
+    }
+    jarvis = Jarvis(config=config, voice=voice, web=FakeWebController(action_delay=corpus["web"]["accion_ms"] / 1000),
+                    learning=learning, lookup=WebLookup(search_url=web_url + "/buscar?q=", youtube_url=web_url))
+    tts.fillers = set(jarvis.response_manager.get_fixed_phrases()) | {
+        "Estoy buscando la información...", "Déjame pensar un momento..."}
+
+    commands = []
+    for _ in range(corpus.get("repeticiones", 1)):
+        for entry in settings["comandos"]:
+            text, wav = (entry, None) if isinstance(entry, str) else (entry["texto"], entry.get("wav"))
+            if wav:
+                wav = os.path.join(corpus_dir, wav)
+            elif use_wav:
+                wav = os.path.join(workdir, f"comando{len(commands)}.wav")
+                write_command_wav(wav)
+            commands.append((text, wav))
+
+    asr_delay = corpus["asr"]["demora_ms"] / 1000
+    turns, first_audio = [], []
+
+    async def session():
+        for text, wav in commands:
+            if not settings.get("aprender", True):
+                # Cada turno pasa por el modelo: lo aprendido en el anterior no se reutiliza
+                learning.response_cache = ResponseCache()
+            recognized, spoken_at = await asyncio.to_thread(recognize, text, wav, asr_delay)
+            tts.first_answer = None
+            jarvis.is_active = True
+            await jarvis._handle_event(("command", recognized, None))
+            turns.append((time.perf_counter() - spoken_at) * 1000)
+            await asyncio.to_thread(voice.scheduler.wait_idle)
+            if tts.first_answer is not None:
+                first_audio.append((tts.first_answer - spoken_at) * 1000)
+
+    cpu = time.process_time()
+    asyncio.run(session())
+    cpu = time.process_time() - cpu
+    rss, peak = memory_mb()
+    learning.close()
+    return {
+        "turnos": len(turns),
+        "turno_ms": percentiles(turns),
+        "primer_audio_ms": percentiles(first_audio),
+        "cpu_ms_por_turno": round(cpu / len(turns) * 1000, 2),
+        "rss_mb": round(rss, 1) if rss else None,
+        "rss_pico_mb": round(peak, 1) if peak else None,
+    }
+
+
+def value(result, group, key):
+    entry = result.get(group)
+    return entry.get(key) if key and entry else entry
+
+
+def compare(results, base, tolerance):
+    """Imprime las diferencias con la corrida base; devuelve cuántas superan la tolerancia"""
+    regressions = 0
+    print(f"\nComparación con la corrida del {base.get('fecha', '?')} (tolerancia {tolerance:.0f}%):")
+    for name, result in results["escenarios"].items():
+        previous = base.get("escenarios", {}).get(name)
+        if not previous:
+            print(f"  {name:<18} sin datos previos")
+            continue
+        changes = []
+        for group, key in TRACKED:
+            before, after = value(previous, group, key), value(result, group, key)
+            if not before or after is None:
+                continue
+            delta = (after - before) / before * 100
+            flag = ""
+            if delta > tolerance:
+                flag = " REGRESIÓN"
+                regressions += 1
+            changes.append(f"{group.replace('_ms', '')}{'.' + key if key else ''} {delta:+.0f}%{flag}")
+        print(f"  {name:<18} " + " | ".join(changes))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repetición determinista del pipeline de Jarvis")
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--salida", default=OUTPUT, help="JSON con los resultados de esta corrida (por defecto, junto a este script)")
+    parser.add_argument("--base", help="JSON de una corrida anterior (por defecto, la --salida previa)")
+    parser.add_argument("--tolerancia", type=float, default=10.0, help="% de empeoramiento que se marca")
+    parser.add_argument("--wav", action="store_true", help="pasar los comandos como audio por el VAD real")
+    parser.add_argument("--escenario", help=argparse.SUPPRESS)
+    parser.add_argument("--ollama", help=argparse.SUPPRESS)
+    parser.add_argument("--web", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        corpus = json.load(f)
+    corpus_dir = os.path.dirname(os.path.abspath(args.corpus))
+
+    if args.escenario:
+        # Proceso hijo: un escenario y el resultado en la última línea
+        result = run_scenario(corpus, corpus_dir, args.escenario, args.ollama, args.web, args.wav)
+        print(json.dumps(result, ensure_ascii=False))
+        return 0
+
+    llm = corpus["llm"]
+    results = {"fecha": datetime.now().isoformat(timespec="seconds"), "corpus": os.path.abspath(args.corpus),
+               "wav": args.wav, "repeticiones": corpus.get("repeticiones", 1), "escenarios": {}}
+    with FakeOllamaServer(llm["respuesta"], first_token_delay=llm["primer_token_ms"] / 1000,
+                          token_delay=1 / llm["tokens_por_s"]) as ollama, FakeWebServer(WEB_FIXTURES) as web:
+        print(f"{'escenario':<18} {'turnos':>6} {'turno p50/p95/p99 (ms)':>26} {'primer audio p50/p95/p99':>28} "
+              f"{'CPU/turno':>10} {'RSS':>8}")
+        for name in corpus["escenarios"]:
+            command = [sys.executable, os.path.abspath(__file__), "--corpus", os.path.abspath(args.corpus), "--escenario", name,
+                       "--ollama", ollama.url, "--web", web.url] + (["--wav"] if args.wav else [])
+            with tempfile.TemporaryDirectory() as workdir:
+                # El hijo corre en un directorio vacío: no toca los datos del usuario
+                output = subprocess.run(command, cwd=workdir, capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results["escenarios"][name] = result
+
+            def triple(entry):
+                return "/".join(f"{entry[k]:.0f}" for k in ("p50", "p95", "p99")) if entry else "-"
+            print(f"{name:<18} {result['turnos']:6d} {triple(result['turno_ms']):>26} "
+                  f"{triple(result['primer_audio_ms']):>28} {result['cpu_ms_por_turno']:8.1f}ms "
+                  f"{result['rss_mb'] or 0:6.0f}MB")
+
+    base_path = args.base or (args.salida if os.path.exists(args.salida) else None)
+    regressions = 0
+    if base_path:
+        with open(base_path, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerancia)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {args.salida}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
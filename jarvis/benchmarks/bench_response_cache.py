@@ -0,0 +1,50 @@
+"""Latencia de inserción y búsqueda de ResponseCache con 10k y 100k comandos.
+
+Uso (desde jarvis/): python benchmarks/bench_response_cache.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.response_cache import ResponseCache
+
+TOPICS = ["clima", "fútbol", "recetas", "historia", "música", "películas", "noticias",
+          "astronomía", "programación", "viajes", "salud", "economía"]
+VERBS = ["contame sobre", "qué sabés de", "explicame", "decime algo de", "hablame de"]
+
+
+def make_commands(n, rng):
+    return [f"{rng.choice(VERBS)} {rng.choice(TOPICS)} número {i}" for i in range(n)]
+
+
+def bench(n, lookups=500, seed=1):
+    rng = random.Random(seed)
+    commands = make_commands(n, rng)
+    cache = ResponseCache(max_entries=n, max_bytes=1 << 40)
+
+    start = time.perf_counter()
+    for command in commands:
+        cache.add(command, f"Respuesta para {command}")
+    insert_s = time.perf_counter() - start
+
+    # Un tercio repetidos tal cual, un tercio con variaciones, un tercio nuevos
+    for i in range(lookups):
+        if i % 3 == 0:
+            cache.lookup(rng.choice(commands).upper() + "?")
+        elif i % 3 == 1:
+            cache.lookup(rng.choice(commands) + " por favor")
+        else:
+            cache.lookup(f"algo totalmente distinto {rng.random()}")
+
+    stats = cache.stats()
+    print(f"{n:>7} comandos | inserción {insert_s / n * 1e6:8.1f} µs/cmd | "
+          f"búsqueda media {stats['avg_lookup_ms']:7.2f} ms | máx {stats['max_lookup_ms']:7.2f} ms | "
+          f"hit rate {stats['hit_rate']:.0%} | {stats['bytes'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    for size in (10_000, 100_000):
+        bench(size)
@@ -0,0 +1,165 @@
+"""Prueba de carga del servidor de Jarvis: N clientes simultáneos, cada uno su usuario.
+
+El servidor corre en este proceso contra FakeOllamaServer (primer token y ritmo de
+tokens simulados), FakeWebServer y un navegador simulado; el máximo de sesiones es
+menor que la cantidad de usuarios para que el pool desaloje y vuelva a cargar. Cada
+cliente abre una conexión persistente y manda turnos de texto (y algunos de audio WAV)
+mezclando hora, caché de respuestas, búsquedas, videos y preguntas al modelo.
+Informa turnos por segundo, percentiles de la primera oración y del turno completo,
+y el estado del pool (sesiones, memoria de cachés, cargas y desalojos).
+Uso (desde jarvis/): python benchmarks/bench_server.py [--clientes 1,8,32] [--turnos 12]
+"""
+import argparse
+import http.client
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fakes import FakeOllamaServer, FakeRecognizer, FakeWebController, FakeWebServer
+from utils.metrics import Metrics
+from utils.web_lookup import WebLookup
+from server import JarvisServer
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "web")
+ANSWER = "Claro, te cuento. Es un proceso que convierte luz en energía. Ocurre en las hojas de las plantas."
+COMMANDS = [
+    "qué hora es",
+    "explícame el tema {u}",
+    "busca el clima en madrid",
+    "explícame el tema {u}",  # la segunda vez sale de la caché de respuestas del usuario
+    "reproduce música relajante",
+    "cuéntame un dato curioso sobre el número {u}{n}",
+]
+AUDIO_EVERY = 6  # uno de cada tantos turnos va como audio
+
+
+def command_wav(seconds=0.8, samplerate=16000):
+    t = np.arange(int(seconds * samplerate)) / samplerate
+    samples = (np.sin(2 * np.pi * 220 * t) * 8000).astype(np.int16)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(samplerate)
+        wav.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def client(address, user, turns, audio, results, errors):
+    connection = http.client.HTTPConnection(*address, timeout=60)
+    for n in range(turns):
+        as_audio = n % AUDIO_EVERY == AUDIO_EVERY - 1
+        if as_audio:
+            body, content_type = audio, "audio/wav"
+        else:
+            command = COMMANDS[n % len(COMMANDS)].format(u=user.split("_u")[1], n=n)
+            body, content_type = command.encode("utf-8"), "text/plain; charset=utf-8"
+        start = time.perf_counter()
+        connection.request("POST", f"/turno?usuario={user}", body=body, headers={"Content-Type": content_type})
+        response = connection.getresponse()
+        first = None
+        for line in iter(response.readline, b""):
+            message = json.loads(line)
+            if "oracion" in message and first is None:
+                first = time.perf_counter() - start
+            if "error" in message:
+                errors.append(message["error"])
+        total = time.perf_counter() - start
+        results.append({"primera": first if first is not None else total, "total": total, "audio": as_audio})
+    connection.close()
+
+
+def percentiles(values):
+    return {f"p{q}": float(np.percentile(values, q)) * 1000 for q in (50, 95, 99)}
+
+
+def run_level(address, clients, turns, audio):
+    results, errors = [], []
+    users = [f"c{clients}_u{i}" for i in range(clients)]
+    threads = [threading.Thread(target=client, args=(address, user, turns, audio, results, errors))
+               for user in users]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    first = percentiles([r["primera"] for r in results])
+    total = percentiles([r["total"] for r in results])
+    print(f"  {clients:>8} {len(results):>6} {len(results) / elapsed:8.1f} "
+          f"{first['p50']:7.0f} {first['p95']:7.0f} {first['p99']:7.0f} "
+          f"{total['p50']:7.0f} {total['p95']:7.0f} {total['p99']:7.0f} {len(errors):>6}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clientes", default="1,8,32", help="niveles de concurrencia, separados por coma")
+    parser.add_argument("--turnos", type=int, default=12, help="turnos por cliente")
+    parser.add_argument("--max-usuarios", type=int, default=16, help="sesiones cargadas a la vez")
+    args = parser.parse_args()
+    levels = [int(n) for n in args.clientes.split(",")]
+
+    audio = command_wav()
+    metrics = Metrics()
+    with tempfile.TemporaryDirectory() as workdir, \
+            FakeOllamaServer(ANSWER, token_delay=0.01, first_token_delay=0.2) as ollama, \
+            FakeWebServer(FIXTURES) as web:
+        config = {
+            "ollama": {"url": ollama.url},
+            "server": {"max_users": args.max_usuarios, "max_cache_mb": 64, "user_cache_mb": 1,
+                       "llm_connections": 16, "data_dir": os.path.join(workdir, "usuarios")},
+        }
+        # Todos los audios dicen lo mismo: el guion no depende del orden en que lleguen
+        recognizer = FakeRecognizer(["qué hora es"] * sum(levels) * args.turnos, delay=0.12)
+        jarvis_server = JarvisServer(config=config, recognizer=recognizer, web=FakeWebController(action_delay=0.06),
+                                     lookup=WebLookup(search_url=web.url + "/buscar?q=", youtube_url=web.url),
+                                     metrics=metrics)
+        address = jarvis_server.serve(port=0)
+        print(f"Servidor en http://{address[0]}:{address[1]}, {args.turnos} turnos por cliente, "
+              f"máx. {args.max_usuarios} sesiones, LLM: primer token 200 ms + 10 ms/token\n")
+        print(f"  {'clientes':>8} {'turnos':>6} {'turnos/s':>8} "
+              f"{'1ª p50':>7} {'1ª p95':>7} {'1ª p99':>7} {'tot p50':>7} {'tot p95':>7} {'tot p99':>7} {'errores':>6}")
+        errors = []
+        for clients in levels:
+            errors += run_level(address, clients, args.turnos, audio)
+        print("  (tiempos en ms; «1ª» es la primera oración recibida por el cliente)")
+
+        connection = http.client.HTTPConnection(*address)
+        connection.request("GET", "/estado")
+        status = json.loads(connection.getresponse().read())
+        connection.request("GET", "/metrics")
+        exposition = connection.getresponse().read().decode("utf-8")
+        connection.close()
+
+        sessions = status["sesiones"]
+        print(f"\nPool de sesiones: {sessions['sessions']} cargadas ({sessions['bytes'] / 1024:.0f} KiB de caché), "
+              f"{sessions['loads']} cargas, {sessions['hits']} reusos, {sessions['evictions']} desalojos")
+        print(f"Turnos atendidos: {status['turnos']}; consultas a Ollama: "
+              f"{sum(1 for r in ollama.requests if 'prompt' in r['body'])} por {len(ollama.connections)} conexiones TCP "
+              f"({status['llm']['deduplicadas']} pedidos iguales en curso compartieron respuesta)")
+        histograms = metrics.snapshot()["histograms"]
+        for name in ("sesion.carga", "asr", "cache_respuestas", "llm.cola", "llm.ttft", "llm"):
+            if name in histograms:
+                summary = histograms[name]
+                print(f"  {name:<18} n={summary['count']:<5} p50 {summary['p50'] * 1000:7.1f} ms  "
+                      f"p95 {summary['p95'] * 1000:7.1f} ms")
+        print(f"GET /metrics: {len(exposition.splitlines())} líneas")
+        print(f"RSS pico del proceso: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+        if errors:
+            print(f"Errores: {errors[:3]}")
+        jarvis_server.stop()
+
+
+if __name__ == "__main__":
+    main()
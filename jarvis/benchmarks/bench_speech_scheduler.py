@@ -0,0 +1,66 @@
+"""Demora entre que la respuesta está lista y empieza a sonar: cola FIFO vs. SpeechScheduler.
+
+Escenario típico: acuse ("Voy a ver..."), relleno de espera y luego la respuesta,
+con un TTS simulado de duración proporcional al texto.
+Uso (desde jarvis/): python benchmarks/bench_speech_scheduler.py
+"""
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fakes import FakeTTSBackend
+from utils.speech_scheduler import SpeechScheduler, PRIORITY_ANSWER
+
+SECONDS_PER_CHAR = 0.004
+ANSWER = "Señor, son las diez y cuarto."
+
+
+class FifoSpeech:
+    """Comportamiento anterior: una cola FIFO sin prioridades ni cancelación"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            text = self.queue.get()
+            self.backend.say(text)
+            self.queue.task_done()
+
+    def say(self, text, priority=None, filler=False):
+        self.queue.put(text)
+
+    def wait_idle(self):
+        self.queue.join()
+
+
+def scenario(speech, backend):
+    speech.say("Voy a ver...", filler=True)
+    time.sleep(0.01)
+    speech.say("Déjame pensar un momento...", filler=True)
+    time.sleep(0.02)
+    ready = time.perf_counter()
+    speech.say(ANSWER, priority=PRIORITY_ANSWER)
+    speech.wait_idle()
+    started = next(t for text, t in backend.started if text == ANSWER)
+    return started - ready
+
+
+def main(runs=10):
+    for name, factory in (("FIFO", FifoSpeech), ("SpeechScheduler", SpeechScheduler)):
+        delays = []
+        for _ in range(runs):
+            backend = FakeTTSBackend(seconds_per_char=SECONDS_PER_CHAR)
+            delays.append(scenario(factory(backend), backend))
+        print(f"{name:>16}: respuesta lista -> empieza a sonar: mediana {statistics.median(delays) * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Tiempo hasta que Jarvis puede escuchar: arranque secuencial vs. por etapas.
+
+Cada variante corre en un proceso nuevo (imports en frío). La secuencial reproduce el
+arranque anterior: importa y construye LearningEngine (sklearn + preferencias) antes
+que el resto. La nueva deja el aprendizaje en segundo plano; se informa también cuándo
+termina de cargar todo y el perfil por componente de StartupProfiler.
+Uso (desde jarvis/): python benchmarks/bench_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+JARVIS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 3
+
+CHILD = r"""
+import json, os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {jarvis_dir!r})
+config = {{"wake_word": {{"enabled": False}}, "audio_cache": {{"enabled": False}},
+          "startup": {{"report": False}}}}
+learning = None
+if {sequential!r}:
+    from utils.learning_engine import LearningEngine
+    learning = LearningEngine()
+from app import Jarvis
+jarvis = Jarvis(config=config, learning=learning)
+listening = time.perf_counter() - start
+jarvis._learning.wait()
+loaded = time.perf_counter() - start
+print(json.dumps({{"listening": listening, "loaded": loaded, "components": jarvis.profiler.summary()}}))
+"""
+
+
+def run(sequential):
+    with tempfile.TemporaryDirectory() as workdir:
+        code = CHILD.format(jarvis_dir=JARVIS_DIR, sequential=sequential)
+        output = subprocess.run([sys.executable, "-c", code], cwd=workdir, capture_output=True,
+                                text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    for name, sequential in (("secuencial (anterior)", True), ("por etapas", False)):
+        results = [run(sequential) for _ in range(RUNS)]
+        listening = sorted(r["listening"] for r in results)[RUNS // 2]
+        loaded = sorted(r["loaded"] for r in results)[RUNS // 2]
+        print(f"{name:<22} escuchando a los {listening * 1000:6.0f} ms | todo cargado a los {loaded * 1000:6.0f} ms")
+
+    print("\nPerfil del arranque por etapas (ms):")
+    for component, entry in run(False)["components"].items():
+        print(f"  {component:<24} import {entry['import'] * 1000:6.0f}  init {entry['init'] * 1000:6.0f}  ({entry['thread']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Detector de activación sobre grabaciones WAV (16 kHz, 16 bits, mono).
+
+Informa si se detectó la palabra clave, qué fracción del audio llegó a Vosk
+(el resto lo descartó la compuerta de energía) y el costo de CPU por segundo de audio.
+Uso (desde jarvis/): python benchmarks/bench_wake_word.py modelos/vosk-es grabacion1.wav [...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from vosk import Model, SetLogLevel
+
+from utils.audio_source import WavFileSource
+from utils.wake_word import WakeWordDetector
+
+
+def run(model, path, keyword="jarvis"):
+    detector = WakeWordDetector(keyword, model)
+    with WavFileSource(path) as source:
+        audio_seconds = 0.0
+        detected_at = None
+        cpu_start = time.process_time()
+        while True:
+            block = source.read()
+            if block is None:
+                break
+            audio_seconds += len(block) / 2 / source.samplerate
+            if detector.process(block) and detected_at is None:
+                detected_at = audio_seconds
+        cpu = time.process_time() - cpu_start
+
+    found = f"sí, a los {detected_at:.2f} s" if detected_at is not None else "no"
+    print(f"{os.path.basename(path)}: detectada: {found} | "
+          f"decodificado {detector.blocks_decoded / max(detector.blocks_seen, 1):.0%} del audio | "
+          f"CPU {cpu / max(audio_seconds, 1e-9) * 1000:.1f} ms por segundo de audio")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit(__doc__)
+    SetLogLevel(-1)
+    vosk_model = Model(sys.argv[1])
+    for wav_path in sys.argv[2:]:
+        run(vosk_model, wav_path)
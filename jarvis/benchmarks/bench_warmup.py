@@ -0,0 +1,271 @@
+"""Precalentamiento predictivo (WarmupScheduler) frente al de siempre, sobre un uso simulado.
+
+Se genera un historial de varias semanas con hábitos (mañanas de semana, noches,
+fines de semana a media mañana y consultas sueltas) con comandos habituales y únicos.
+Las primeras semanas se cargan en un LearningEngine real (log de interacciones y
+analyze_interaction_patterns) y las últimas se reproducen con un reloj virtual: Jarvis
+arranca a las 7:00, se apaga a medianoche y `_background_tasks` corre cada 30 s.
+Se comparan tres políticas:
+  - anterior: keep_warm cada 30 s todo el día y el navegador abierto al arrancar;
+  - sin precalentar: el modelo se carga recién cuando hace falta;
+  - predictivo: WarmupScheduler (modelo residente, navegador y precargas solo en las
+    franjas habituales o durante una conversación).
+Ollama, el navegador y las búsquedas se simulan con sus costos: carga del modelo en
+frío, keep_alive de 30 min, apertura de Chrome y caché de búsquedas con TTL.
+Uso (desde jarvis/): python benchmarks/bench_warmup.py [--dias 42] [--entrenamiento 21]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.intent_router import IntentRouter
+from utils.learning_engine import LearningEngine
+from utils.warmup import WarmupScheduler
+
+KEEP_ALIVE = 1800      # s que Ollama mantiene el modelo después del último pedido
+MODEL_LOAD = 6.0       # s para cargar el modelo en frío
+TTFT = 0.35            # s al primer fragmento con el modelo residente
+BROWSER_LAUNCH = 3.0   # s para abrir Chrome y las pestañas base
+SEARCH = 0.4           # s de una búsqueda por HTTP sin caché
+SEARCH_TTL = 600       # s que WebLookup guarda una búsqueda
+TICK = 30
+DAY_START, DAY_END = 7, 24
+
+HABITS = [
+    # (días, desde, hasta, probabilidad por día, comandos)
+    ("semana", (7, 30), (8, 15), 0.85, ["qué hora es", "cómo viene el tránsito para ir al trabajo",
+                                         "busca noticias de tecnología", "explícame la agenda de hoy"]),
+    ("semana", (20, 0), (21, 30), 0.6, ["reproduce música relajante", "cuéntame un dato curioso",
+                                        "explícame una receta para la cena"]),
+    ("finde", (10, 0), (11, 30), 0.75, ["busca el clima del fin de semana", "explícame un plan para el sábado",
+                                        "reproduce música para cocinar"]),
+]
+RARE = ["explícame la teoría de la relatividad", "cuéntame sobre la historia de roma", "busca vuelos baratos",
+        "explícame cómo funciona una batería", "cuál es la capital de mongolia", "busca recetas con lentejas"]
+
+
+def generate_usage(days, seed=0):
+    """[(datetime, comando)] de `days` días a partir de un lunes"""
+    rng = random.Random(seed)
+    start = datetime(2025, 3, 3)
+    events = []
+    for day in range(days):
+        date = start + timedelta(days=day)
+        kind = "finde" if date.weekday() >= 5 else "semana"
+        for habit_kind, (h0, m0), (h1, m1), probability, commands in HABITS:
+            if habit_kind != kind or rng.random() > probability:
+                continue
+            moment = date.replace(hour=h0, minute=m0) + timedelta(minutes=rng.uniform(0, (h1 - h0) * 60 + m1 - m0 - 10))
+            for command in rng.sample(commands, rng.randint(2, len(commands))):
+                events.append((moment, command))
+                moment += timedelta(seconds=rng.uniform(20, 90))
+        if rng.random() < 0.35:
+            moment = date.replace(hour=rng.randint(9, 22), minute=rng.randint(0, 59))
+            events.append((moment, rng.choice(RARE)))
+    return events
+
+
+def train(learning, events):
+    for moment, command in events:
+        learning.log_writer.write({'timestamp': moment.isoformat(), 'command': command,
+                                   'response': "Respuesta.", 'success': True})
+    learning.log_writer.flush()
+    learning.analyze_interaction_patterns()
+
+
+class SimulatedBackends:
+    """Ollama, navegador y búsquedas con reloj virtual; cuenta el tráfico y la latencia en frío"""
+
+    def __init__(self, learning, router):
+        self.learning = learning
+        self.router = router
+        self.now = 0.0
+        self.resident_until = -1.0
+        self.resident_since = None
+        self.last_request = None
+        self.browser_open_at = None
+        self.searches = {}
+        self.cold_turns = []
+        self.preloads = 0
+        self.prefetch_requests = 0
+        self.resident = 0.0
+        self.browser_hours = 0.0
+
+    def _touch(self, end):
+        """Pedido a Ollama que termina en `end`: el modelo queda residente KEEP_ALIVE más"""
+        cold = self.now > self.resident_until
+        if cold:
+            if self.resident_since is not None:
+                self.resident += self.resident_until - self.resident_since
+            self.resident_since = self.now
+        self.resident_until = end + KEEP_ALIVE
+        self.last_request = end
+        return cold
+
+    def keep_warm(self):
+        # Misma regla que OllamaClient.keep_warm: renueva cuando pasó la mitad del keep_alive
+        if self.last_request is None or self.now - self.last_request > KEEP_ALIVE / 2:
+            self.preloads += 1
+            self._touch(self.now + (MODEL_LOAD if self.now > self.resident_until else 0.0))
+
+    def warm_browser(self):
+        if self.browser_open_at is None:
+            self.browser_open_at = self.now
+
+    def prefetch(self, commands, moment):
+        for command in commands:
+            route = self.router.route(command)
+            if route.name == "buscar" and route.slots.get('query'):
+                self.searches[route.slots['query']] = self.now + SEARCH
+            elif route.name is None and not self.learning.response_cache.lookup(command, now=self.now):
+                self.prefetch_requests += 1
+                self._touch(self.now + TTFT)
+                self.learning.response_cache.add(command, f"Respuesta a {command}.", now=self.now)
+
+    def turn(self, command):
+        """Latencia hasta la primera respuesta útil de un comando, y si encontró algo frío"""
+        route = self.router.route(command)
+        if route.name in ("hora", "fecha"):
+            return 0.0, False
+        if route.name == "reproducir":
+            cold = self.browser_open_at is None or self.now < self.browser_open_at + BROWSER_LAUNCH
+            self.warm_browser()
+            if cold:
+                self.cold_turns.append((datetime.fromtimestamp(self.now), command))
+            return (BROWSER_LAUNCH if cold else 0.0) + 1.0, cold
+        latency = 0.0
+        if route.name == "buscar":
+            fetched = self.searches.get(route.slots.get('query'))
+            if fetched is None or self.now - fetched > SEARCH_TTL:
+                latency += SEARCH
+                self.searches[route.slots.get('query')] = self.now
+        elif self.learning.response_cache.lookup(command, now=self.now):
+            return 0.0, False
+        cold = self._touch(self.now + latency + TTFT)
+        latency += TTFT + (MODEL_LOAD if cold else 0.0)
+        if cold:
+            self.cold_turns.append((datetime.fromtimestamp(self.now), command))
+        if route.name is None:
+            self.learning.response_cache.add(command, f"Respuesta a {command}.", now=self.now)
+        return latency, cold
+
+    def close_day(self, day_end):
+        if self.resident_since is not None:
+            self.resident += min(self.resident_until, day_end) - self.resident_since
+            self.resident_since = None
+        if self.browser_open_at is not None:
+            self.browser_hours += (day_end - self.browser_open_at) / 3600
+        self.browser_open_at = None
+        self.resident_until = -1.0
+        self.last_request = None
+
+
+def replay(policy, history, replayed, workdir):
+    learning = LearningEngine(user_id=policy, data_dir=os.path.join(workdir, policy))
+    train(learning, history)
+    router = IntentRouter()
+    backends = SimulatedBackends(learning, router)
+
+    latencies, cold = [], 0
+    days = sorted({moment.date() for moment, _ in replayed})
+    first, last = days[0], days[-1]
+    date = first
+    pending = sorted(replayed)
+    index = 0
+    while date <= last:
+        start = datetime.combine(date, datetime.min.time()).replace(hour=DAY_START).timestamp()
+        end = start + (DAY_END - DAY_START) * 3600
+        todays = []
+        # Cada día es un arranque nuevo de Jarvis (y de su scheduler)
+        scheduler = WarmupScheduler(warm_model=backends.keep_warm, warm_browser=backends.warm_browser,
+                                    prefetch=backends.prefetch, clock=lambda: backends.now)
+        scheduler.note_interaction(start)  # arrancar cuenta como actividad
+        if policy == "anterior":
+            backends.now = start
+            backends.warm_browser()
+        scheduler.update(learning.preferences)
+        t = start
+        while t < end:
+            while index < len(pending) and pending[index][0].timestamp() < t + TICK:
+                moment, command = pending[index]
+                backends.now = moment.timestamp()
+                latency, was_cold = backends.turn(command)
+                latencies.append(latency)
+                cold += was_cold
+                scheduler.note_interaction(backends.now)
+                todays.append((moment, command))
+                index += 1
+            backends.now = t
+            if policy == "anterior":
+                backends.keep_warm()
+            elif policy == "predictivo":
+                scheduler.tick(t)
+            t += TICK
+        backends.close_day(end)
+        train(learning, todays)  # lo del día se aprende en el mantenimiento
+        date += timedelta(days=1)
+
+    learning.close()
+    n_days = (last - first).days + 1
+    return {
+        "turnos": len(latencies),
+        "en_frio": cold,
+        "p50": float(np.percentile(latencies, 50)),
+        "p95": float(np.percentile(latencies, 95)),
+        "media": float(np.mean(latencies)),
+        "precargas_dia": backends.preloads / n_days,
+        "precalculos_dia": backends.prefetch_requests / n_days,
+        "residente_h_dia": backends.resident / 3600 / n_days,
+        "navegador_h_dia": backends.browser_hours / n_days,
+        "turnos_en_frio": backends.cold_turns,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dias", type=int, default=42, help="días de uso simulados")
+    parser.add_argument("--entrenamiento", type=int, default=21, help="días que se aprenden antes de medir")
+    args = parser.parse_args()
+
+    events = generate_usage(args.dias)
+    cutoff = datetime(2025, 3, 3) + timedelta(days=args.entrenamiento)
+    history = [e for e in events if e[0] < cutoff]
+    replayed = [e for e in events if e[0] >= cutoff]
+    print(f"{len(history)} interacciones de historial ({args.entrenamiento} días), "
+          f"{len(replayed)} reproducidas ({args.dias - args.entrenamiento} días); "
+          f"carga en frío {MODEL_LOAD:.0f} s, keep_alive {KEEP_ALIVE // 60} min\n")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = {policy: replay(policy, history, replayed, workdir)
+                   for policy in ("anterior", "sin precalentar", "predictivo")}
+
+    print(f"  {'política':<16} {'precargas/día':>13} {'precálculos/día':>15} {'modelo h/día':>12} "
+          f"{'navegador h/día':>15} {'en frío':>8} {'media ms':>9} {'p95 ms':>8}")
+    for policy, r in results.items():
+        print(f"  {policy:<16} {r['precargas_dia']:13.1f} {r['precalculos_dia']:15.1f} {r['residente_h_dia']:12.1f} "
+              f"{r['navegador_h_dia']:15.1f} {r['en_frio']:>4}/{r['turnos']:<3} {r['media'] * 1000:9.0f} "
+              f"{r['p95'] * 1000:8.0f}")
+
+    before, cold, smart = results["anterior"], results["sin precalentar"], results["predictivo"]
+    traffic_before = before["precargas_dia"]
+    traffic_smart = smart["precargas_dia"] + smart["precalculos_dia"]
+    print(f"\nPredictivo frente a anterior: {traffic_before - traffic_smart:.1f} pedidos de precalentamiento "
+          f"menos por día ({(1 - traffic_smart / traffic_before) * 100:.0f}%), "
+          f"{before['residente_h_dia'] - smart['residente_h_dia']:.1f} h/día menos con el modelo en memoria")
+    print(f"Predictivo frente a sin precalentar: {cold['en_frio'] - smart['en_frio']} arranques en frío evitados, "
+          f"latencia media {cold['media'] * 1000:.0f} → {smart['media'] * 1000:.0f} ms, "
+          f"p95 {cold['p95'] * 1000:.0f} → {smart['p95'] * 1000:.0f} ms")
+    print("Siguen en frío con el predictivo (fuera de las franjas habituales):")
+    for moment, command in smart["turnos_en_frio"]:
+        print(f"  {moment.strftime('%a %H:%M')}  {command}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""WebController anterior vs. BrowserSession, contra páginas locales (FakeWebServer).
+
+Mide lo que bloquea al crear el controlador, la primera y las siguientes búsquedas,
+la reproducción de un video y cuántas imágenes y fuentes llegó a pedir Chrome. Las
+páginas imitan a Google y YouTube, con aviso de cookies y recursos que tardan
+`ASSET_DELAY` en descargarse. Ambos diseños corren sin ventana (headless) para poder
+compararlos en cualquier máquina; hace falta Chrome y su chromedriver.
+Uso (desde jarvis/): python benchmarks/bench_web_controller.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.browser_session import BrowserSession
+from utils.fakes import FakeWebServer
+from utils.web_controller import WebController
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "web")
+ASSET_DELAY = 0.2
+QUERIES = ["clima en madrid", "receta de empanadas", "quién ganó el partido"]
+
+
+class LegacyWebController:
+    """Comportamiento anterior: Chrome al construir, carga completa y esperas fijas"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        options = webdriver.ChromeOptions()
+        options.add_argument("--headless=new")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--mute-audio")
+        self.driver = webdriver.Chrome(options=options)
+        self.driver.set_page_load_timeout(15)
+
+    def play_youtube(self, query):
+        self.driver.get(f"{self.base_url}/results?search_query={query.replace(' ', '+')}")
+        self._dismiss_popups()
+        wait = WebDriverWait(self.driver, 10)
+        wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "ytd-video-renderer:first-child"))).click()
+        wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, ".ytp-fullscreen-button"))).click()
+
+    def search_web(self, query):
+        self.driver.get(f"{self.base_url}/search?q={query.replace(' ', '+')}")
+        self._dismiss_popups()
+
+    def _dismiss_popups(self):
+        try:
+            WebDriverWait(self.driver, 3).until(
+                EC.element_to_be_clickable((By.XPATH, "//*[contains(text(), 'Aceptar') or contains(text(), 'Acepto')]"))
+            ).click()
+        except:
+            pass
+
+    def close(self):
+        self.driver.quit()
+
+
+def timed(call, *args):
+    start = time.perf_counter()
+    call(*args)
+    return time.perf_counter() - start
+
+
+def run(name, server, make_controller, wait_ready=False):
+    server.requests.clear()
+    start = time.perf_counter()
+    controller = make_controller()
+    build = time.perf_counter() - start
+    if wait_ready:
+        # Jarvis lo precalienta mientras el usuario todavía habla
+        controller.session.wait_ready()
+    searches = [timed(controller.search_web, query) for query in QUERIES]
+    video = timed(controller.play_youtube, "música de queen")
+    print(f"{name:<28} crear {build:5.2f} s | búsquedas " +
+          " ".join(f"{t:5.2f}" for t in searches) +
+          f" s | video {video:5.2f} s | imágenes y fuentes pedidas: {len(server.assets_requested())}")
+    controller.close()
+
+
+def main():
+    if not any(shutil.which(name) for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")):
+        print("Este benchmark necesita Chrome (o Chromium) y chromedriver instalados.")
+        return
+
+    profile = tempfile.mkdtemp(prefix="jarvis_perfil_")
+    try:
+        with FakeWebServer(FIXTURES, asset_delay=ASSET_DELAY) as server:
+            def session_controller():
+                session = BrowserSession(headless=True, profile_dir=profile,
+                                         warm_urls={"buscar": server.url, "youtube": server.url + "/results"})
+                return WebController(session, search_url=server.url + "/search?q=", youtube_url=server.url)
+
+            run("anterior", server, lambda: LegacyWebController(server.url))
+            # Primera sesión con el perfil nuevo: aparece el aviso de cookies
+            run("BrowserSession (perfil nuevo)", server, session_controller, wait_ready=True)
+            # Segunda sesión: el perfil ya recuerda el consentimiento
+            run("BrowserSession (mismo perfil)", server, session_controller, wait_ready=True)
+    finally:
+        shutil.rmtree(profile, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Búsquedas y videos por HTTP (WebLookup) vs. una página renderizada en Chrome.
+
+Contra páginas locales grabadas (FakeWebServer) con el peso de las reales
+(`PAGE_PADDING`): mide la latencia en frío y con caché, cuánto se descarga de cada
+página y qué resultados le llegan al modelo. Si hay Chrome instalado, compara con
+cargar la misma página en el navegador (sin ventana).
+Uso (desde jarvis/): python benchmarks/bench_web_lookup.py
+"""
+import os
+import shutil
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fakes import FakeWebServer
+from utils.web_lookup import WebLookup
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "web")
+PAGE_PADDING = 600 * 1024  # una página de resultados real pesa cientos de KB
+QUERIES = [f"clima en madrid {i}" for i in range(20)]
+
+
+def median_ms(call, queries):
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        call(query)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def chrome_ms(url, queries):
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    driver = webdriver.Chrome(options=options)
+    try:
+        return median_ms(lambda query: driver.get(url + query.replace(" ", "+")), queries)
+    finally:
+        driver.quit()
+
+
+def main():
+    with FakeWebServer(FIXTURES, page_padding=PAGE_PADDING) as server:
+        search_url = server.url + "/buscar?q="
+        lookup = WebLookup(search_url=search_url, youtube_url=server.url)
+        page_kb = (os.path.getsize(os.path.join(FIXTURES, "buscar.html")) + PAGE_PADDING) / 1024
+
+        cold = median_ms(lookup.search, QUERIES)
+        read_kb = lookup.bytes_read / len(QUERIES) / 1024
+        cached = median_ms(lookup.search, QUERIES)
+        print(f"Búsqueda HTTP: en frío {cold:.1f} ms, con caché {cached:.3f} ms | "
+              f"se leen {read_kb:.0f} KB de {page_kb:.0f} KB por página | "
+              f"{lookup.fetches} descargas, {lookup.cache_hits} aciertos de caché")
+
+        lookup.bytes_read = 0
+        video = median_ms(lookup.resolve_video, QUERIES)
+        print(f"Video resuelto por HTTP: {video:.1f} ms, {lookup.bytes_read / len(QUERIES) / 1024:.0f} KB "
+              f"por página -> {lookup.resolve_video(QUERIES[0])}")
+
+        print("\nLo que recibe el modelo:")
+        print(lookup.summarize(lookup.search(QUERIES[0])))
+
+        if any(shutil.which(name) for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser")):
+            print(f"\nMisma página renderizada en Chrome: {chrome_ms(search_url, QUERIES[:5]):.1f} ms")
+        else:
+            print("\n(Sin Chrome instalado: se omite la comparación con el navegador)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""Jarvis como servidor local para varios usuarios a la vez.
+
+POST /turno?usuario=<id> con el comando en texto (text/plain) o en audio (audio/wav,
+PCM de 16 bits mono) responde en NDJSON a medida que avanza: {"texto": ...} si hubo
+que reconocer audio, una línea {"oracion": ...} por oración y al final {"fin": true}.
+GET /estado muestra las sesiones cargadas y GET /metrics las métricas (Prometheus).
+No carga la voz ni el micrófono; el navegador (selenium) recién si hace falta.
+"""
+import io
+import json
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from utils.audio_stream import Utterance
+from utils.conversation import ConversationManager
+from utils.intent_router import IntentRouter
+from utils.llm_client import OllamaClient
+from utils.metrics import Metrics
+from utils.pipeline import CommandPipeline, record_llm_timing
+from utils.recognizers import create_recognizer
+from utils.session_pool import SessionPool
+from utils.web_lookup import WebLookup
+
+
+class UserSession(CommandPipeline):
+    """Estado de un usuario: aprendizaje, ruteo y conversación propios; modelo y web compartidos"""
+
+    def __init__(self, user_id, learning, server):
+        self.user_id = user_id
+        self.learning = learning
+        self.user_name = server.user_name
+        self.model = server.model
+        self.lookup = server.lookup
+        self.web = server.web
+        self.metrics = server.metrics
+        self.router = IntentRouter()
+        self._update_router(learning.preferences)
+        learning.on_learn(self._update_router)
+        self.conversation = ConversationManager(
+            system_prompt=f"Eres Jarvis, el asistente de voz de {self.user_name}. Responde en español, breve y natural.",
+            token_budget=server.context_tokens
+        )
+        # Un turno por vez por usuario: la conversación con el modelo es una sola
+        self._turn_lock = threading.Lock()
+
+    def _update_router(self, preferences):
+        self.router.update(preferences['corrections'], preferences['media_patterns'])
+
+    def turn(self, text):
+        """Oraciones de la respuesta a medida que están listas (mismo recorrido que Jarvis)"""
+        with self._turn_lock, self.metrics.span("turno", usuario=self.user_id):
+            with self.metrics.span("ruteo") as span:
+                route = self.router.route(text)
+                span.set(intencion=route.name)
+            if route.name == "cancelar":
+                yield "De acuerdo."
+                return
+
+            try:
+                response = self._check_quick_actions(text, route)
+                if response:
+                    yield response
+                else:
+                    sources = None
+                    if route.name == "buscar" and route.slots.get('query'):
+                        sources = self._search_sources(route.slots['query'])
+                    response = None if sources else self._execute_associated_actions(text, route)
+                    if response:
+                        yield response
+                    else:
+                        response = yield from self._answer(text, sources)
+                self.learning.log_interaction(command=text, response=response, success=True)
+            except Exception as e:
+                print(f"Error en el turno de {self.user_id}: {e}")
+                error_msg = f"Disculpa {self.user_name}, hubo un error al procesar tu solicitud."
+                self.learning.log_interaction(text, error_msg, False)
+                yield error_msg
+
+    def _answer(self, text, sources):
+        """Oraciones del modelo; devuelve la respuesta completa para el registro"""
+        spoken = []
+        for sentence in self._stream_ai_sentences(text, sources):
+            spoken.append(sentence)
+            yield sentence
+        if not spoken:
+            yield self.FALLBACK_RESPONSE
+            return self.FALLBACK_RESPONSE
+        response = " ".join(spoken)
+        if not sources:
+            # Un resumen de resultados web envejece: no se guarda en la caché de respuestas
+            self.learning.remember_response(text, response)
+        return response
+
+    def maintain(self):
+        """Aprende de las interacciones nuevas y purga la caché; se saltea si hay un turno en curso"""
+        if not self._turn_lock.acquire(blocking=False):
+            return False
+        try:
+            self.learning.log_writer.flush()
+            self.learning.analyze_interaction_patterns()
+            self.learning.response_cache.purge_expired()
+        finally:
+            self._turn_lock.release()
+        return True
+
+    def close(self):
+        # Lo último que dijo el usuario también se aprende antes de descargar la sesión
+        with self._turn_lock:
+            self.learning.log_writer.flush()
+            try:
+                self.learning.analyze_interaction_patterns()
+            except Exception as e:
+                print(f"Error al analizar las interacciones de {self.user_id}: {e}")
+            self.learning.close()
+
+
+class JarvisServer:
+    """Atiende turnos de muchos clientes a la vez (un hilo por conexión).
+
+    El cliente de Ollama (con su pool de conexiones), el reconocedor de voz (un solo
+    modelo de Vosk), las búsquedas HTTP y el navegador son únicos y compartidos. Lo de
+    cada usuario vive en un SessionPool: se carga al primer pedido y las sesiones menos
+    usadas se cierran cuando se pasa del máximo de usuarios o de memoria. Cada
+    `maintenance_interval` segundos un hilo aparte hace el mantenimiento de cada sesión
+    cargada (aprender de las interacciones y purgar la caché), como Jarvis en un equipo.
+    """
+
+    def __init__(self, config=None, recognizer=None, model=None, web=None, lookup=None, metrics=None,
+                 learning_factory=None):
+        if config is None:
+            with open('config.json') as config_file:
+                config = json.load(config_file)
+        self.config = config
+        settings = config.get("server", {})
+        self.user_name = config.get("user_name", "Señor")
+        self.data_dir = settings.get("data_dir", "user_data")
+        self.context_tokens = config.get("ollama", {}).get("context_tokens", 1536)
+        self.user_cache_bytes = int(settings.get("user_cache_mb", 4) * 1024 * 1024)
+        self.maintenance_interval = settings.get("maintenance_interval", 30)
+
+        metrics_settings = config.get("metrics", {})
+        self.metrics = metrics or Metrics(enabled=metrics_settings.get("enabled", False),
+                                          trace_path=metrics_settings.get("trace_file"))
+        self.model = model or self._load_ai_model(settings.get("llm_connections", 8))
+        self.recognizer = recognizer or create_recognizer(config.get("speech_recognition", {}))
+        self.lookup = lookup or self._load_web_lookup()
+        self.web = web or self._load_web_controller()
+        self.learning_factory = learning_factory or self._load_learning
+        self.sessions = SessionPool(
+            self._open_session,
+            max_sessions=settings.get("max_users", 32),
+            max_bytes=int(settings.get("max_cache_mb", 256) * 1024 * 1024),
+            size=lambda session: session.learning.response_cache.bytes_used,
+            close=lambda session: session.close()
+        )
+        self.turns = 0
+        self.maintenance_runs = 0
+        self._httpd = None
+        self._stopping = threading.Event()
+
+    def _load_ai_model(self, connections):
+        settings = self.config.get("ollama", {})
+        return OllamaClient(
+            url=settings.get("url", "http://localhost:11434"),
+            model=settings.get("model", "gemma:2b"),
+            timeout=settings.get("timeout", 15),
+            connect_timeout=settings.get("connect_timeout", 5),
+            keep_alive=settings.get("keep_alive", 1800),
+            retries=settings.get("retries", 2),
+            backoff=settings.get("backoff", 0.5),
+            max_connections=connections,
+            on_timing=lambda timing: record_llm_timing(self.metrics, timing)
+        )
+
+    def _load_web_lookup(self):
+        settings = self.config.get("web_settings", {})
+        return WebLookup(
+            search_url=settings.get("search_url", "https://html.duckduckgo.com/html/?q="),
+            youtube_url=settings.get("youtube_url", "https://www.youtube.com"),
+            ttl=settings.get("lookup_ttl", 600)
+        )
+
+    def _load_web_controller(self):
+        """Un único navegador (se abre recién si algún usuario pide un video)"""
+        from utils.browser_session import BrowserSession
+        from utils.web_controller import WebController
+        settings = self.config.get("web_settings", {})
+        session = BrowserSession(
+            headless=settings.get("headless", False),
+            profile_dir=settings.get("profile_dir", "navegador"),
+            page_load_timeout=settings.get("timeout", 15)
+        )
+        return WebController(session, wait_timeout=settings.get("wait_timeout", 10))
+
+    def _load_learning(self, user_id):
+        from utils.learning_engine import LearningEngine
+        return LearningEngine(user_id=user_id, data_dir=self.data_dir, cache_max_bytes=self.user_cache_bytes)
+
+    def _open_session(self, user_id):
+        with self.metrics.span("sesion.carga"):
+            return UserSession(user_id, self.learning_factory(user_id), self)
+
+    def transcribe(self, wav_bytes):
+        """Texto de un WAV (PCM de 16 bits mono) con el reconocedor compartido"""
+        with wave.open(io.BytesIO(wav_bytes), 'rb') as wav:
+            if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise ValueError("se espera audio PCM de 16 bits mono")
+            samplerate = wav.getframerate()
+            samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        with self.metrics.span("asr"):
+            session = self.recognizer.start(samplerate)
+            session.feed(samples)
+            return session.finish(Utterance(0, len(samples), samples, samplerate))
+
+    def handle_turn(self, user_id, text=None, audio=None):
+        """Recorre un turno entregando las líneas NDJSON de la respuesta"""
+        start = time.perf_counter()
+        if audio is not None:
+            text = self.transcribe(audio)
+            yield {"texto": text}
+            if not text:
+                yield {"fin": True, "ms": round((time.perf_counter() - start) * 1000, 1)}
+                return
+        with self.sessions.lease(user_id) as session:
+            for sentence in session.turn(text):
+                yield {"oracion": sentence}
+        self.turns += 1
+        yield {"fin": True, "ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    def maintain(self):
+        """Una ronda de mantenimiento sobre las sesiones cargadas; devuelve cuántas se atendieron"""
+        done = []
+
+        def maintain_session(session):
+            try:
+                if session.maintain():
+                    done.append(session.user_id)
+            except Exception as e:
+                print(f"Error en el mantenimiento de {session.user_id}: {e}")
+
+        self.sessions.visit(maintain_session)
+        self.maintenance_runs += len(done)
+        return len(done)
+
+    def _maintenance_loop(self):
+        while not self._stopping.wait(self.maintenance_interval):
+            self.maintain()
+
+    def status(self):
+        return {"turnos": self.turns, "sesiones": self.sessions.stats(), "mantenimientos": self.maintenance_runs,
+                "llm": {"deduplicadas": self.model.deduplicated, "ultima": self.model.last_timing}}
+
+    def serve(self, host="127.0.0.1", port=8765):
+        """Arranca el servidor en un hilo propio; devuelve (host, puerto)"""
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, name="servidor", daemon=True).start()
+        threading.Thread(target=self._maintenance_loop, name="mantenimiento", daemon=True).start()
+        return self._httpd.server_address
+
+    def stop(self):
+        self._stopping.set()
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        self.sessions.close_all()
+        self.metrics.close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # conexiones persistentes y respuestas por partes
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path == "/estado":
+                    self._send(200, "application/json", json.dumps(server.status(), ensure_ascii=False))
+                elif path == "/metrics":
+                    self._send(200, "text/plain; version=0.0.4", server.metrics.prometheus())
+                else:
+                    self._send(404, "text/plain", "no encontrado")
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                user_id = parse_qs(url.query).get("usuario", [""])[0]
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if url.path != "/turno" or not user_id:
+                    self._send(400, "text/plain", "uso: POST /turno?usuario=<id>")
+                    return
+                if self.headers.get("Content-Type", "").startswith("audio/"):
+                    lines = server.handle_turn(user_id, audio=body)
+                else:
+                    lines = server.handle_turn(user_id, text=body.decode("utf-8").strip())
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for line in lines:
+                        self._chunk(json.dumps(line, ensure_ascii=False) + "\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    lines.close()  # el cliente se fue: se corta el turno (y la generación)
+                    return
+                except Exception as e:
+                    self._chunk(json.dumps({"error": str(e)}, ensure_ascii=False) + "\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _chunk(self, text):
+                data = text.encode("utf-8")
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send(self, status, content_type, text):
+                data = text.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    jarvis_server = JarvisServer()
+    settings = jarvis_server.config.get("server", {})
+    host, port = jarvis_server.serve(settings.get("host", "127.0.0.1"), settings.get("port", 8765))
+    print(f"Servidor de Jarvis en http://{host}:{port} (POST /turno?usuario=<id>)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        print("\nApagando el servidor...")
+        jarvis_server.stop()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos de Jarvis se importan como `utils.x`, igual que desde jarvis/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import time
+import wave
+
+import numpy as np
+import pytest
+
+from app import Jarvis
+from utils.audio_source import WavFileSource
+from utils.fakes import FakeOllamaServer, FakeRecognizer, FakeTTSBackend, FakeWebController
+from utils.learning_engine import LearningEngine
+from utils.voice_engine import VoiceEngine
+
+RATE = 16000
+# La palabra clave de 0,5 a 1,1 s y el comando de 1,6 a 2,2 s, sin repetir "jarvis"
+BURSTS = (0.5, 1.6)
+BURST_SECONDS = 0.6
+
+
+def write_session_wav(path, seconds=4.0):
+    audio = np.zeros(int(seconds * RATE), dtype=np.int16)
+    t = np.arange(int(BURST_SECONDS * RATE)) / RATE
+    for start in BURSTS:
+        i = int(start * RATE)
+        audio[i:i + len(t)] = (4000 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(audio.tobytes())
+    return str(path)
+
+
+class ScriptedWakeWord:
+    """Detector de activación guionado: "oye" la palabra clave cuando la captura pasa `at` segundos.
+
+    Como el micrófono no se agota, las esperas siguientes no vuelven hasta `release()`:
+    lo que se diga mientras tanto se pierde.
+    """
+
+    def __init__(self, at):
+        self.at = at
+        self.waits = 0
+        self._released = threading.Event()
+
+    def release(self):
+        self._released.set()
+
+    def wait(self, source, timeout=None):
+        self.waits += 1
+        if self.waits > 1:
+            self._released.wait()
+            return False
+        while True:
+            block = source.read(timeout=0.5)
+            if block is None:
+                if source.eof:
+                    return False
+                continue
+            if source.position >= self.at * source.samplerate:
+                return True
+
+
+@pytest.fixture
+def ollama():
+    with FakeOllamaServer("Claro.") as server:
+        yield server
+
+
+def make_jarvis(tmp_path, ollama, voice):
+    config = {
+        "activation_word": "jarvis",
+        "response_delay": 60,
+        "ollama": {"url": ollama.url, "model": "fake", "timeout": 5},
+        "wake_word": {"enabled": False},
+        "audio_cache": {"enabled": False},
+        "startup": {"report": False},
+        "warmup": {"enabled": False},
+        "web_settings": {"prewarm": False},
+    }
+    learning = LearningEngine(data_dir=str(tmp_path / "user_data"))
+    return Jarvis(config=config, voice=voice, web=FakeWebController(), learning=learning)
+
+
+def test_command_right_after_the_wake_word_is_heard(tmp_path, ollama):
+    recognizer = FakeRecognizer(["qué hora es"])
+    voice = VoiceEngine(audio_source=WavFileSource(write_session_wav(tmp_path / "sesion.wav"), realtime=True),
+                        recognizer_backend=recognizer, tts_backend=FakeTTSBackend())
+    jarvis = make_jarvis(tmp_path, ollama, voice)
+    jarvis.wake_word = ScriptedWakeWord(at=1.3)
+
+    events = []
+    handle = jarvis.orchestrator.handle
+
+    async def record(event):
+        events.append(event)
+        if event[0] == "activate":
+            # El loop puede tardar en atender la activación; la escucha no la espera
+            await asyncio.sleep(0.3)
+        await handle(event)
+
+    jarvis.orchestrator.handle = record
+    runner = threading.Thread(target=lambda: asyncio.run(jarvis.orchestrator.run()), daemon=True)
+    runner.start()
+    try:
+        deadline = time.monotonic() + 6
+        while len(events) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        jarvis.wake_word.release()
+        jarvis.orchestrator.stop()
+        runner.join(2)
+        jarvis.learning.close()
+
+    assert [event[:2] for event in events] == [("activate",), ("command", "qué hora es")]
+    assert jarvis.wake_word.waits == 1
+
+
+def test_prefetch_does_not_count_as_cache_traffic(tmp_path, ollama):
+    jarvis = make_jarvis(tmp_path, ollama, VoiceEngine(tts_backend=FakeTTSBackend()))
+    cache = jarvis.learning.response_cache
+    cache.add("cuéntame un chiste", "Ya lo sabías.")
+    cache.add("explícame la fotosíntesis", "Convierte luz en energía.")
+
+    jarvis._prefetch(["cuéntame un chiste", "dame un dato curioso"], time.time())
+
+    assert (cache.hits, cache.exact_hits, cache.misses) == (0, 0, 0)
+    # El comando previsto no pasa adelante en el LRU
+    assert list(cache._entries)[:2] == ["cuentame un chiste", "explicame la fotosintesis"]
+    assert cache.nearest("dame un dato curioso") == "dame un dato curioso"
+    assert len([r for r in ollama.requests if "prompt" in r["body"]]) == 1
+    jarvis.learning.close()
@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+from utils.browser_session import BrowserSession
+from utils.fakes import FakeWebServer
+from utils.web_controller import WebController
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures", "web")
+URL = "http://sitio.test/search?q=clima"
+
+
+class StubButton:
+    def __init__(self):
+        self.clicks = 0
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        self.clicks += 1
+
+
+class StubDriver:
+    """Lo mínimo que usa WebDriverWait: el botón de aceptar aparece o no"""
+
+    def __init__(self, button=None):
+        self.button = button
+        self.lookups = 0
+
+    def find_element(self, by, value):
+        self.lookups += 1
+        if self.button is None:
+            raise NoSuchElementException(value)
+        return self.button
+
+
+def controller(tmp_path):
+    session = BrowserSession(headless=True, profile_dir=str(tmp_path / "perfil"))
+    return WebController(session, popup_timeout=0.1)
+
+
+def saved_consent(tmp_path):
+    with open(tmp_path / "perfil" / "jarvis_consentimientos.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_consent_is_recorded_only_after_the_click(tmp_path):
+    web = controller(tmp_path)
+    web._dismiss_popups(StubDriver(), URL)
+    assert web.session.needs_consent(URL)
+    assert not os.path.exists(tmp_path / "perfil" / "jarvis_consentimientos.json")
+
+    button = StubButton()
+    web._dismiss_popups(StubDriver(button), URL)
+    assert button.clicks == 1
+    assert not web.session.needs_consent(URL)
+    assert saved_consent(tmp_path) == ["sitio.test"]
+
+    # Ya aceptado: ni se busca el botón, tampoco con un perfil recién abierto
+    driver = StubDriver(StubButton())
+    controller(tmp_path)._dismiss_popups(driver, URL)
+    assert driver.lookups == 0
+
+
+def test_stops_waiting_for_a_notice_that_never_appears(tmp_path):
+    web = controller(tmp_path)
+    for _ in range(web.session.consent_attempts):
+        assert web.session.needs_consent(URL)
+        web._dismiss_popups(StubDriver(), URL)
+    assert not web.session.needs_consent(URL)
+
+
+def chrome_available():
+    return any(shutil.which(name) for name in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser"))
+
+
+@pytest.mark.skipif(not chrome_available(), reason="hace falta Chrome (o Chromium) y chromedriver")
+def test_accepts_the_fixture_notice_once_per_profile(tmp_path):
+    with FakeWebServer(FIXTURES) as server:
+        def open_controller():
+            session = BrowserSession(headless=True, profile_dir=str(tmp_path / "perfil"))
+            return WebController(session, search_url=server.url + "/search?q=", youtube_url=server.url)
+
+        web = open_controller()
+        assert web.search_web("clima en madrid")
+        with web.session.tab("buscar") as driver:
+            assert "consent=1" in driver.execute_script("return document.cookie")
+        web.close()
+
+        web = open_controller()
+        assert not web.session.needs_consent(server.url + "/search?q=x")
+        assert web.search_web("receta de empanadas")
+        web.close()
@@ -0,0 +1,41 @@
+import pytest
+
+from utils.intent_router import IntentRouter
+from utils.learning_engine import LearningEngine
+
+
+@pytest.mark.parametrize("text, name, query", [
+    ("abre la ventana", None, None),
+    ("abre video de gatos", "reproducir", "de gatos"),
+    ("pon música de queen", "reproducir", "música de queen"),
+    ("ponte cómodo", None, None),
+    ("qué hora es", "hora", None),
+    ("busca el clima en madrid", "buscar", "el clima en madrid"),
+    ("ahora ponte cómodo y dime la fecha", "fecha", None),
+])
+def test_builtin_triggers(text, name, query):
+    route = IntentRouter().route(text)
+    assert route.name == name
+    assert route.slots.get('query') == query
+
+
+def test_learned_patterns_only_extract_the_query_after_a_trigger():
+    router = IntentRouter(media_patterns=["quiero que", "pon música"])
+    assert router.route("quiero que me expliques la fotosintesis").name is None
+    route = router.route("pon música de los 80")
+    assert (route.name, route.slots['query']) == ("reproducir", "de los 80")
+
+
+def test_corrections_apply_before_routing():
+    route = IntentRouter(corrections={"reproduse": "reproduce"}).route("reproduse jazz")
+    assert (route.name, route.slots['query']) == ("reproducir", "jazz")
+
+
+def test_analyzer_learns_media_patterns_from_whole_words_only(tmp_path):
+    engine = LearningEngine("prueba", data_dir=str(tmp_path))
+    engine.log_interaction("quiero que me respondas en inglés", "Claro.", True)
+    engine.log_interaction("pon música relajante", "Listo.", True)
+    engine.log_writer.flush()
+    engine.analyze_interaction_patterns()
+    assert list(engine.preferences['media_patterns']) == ["pon música"]
+    engine.close()
@@ -0,0 +1,61 @@
+import json
+
+from utils.interaction_log import InteractionLogWriter
+from utils.log_tail import LogTailer
+
+
+def write_records(writer, start, count):
+    for n in range(start, start + count):
+        writer.write({"n": n, "relleno": "x" * 40})
+    writer.flush()
+
+
+def read_numbers(tailer):
+    return [json.loads(line)["n"] for line in tailer.iter_lines()]
+
+
+def wait_compressed(writer):
+    for thread in writer._compressing:
+        thread.join()
+
+
+def test_reads_every_segment_rotated_since_the_last_read(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    writer = InteractionLogWriter(path, segment_bytes=1000, flush_records=1, flush_interval=60)
+    tailer = LogTailer(path)
+    write_records(writer, 0, 5)
+    assert read_numbers(tailer) == list(range(5))
+
+    # Varias rotaciones entre dos lecturas
+    write_records(writer, 5, 80)
+    wait_compressed(writer)
+    assert read_numbers(tailer) == list(range(5, 85))
+    assert read_numbers(tailer) == []
+    writer.close()
+
+
+def test_resumes_from_the_saved_cursor_after_several_rotations(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    cursor = str(tmp_path / "log.cursor")
+    writer = InteractionLogWriter(path, segment_bytes=1000, flush_records=1, flush_interval=60)
+    write_records(writer, 0, 7)
+    tailer = LogTailer(path, cursor)
+    assert read_numbers(tailer) == list(range(7))
+    assert tailer.save_cursor()
+
+    write_records(writer, 7, 60)
+    wait_compressed(writer)
+    assert read_numbers(LogTailer(path, cursor)) == list(range(7, 67))
+    writer.close()
+
+
+def test_starts_over_when_the_log_is_truncated(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    with open(path, "w") as f:
+        f.write('{"n": 0}\n{"n": 1}\n')
+    tailer = LogTailer(path)
+    assert read_numbers(tailer) == [0, 1]
+
+    with open(path, "w") as f:
+        f.write('{"n": 2}\n')
+    assert read_numbers(tailer) == [2]
@@ -0,0 +1,39 @@
+import os
+
+from utils.preference_store import Preferences, PreferenceStore
+
+
+def open_store(tmp_path, **kwargs):
+    return PreferenceStore(str(tmp_path / "prefs.db"), backup_path=str(tmp_path / "prefs.bak.db"), **kwargs)
+
+
+def test_compaction_refreshes_the_backup(tmp_path):
+    store = open_store(tmp_path, checkpoint_every=2)
+    preferences = Preferences(store)
+    preferences['frequent_commands']['qué hora es'] = 3
+    store.save(preferences)
+    assert not os.path.exists(tmp_path / "prefs.bak.db")
+
+    store.save(preferences)
+    assert os.path.exists(tmp_path / "prefs.bak.db")
+    assert not os.path.exists(tmp_path / "prefs.bak.db.tmp")
+    store.close()
+
+
+def test_a_corrupt_database_is_restored_from_the_backup(tmp_path):
+    store = open_store(tmp_path)
+    preferences = Preferences(store)
+    preferences['frequent_commands']['qué hora es'] = 3
+    preferences['interaction_times'].append("2026-10-18T08:00:00")
+    store.save(preferences)
+    store.close()
+
+    with open(tmp_path / "prefs.db", "wb") as f:
+        f.write(b"esto no es una base de SQLite" * 100)
+
+    store = open_store(tmp_path)
+    preferences = Preferences(store)
+    assert preferences['frequent_commands'] == {'qué hora es': 3}
+    assert list(preferences['interaction_times']) == ["2026-10-18T08:00:00"]
+    assert os.path.exists(tmp_path / "prefs.db.danada")
+    store.close()
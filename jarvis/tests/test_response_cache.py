@@ -0,0 +1,53 @@
+import pytest
+
+from utils.response_cache import ResponseCache, command_signature, normalize_command
+
+CACHED = {
+    "cuánto es 2 más 2": "Cuatro.",
+    "cuánto es 15 por 12": "Ciento ochenta.",
+    "quiénes fueron los presidentes de Argentina en 1990": "Carlos Menem.",
+    "cuál es la capital de Francia": "París.",
+    "qué es la fotosíntesis": "La conversión de luz en energía química.",
+}
+
+
+@pytest.fixture
+def cache():
+    cache = ResponseCache()
+    for command, response in CACHED.items():
+        cache.add(command, response)
+    return cache
+
+
+@pytest.mark.parametrize("command", [
+    "cuánto es 2 más 3",
+    "cuanto es 15 por 13",
+    "quiénes fueron los presidentes de Argentina en 1999",
+    "cuál es la capital de Italia",
+    "cuánto es dos más dos",
+])
+def test_different_numbers_or_entities_miss(cache, command):
+    assert cache.lookup(command) is None
+
+
+@pytest.mark.parametrize("command, response", [
+    ("Cuánto es 2 más 2?", "Cuatro."),
+    ("cual es la capital de francia por favor", "París."),
+    ("Jarvis, qué es la fotosíntesis, por favor?", "La conversión de luz en energía química."),
+    ("quienes fueron los presidentes de argentina en 1990", "Carlos Menem."),
+])
+def test_rephrasings_of_the_same_question_hit(cache, command, response):
+    assert cache.lookup(command) == response
+
+
+def test_signature_keeps_number_order():
+    first = command_signature(normalize_command("cuánto es 2 menos 3"))
+    second = command_signature(normalize_command("cuánto es 3 menos 2"))
+    assert first != second
+
+
+def test_expired_entries_miss():
+    cache = ResponseCache(ttl=10)
+    cache.add("qué es la fotosíntesis", "Luz.", now=0)
+    assert cache.lookup("qué es la fotosíntesis por favor", now=5) == "Luz."
+    assert cache.lookup("qué es la fotosíntesis por favor", now=20) is None
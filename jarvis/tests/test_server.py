@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from utils.fakes import FakeOllamaServer, FakeWebController
+from server import JarvisServer
+
+JARVIS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ANSWER = "Claro, te cuento. Es un proceso que convierte luz en energía."
+
+
+@pytest.fixture
+def ollama():
+    with FakeOllamaServer(ANSWER) as server:
+        yield server
+
+
+def make_server(ollama, tmp_path, max_users=4):
+    config = {
+        "ollama": {"url": ollama.url},
+        "server": {"max_users": max_users, "data_dir": str(tmp_path / "usuarios"), "maintenance_interval": 60},
+    }
+    return JarvisServer(config=config, recognizer=object(), web=FakeWebController())
+
+
+def sentences(server, user, text):
+    return [line["oracion"] for line in server.handle_turn(user, text=text) if "oracion" in line]
+
+
+def prompts(ollama):
+    return [r["body"]["prompt"] for r in ollama.requests if "prompt" in r["body"]]
+
+
+def test_import_does_not_load_voice_or_browser():
+    code = ("import sys, server; print(sorted(set(sys.modules) & {'selenium', 'pyttsx3', 'speech_recognition', "
+            "'sounddevice', 'app', 'utils.voice_engine', 'utils.browser_session', 'utils.web_controller'}))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=JARVIS_DIR, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]"
+
+
+def test_response_cache_survives_eviction(ollama, tmp_path):
+    server = make_server(ollama, tmp_path, max_users=1)
+    first = sentences(server, "ana", "explícame la fotosíntesis")
+    sentences(server, "bruno", "explícame la relatividad")  # desaloja la sesión de ana
+    assert server.sessions.evictions == 1
+
+    asked = len(prompts(ollama))
+    assert sentences(server, "ana", "explícame la fotosíntesis") == [" ".join(first)]
+    assert len(prompts(ollama)) == asked
+    server.stop()
+
+
+def test_maintenance_learns_from_each_loaded_session(ollama, tmp_path):
+    server = make_server(ollama, tmp_path)
+    sentences(server, "ana", "pon música relajante")
+    sentences(server, "bruno", "qué hora es")
+    assert server.maintain() == 2
+
+    with server.sessions.lease("ana") as session:
+        assert list(session.learning.preferences['media_patterns']) == ["pon música"]
+        assert session.learning.preferences['frequent_commands']["pon música relajante"] == 1
+    with server.sessions.lease("bruno") as session:
+        assert session.learning.preferences['frequent_commands']["qué hora es"] == 1
+    server.stop()
+
+
+def test_evicted_sessions_learn_their_last_turns(ollama, tmp_path):
+    server = make_server(ollama, tmp_path, max_users=1)
+    sentences(server, "ana", "qué hora es")
+    sentences(server, "bruno", "qué hora es")
+    with server.sessions.lease("ana") as session:
+        assert session.learning.preferences['frequent_commands']["qué hora es"] == 1
+    server.stop()
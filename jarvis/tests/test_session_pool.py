@@ -0,0 +1,42 @@
+import threading
+import time
+
+from utils.learning_engine import LearningEngine
+from utils.session_pool import SessionPool
+
+
+def test_user_leased_again_while_closing_sees_the_saved_cache(tmp_path):
+    closing = threading.Event()
+
+    def slow_close(learning):
+        closing.set()
+        time.sleep(0.3)  # volcar al disco lleva su tiempo
+        learning.close()
+
+    pool = SessionPool(lambda user: LearningEngine(user, data_dir=str(tmp_path)), max_sessions=1, close=slow_close)
+    with pool.lease("ana") as learning:
+        learning.remember_response("explícame la fotosíntesis", "Convierte luz en energía.")
+
+    def other_user():
+        with pool.lease("bruno"):
+            pass  # al soltarla se desaloja la sesión de ana
+
+    evicting = threading.Thread(target=other_user)
+    evicting.start()
+    assert closing.wait(2)
+    with pool.lease("ana") as learning:
+        assert learning.response_cache.lookup("explícame la fotosíntesis") == "Convierte luz en energía."
+    evicting.join()
+    pool.close_all()
+    assert pool.evictions == 2
+
+
+def test_failed_close_does_not_block_the_user():
+    def broken_close(session):
+        raise OSError("disco lleno")
+
+    pool = SessionPool(lambda user: {"usuario": user}, max_sessions=1, close=broken_close)
+    for user in ("ana", "bruno", "ana"):
+        with pool.lease(user) as session:
+            assert session == {"usuario": user}
+    assert pool.evictions == 2 and not pool._closing
@@ -0,0 +1,130 @@
+import time
+
+import pytest
+
+from utils.fakes import FakeTTSBackend
+from utils.metrics import Metrics
+from utils.speech_scheduler import PRIORITY_ANSWER, PRIORITY_NORMAL, SpeechScheduler
+
+LONG = "x" * 200  # 2 s con 10 ms por carácter: siempre se corta antes
+
+
+def wait_speaking(speech, text, timeout=2):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if speech.current is not None and speech.current.text == text:
+            return
+        time.sleep(0.002)
+    pytest.fail(f"no empezó a sonar {text!r}")
+
+
+@pytest.fixture
+def backend():
+    return FakeTTSBackend(seconds_per_char=0.01)
+
+
+def test_higher_priority_jumps_the_queue(backend):
+    speech = SpeechScheduler(backend)
+    speech.say("uno")
+    wait_speaking(speech, "uno")
+    speech.say("dos", priority=PRIORITY_NORMAL)
+    speech.say("tres", priority=PRIORITY_NORMAL)
+    speech.say("respuesta", priority=PRIORITY_ANSWER)
+    assert speech.wait_idle(timeout=2)
+    assert backend.spoken == [("uno", True), ("respuesta", True), ("dos", True), ("tres", True)]
+
+
+def test_fillers_do_not_pile_up(backend):
+    speech = SpeechScheduler(backend)
+    first = speech.say(LONG, filler=True)
+    wait_speaking(speech, LONG)
+    second = speech.say("Déjame pensar...", filler=True)
+    assert second.cancelled and second.done.is_set()
+    assert speech.dropped_fillers == 1
+    speech.clear()
+    assert first.done.wait(1)
+
+
+def test_answer_preempts_playing_and_pending_fillers(backend):
+    speech = SpeechScheduler(backend)
+    speech.say("Voy a ver qué hay...")
+    wait_speaking(speech, "Voy a ver qué hay...")
+    filler = speech.say(LONG, filler=True)
+    # Mientras suena el acuse el relleno queda pendiente y la respuesta lo descarta
+    answer = speech.say("Son las diez.", priority=PRIORITY_ANSWER)
+    assert filler.cancelled and filler.done.is_set()
+    assert answer.done.wait(2) and not answer.interrupted.is_set()
+
+    playing = speech.say(LONG, filler=True)
+    wait_speaking(speech, LONG)
+    started = time.perf_counter()
+    speech.say("Listo.", priority=PRIORITY_ANSWER)
+    assert speech.wait_idle(timeout=2)
+    assert playing.interrupted.is_set() and not playing.cancelled
+    assert time.perf_counter() - started < 0.5
+    assert backend.spoken[-2:] == [(LONG, False), ("Listo.", True)]
+    assert speech.dropped_fillers == 1
+
+
+def test_answer_waits_for_filler_when_not_interrupting(backend):
+    speech = SpeechScheduler(backend, interrupt_filler=False)
+    backend.seconds_per_char = 0.002
+    speech.say("Déjame pensar...", filler=True)
+    wait_speaking(speech, "Déjame pensar...")
+    speech.say("Listo.", priority=PRIORITY_ANSWER)
+    assert speech.wait_idle(timeout=2)
+    assert backend.spoken == [("Déjame pensar...", True), ("Listo.", True)]
+
+
+def test_cancel_current_keeps_the_queue(backend):
+    speech = SpeechScheduler(backend)
+    current = speech.say(LONG)
+    wait_speaking(speech, LONG)
+    after = speech.say("sigue")
+    speech.cancel_current()
+    assert after.done.wait(2)
+    assert current.interrupted.is_set()
+    assert backend.spoken == [(LONG, False), ("sigue", True)]
+
+
+def test_barge_in_clears_everything(backend):
+    speech = SpeechScheduler(backend)
+    assert speech.barge_in() is False
+    current = speech.say(LONG)
+    wait_speaking(speech, LONG)
+    pending = [speech.say(LONG), speech.say("Déjame pensar...", filler=True)]
+    assert speech.barge_in() is True
+    assert speech.wait_idle(timeout=1)
+    assert current.interrupted.is_set()
+    assert all(item.cancelled and item.done.is_set() for item in pending)
+    assert backend.spoken == [(LONG, False)]
+    assert speech.barge_ins == 1
+
+
+def test_backend_errors_do_not_stop_the_worker(backend, monkeypatch):
+    say = backend.say
+
+    def failing(text, interrupted=None):
+        if text == "falla":
+            raise RuntimeError("sin audio")
+        say(text, interrupted)
+
+    monkeypatch.setattr(backend, "say", failing)
+    speech = SpeechScheduler(backend)
+    broken = speech.say("falla")
+    ok = speech.say("bien")
+    assert broken.done.wait(1) and ok.done.wait(1)
+    assert backend.spoken == [("bien", True)]
+
+
+def test_queue_and_voice_times_are_recorded(backend):
+    metrics = Metrics()
+    speech = SpeechScheduler(backend, metrics=metrics)
+    speech.say("hola")
+    speech.say("Déjame pensar...", filler=True)
+    speech.say("otra vez", filler=True)  # descartada: igual cierra su tramo
+    assert speech.wait_idle(timeout=2)
+    histograms = metrics.snapshot()["histograms"]
+    assert histograms["tts.cola"]["count"] == 2
+    assert histograms["tts.voz"]["count"] == 2
+    assert histograms["tts"]["count"] == 3
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from utils.fakes import FakeOllamaServer
+from utils.llm_client import OllamaClient
+from utils.streaming import iter_ndjson_tokens, iter_sentences
+
+ANSWER = "Claro, te cuento. La fotosíntesis convierte luz en energía. ¿Algo más?"
+
+
+def ndjson(*chunks):
+    return [json.dumps(chunk).encode("utf-8") for chunk in chunks]
+
+
+def test_ndjson_tokens_stop_at_done_and_report_it():
+    done = {}
+    lines = ndjson({"response": "Hola"}, {"response": ", "}, {"response": "qué tal", "done": False},
+                   {"response": "", "done": True, "context": [1, 2]}, {"response": "después"})
+    assert list(iter_ndjson_tokens(lines, on_done=done.update)) == ["Hola", ", ", "qué tal"]
+    assert done["context"] == [1, 2]
+
+
+def test_ndjson_skips_blank_and_broken_lines():
+    lines = [b"", b"{no es json", *ndjson({"response": "ok", "done": True})]
+    assert list(iter_ndjson_tokens(lines)) == ["ok"]
+
+
+def test_ndjson_error_is_raised():
+    with pytest.raises(RuntimeError, match="modelo no encontrado"):
+        list(iter_ndjson_tokens(ndjson({"error": "modelo no encontrado"})))
+
+
+@pytest.mark.parametrize("tokens, sentences", [
+    (["Hola. ", "Adiós."], ["Hola.", "Adiós."]),
+    (["Ho", "la", ".", " Qué", " tal", "? Bien"], ["Hola.", "Qué tal?", "Bien"]),
+    (["Espera", "…", " ya", " está", "!"], ["Espera…", "ya está!"]),
+    (["3.14 es pi"], ["3.14 es pi"]),  # sin espacio después del punto no corta
+    (["  ", ""], []),
+])
+def test_sentences_are_emitted_as_soon_as_they_end(tokens, sentences):
+    assert list(iter_sentences(tokens)) == sentences
+
+
+def test_first_sentence_arrives_before_the_generation_ends():
+    seen = []
+
+    def tokens():
+        for token in ["Primera", ". ", "Segunda", " oración."]:
+            seen.append(token)
+            yield token
+
+    sentences = iter_sentences(tokens())
+    assert next(sentences) == "Primera."
+    assert seen == ["Primera", ". "]
+
+
+def test_client_streams_sentences_from_ollama():
+    with FakeOllamaServer(ANSWER) as server:
+        client = OllamaClient(url=server.url, retries=0)
+        done = {}
+        sentences = list(iter_sentences(client.stream("explícame la fotosíntesis", on_done=done.update)))
+        client.close()
+    assert sentences == ["Claro, te cuento.", "La fotosíntesis convierte luz en energía.", "¿Algo más?"]
+    assert done["context"]
+    assert server.requests[0]["body"]["stream"] is True
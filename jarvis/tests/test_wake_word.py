@@ -0,0 +1,169 @@
+import json
+import sys
+import types
+import wave
+
+import numpy as np
+import pytest
+
+from utils.audio_source import WavFileSource
+from utils.audio_stream import AudioCapture, VoiceActivityDetector
+from utils.wake_word import WakeWordDetector
+
+RATE = 16000
+BLOCK = 1600  # 100 ms, como MicrophoneSource
+
+
+def tone(seconds, amplitude=3000):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * RATE), dtype=np.int16)
+
+
+def write_wav(path, *parts):
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(np.concatenate(parts).tobytes())
+    return str(path)
+
+
+class ScriptedKaldi:
+    """Reemplazo de KaldiRecognizer: "oye" `heard` cuando le llegaron `after` bloques"""
+
+    heard = "jarvis"
+    after = 2
+
+    def __init__(self, model, samplerate, grammar):
+        self.grammar = json.loads(grammar)
+        self.blocks = []
+
+    def AcceptWaveform(self, data):
+        self.blocks.append(data)
+        return False
+
+    def PartialResult(self):
+        text = self.heard if len(self.blocks) >= self.after else ""
+        return json.dumps({"partial": text})
+
+    def Result(self):
+        return json.dumps({"text": ""})
+
+    def Reset(self):
+        self.blocks = []
+
+
+@pytest.fixture
+def kaldi(monkeypatch):
+    # Vosk no está en el entorno de pruebas; solo se reemplaza el reconocedor
+    monkeypatch.setitem(sys.modules, "vosk", types.SimpleNamespace(KaldiRecognizer=ScriptedKaldi))
+    monkeypatch.setattr(ScriptedKaldi, "heard", "jarvis")
+    monkeypatch.setattr(ScriptedKaldi, "after", 2)
+    return ScriptedKaldi
+
+
+def blocks(samples):
+    return [samples[i:i + BLOCK].tobytes() for i in range(0, len(samples), BLOCK)]
+
+
+def test_silence_never_reaches_the_recognizer(kaldi):
+    detector = WakeWordDetector("Jarvis", model=None)
+    assert detector._recognizer.grammar == ["jarvis", "[unk]"]
+    assert not any(detector.process(block) for block in blocks(silence(2)))
+    assert detector.blocks_seen == 20
+    assert detector.blocks_decoded == 0
+
+
+def test_voice_is_decoded_with_preroll_and_detects_keyword(kaldi):
+    kaldi.after = 5
+    detector = WakeWordDetector("jarvis", model=None, preroll_blocks=3)
+    results = []
+    for block in blocks(np.concatenate([silence(1), tone(0.5)])):
+        results.append(detector.process(block))
+        if results[-1]:
+            break
+    # Los 3 bloques previos a la voz llegan junto con el primero con voz
+    assert len(results) == 12
+    assert detector.blocks_decoded == 3 + 2
+    assert detector._recognizer.blocks == []  # se reinicia tras detectar
+
+
+def test_hangover_keeps_decoding_then_gates_again(kaldi):
+    kaldi.after = 1000
+    detector = WakeWordDetector("jarvis", model=None, preroll_blocks=0, hangover_blocks=5)
+    for block in blocks(np.concatenate([tone(0.3), silence(1.5)])):
+        detector.process(block)
+    assert detector.blocks_decoded == 3 + 5
+
+
+def test_other_words_do_not_wake(kaldi):
+    kaldi.heard = "jarvisito [unk]"
+    detector = WakeWordDetector("jarvis", model=None)
+    assert not any(detector.process(block) for block in blocks(tone(1)))
+    assert detector.blocks_decoded > 0
+
+
+def test_wait_stops_at_end_of_file(kaldi, tmp_path):
+    kaldi.heard = "[unk]"
+    detector = WakeWordDetector("jarvis", model=None)
+    with WavFileSource(write_wav(tmp_path / "otra.wav", silence(0.5), tone(0.5))) as source:
+        assert detector.wait(source) is False
+
+    kaldi.heard = "jarvis"
+    detector = WakeWordDetector("jarvis", model=None)
+    with WavFileSource(write_wav(tmp_path / "jarvis.wav", silence(0.5), tone(0.5), silence(5))) as source:
+        assert detector.wait(source, timeout=2) is True
+
+
+def capture_utterances(path, **options):
+    capture = AudioCapture(WavFileSource(path, blocksize=BLOCK))
+    vad = VoiceActivityDetector(capture, **options)
+    capture.start()
+    try:
+        found = []
+        while True:
+            utterance = vad.next_utterance(timeout=2)
+            if utterance is None:
+                return found
+            found.append(utterance)
+    finally:
+        capture.stop()
+
+
+def test_vad_splits_utterances_on_pauses(tmp_path):
+    path = write_wav(tmp_path / "dos.wav", silence(0.5), tone(1), silence(1), tone(0.6), silence(1))
+    first, second = capture_utterances(path, pause_threshold=0.3, preroll=0.1)
+    assert first.start == pytest.approx(0.4 * RATE, abs=VoiceActivityDetector.FRAME_MS * RATE / 1000)
+    assert 1.5 * RATE < first.end <= 1.9 * RATE
+    assert second.start > first.end
+    assert 0.6 < second.duration < 1.1
+    assert len(first.to_bytes()) == (first.end - first.start) * 2
+
+
+def test_vad_ignores_clicks_shorter_than_start_frames(tmp_path):
+    path = write_wav(tmp_path / "clic.wav", silence(0.5), tone(0.03), silence(1))
+    assert capture_utterances(path, start_frames=3, pause_threshold=0.3) == []
+
+
+def test_vad_cuts_at_phrase_time_limit(tmp_path):
+    path = write_wav(tmp_path / "largo.wav", tone(3), silence(0.5))
+    utterances = capture_utterances(path, phrase_time_limit=1, pause_threshold=0.3, preroll=0)
+    assert utterances[0].duration == pytest.approx(1, abs=0.05)
+    assert sum(u.duration for u in utterances) == pytest.approx(3, abs=0.4)
+
+
+def test_vad_streams_the_utterance_audio(tmp_path):
+    path = write_wav(tmp_path / "flujo.wav", silence(0.5), tone(1), silence(1))
+    capture = AudioCapture(WavFileSource(path, blocksize=BLOCK))
+    vad = VoiceActivityDetector(capture, pause_threshold=0.3, preroll=0.1)
+    chunks = []
+    capture.start()
+    try:
+        utterance = vad.next_utterance(timeout=2, on_audio=lambda view: chunks.append(bytes(view)))
+    finally:
+        capture.stop()
+    assert b"".join(chunks) == utterance.to_bytes()
@@ -0,0 +1,116 @@
+import os
+
+import pytest
+
+from utils.fakes import FakeWebServer
+from utils.web_lookup import ResultsParser, WebLookup
+
+PAGE = """<html><head>{meta}<title>r</title></head><body>
+<a class="result__a" href="https://es.wikipedia.org/wiki/Canci%C3%B3n">Canción del año en España</a>
+<a class="result__snippet" href="#">Más información sobre la canción más escuchada.</a>
+</body></html>"""
+
+
+def serve_page(tmp_path, data, content_type):
+    (tmp_path / "buscar.html").write_bytes(data)
+    return FakeWebServer(str(tmp_path), html_content_type=content_type)
+
+
+@pytest.mark.parametrize("meta, encoding, content_type", [
+    ("", "utf-8", "text/html"),
+    ('<meta charset="utf-8">', "utf-8", "text/html"),
+    ('<meta http-equiv="Content-Type" content="text/html; charset=iso-8859-1">', "latin-1", "text/html"),
+    ("", "latin-1", "text/html; charset=ISO-8859-1"),
+    ("", "cp1252", "text/html"),
+])
+def test_accents_survive_when_the_header_has_no_charset(tmp_path, meta, encoding, content_type):
+    with serve_page(tmp_path, PAGE.format(meta=meta).encode(encoding), content_type) as server:
+        lookup = WebLookup(search_url=server.url + "/buscar?q=")
+        results = lookup.search("canción")
+    assert [result.title for result in results] == ["Canción del año en España"]
+    assert results[0].snippet == "Más información sobre la canción más escuchada."
+
+
+def test_multibyte_characters_split_across_chunks(tmp_path):
+    with serve_page(tmp_path, PAGE.format(meta="").encode("utf-8"), "text/html") as server:
+        lookup = WebLookup(search_url=server.url + "/buscar?q=", chunk_size=7)
+        results = lookup.search("canción")
+    assert results[0].title == "Canción del año en España"
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures", "web")
+
+
+@pytest.fixture
+def web():
+    with FakeWebServer(FIXTURES) as server:
+        yield server
+
+
+def test_results_are_parsed_from_the_search_page(web):
+    lookup = WebLookup(search_url=web.url + "/buscar?q=")
+    results = lookup.search("clima en madrid")
+    assert [result.title for result in results] == [
+        "El tiempo en Madrid - AEMET",
+        "Tiempo en Madrid, pronóstico para 14 días",
+        "Pronóstico del tiempo para hoy en Madrid",
+    ]
+    # El destino real sale de la redirección /l/?uddg=
+    assert results[0].url == "https://www.aemet.es/es/eltiempo/prediccion/municipios/madrid"
+    assert results[0].snippet.startswith("Predicción para hoy: cielo despejado, máxima de 24 °C")
+    assert lookup.summarize(results[:1], snippet_chars=20) == "- El tiempo en Madrid - AEMET: Predicción para hoy:"
+
+
+def test_parser_handles_nested_tags_and_relative_links():
+    parser = ResultsParser("https://buscador.example/html/?q=x", limit=2)
+    parser.feed('<div><a class="result__a extra" href="/pagina"><span>Uno <i>dos</i></span> tres</a>'
+                '<div class="result__snippet">Resumen <b>uno</b></div>'
+                '<a class="result__a" href="https://otro.example/">Segundo</a>'
+                '<a class="result__a" href="/tercero">Sobra</a></div>')
+    assert [(r.title, r.url, r.snippet) for r in parser.results] == [
+        ("Uno dos tres", "https://buscador.example/pagina", "Resumen uno"),
+        ("Segundo", "https://otro.example/", ""),
+    ]
+    assert parser.done
+
+
+def test_download_stops_once_the_results_are_in():
+    with FakeWebServer(FIXTURES, page_padding=512 * 1024) as server:
+        lookup = WebLookup(search_url=server.url + "/buscar?q=", chunk_size=1024)
+        assert len(lookup.search("clima en madrid", limit=1)) == 1
+    assert lookup.bytes_read < 64 * 1024
+
+
+@pytest.mark.parametrize("chunk_size", [16 * 1024, 5])
+def test_video_id_is_found_even_split_across_chunks(web, chunk_size):
+    lookup = WebLookup(youtube_url=web.url + "/", chunk_size=chunk_size)
+    assert lookup.resolve_video("never gonna give you up") == web.url + "/watch?v=dQw4w9WgXcQ"
+
+
+def test_answers_are_cached_until_they_expire(web):
+    lookup = WebLookup(search_url=web.url + "/buscar?q=")
+    first = lookup.search("Clima en Madrid")
+    assert lookup.search("clima en madrid") == first
+    assert (lookup.fetches, lookup.cache_hits) == (1, 1)
+
+    expired = WebLookup(search_url=web.url + "/buscar?q=", ttl=0)
+    expired.search("clima")
+    expired.search("clima")
+    assert (expired.fetches, expired.cache_hits) == (2, 0)
+
+
+def test_failures_and_empty_answers_are_not_cached(web):
+    lookup = WebLookup(search_url=web.url + "/no-existe?q=", youtube_url=web.url + "/nada")
+    assert lookup.search("clima") == []
+    assert lookup.search("clima") == []
+    assert lookup.resolve_video("video") is None
+    assert lookup.fetches == 3 and lookup.cache_hits == 0
+
+
+def test_cache_keeps_only_the_most_recent_entries(web):
+    lookup = WebLookup(search_url=web.url + "/buscar?q=", max_entries=2)
+    for query in ("uno", "dos", "uno", "tres"):
+        lookup.search(query)
+    lookup.search("uno")
+    lookup.search("dos")  # desalojada: era la menos usada
+    assert lookup.fetches == 4
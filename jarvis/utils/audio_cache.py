@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import wave
+
+import numpy as np
+
+from utils.metrics import NULL_METRICS
+
+
+class AudioCache:
+    """Clips de voz ya sintetizados, direccionados por contenido (texto + voz + velocidad + volumen).
+
+    Cada clip es un WAV en `cache_dir`; el mtime hace de marca LRU y, si el total
+    supera `max_bytes`, se borran los menos usados.
+    """
+
+    def __init__(self, cache_dir="audio_cache", max_bytes=50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._sizes = {
+            entry.path: entry.stat().st_size
+            for entry in os.scandir(cache_dir) if entry.name.endswith(".wav")
+        }
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text, voice, rate, volume):
+        signature = json.dumps([text, voice, rate, volume], ensure_ascii=False)
+        return hashlib.sha1(signature.encode('utf-8')).hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key + ".wav")
+
+    def get(self, key):
+        path = self.path_for(key)
+        with self._lock:
+            if path not in self._sizes:
+                self.misses += 1
+                return None
+            self.hits += 1
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.discard(key)
+            return None
+        return path
+
+    def add(self, key, rendered_path):
+        path = self.path_for(key)
+        os.replace(rendered_path, path)
+        with self._lock:
+            self._sizes[path] = os.path.getsize(path)
+        self._evict()
+
+    def discard(self, key):
+        path = self.path_for(key)
+        with self._lock:
+            self._sizes.pop(path, None)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        with self._lock:
+            total = sum(self._sizes.values())
+            if total <= self.max_bytes:
+                return
+            by_age = sorted(self._sizes, key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)
+            for path in by_age:
+                if total <= self.max_bytes:
+                    break
+                total -= self._sizes.pop(path)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+class WavPlayer:
+    """Reproduce WAVs con sounddevice; la reproducción se puede cortar"""
+
+    def __init__(self):
+        import sounddevice as sd
+        self._sd = sd
+        self._clips = {}  # ruta -> (muestras, frecuencia), los clips fijos son pocos y cortos
+
+    def _load(self, path):
+        if path not in self._clips:
+            with wave.open(path, 'rb') as wav:
+                if wav.getsampwidth() != 2:
+                    raise ValueError(f"{path}: se esperan 16 bits")
+                samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+                samples = samples.reshape(-1, wav.getnchannels())
+                self._clips[path] = (samples, wav.getframerate())
+        return self._clips[path]
+
+    def play(self, path, interrupted):
+        samples, samplerate = self._load(path)
+        self._sd.play(samples, samplerate)
+        end = time.monotonic() + len(samples) / samplerate
+        while time.monotonic() < end:
+            if interrupted.wait(0.01):
+                self._sd.stop()
+                return
+        self._sd.wait()
+
+    def stop(self):
+        self._sd.stop()
+
+
+class CachedSpeechBackend:
+    """Backend de voz que reproduce los clips cacheados y sintetiza en vivo el resto.
+
+    Las frases fijas registradas con `prerender` se sintetizan a archivo en segundo
+    plano; desde entonces suenan en milisegundos en lugar de pagar la síntesis.
+    El backend envuelto debe ofrecer render(text, path) y voice_signature().
+    """
+
+    def __init__(self, backend, cache, player=None, metrics=None):
+        self.backend = backend
+        self.cache = cache
+        self.player = player or WavPlayer()
+        self.metrics = metrics or NULL_METRICS
+        self.phrases = set()
+        self._pending = queue.Queue()
+        self._queued = set()
+        threading.Thread(target=self._render_worker, daemon=True).start()
+
+    def _key(self, text):
+        return self.cache.key(text, *self.backend.voice_signature())
+
+    def prerender(self, phrases):
+        """Encola las frases; la clave (que depende de la voz) se calcula en el hilo de síntesis"""
+        for text in phrases:
+            self.phrases.add(text)
+            if text not in self._queued:
+                self._queued.add(text)
+                self._pending.put(text)
+
+    def say(self, text, interrupted):
+        key = self._key(text)
+        path = self.cache.get(key)
+        if path:
+            try:
+                self.player.play(path, interrupted)
+                self.metrics.count("cache_audio_aciertos")
+                return
+            except Exception as e:
+                # Clip ilegible (p. ej. el motor no generó WAV): se vuelve a la síntesis en vivo
+                print(f"Clip de voz descartado ({e})")
+                self.cache.discard(key)
+        self.metrics.count("cache_audio_fallos")
+        self.backend.say(text, interrupted)
+        if text in self.phrases:
+            self.prerender([text])
+
+    def stop(self):
+        self.player.stop()
+        self.backend.stop()
+
+    def _render_worker(self):
+        while True:
+            text = self._pending.get()
+            try:
+                key = self._key(text)
+                if os.path.exists(self.cache.path_for(key)):
+                    continue
+                tmp_path = self.cache.path_for(key) + ".tmp"
+                start = time.perf_counter()
+                self.backend.render(text, tmp_path)
+                self.metrics.observe("tts.sintesis", time.perf_counter() - start)
+                if os.path.exists(tmp_path):
+                    self.cache.add(key, tmp_path)
+            except Exception as e:
+                print(f"No se pudo pre-sintetizar '{text}': {e}")
+            finally:
+                self._queued.discard(text)
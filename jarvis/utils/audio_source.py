@@ -0,0 +1,78 @@
+import queue
+import time
+import wave
+
+
+class MicrophoneSource:
+    """Flujo PCM continuo del micrófono (int16 mono) en bloques de bytes"""
+
+    def __init__(self, samplerate=16000, blocksize=1600):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self._queue = queue.Queue()
+        self._stream = None
+        self.eof = False  # el micrófono nunca se agota
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            print(f"Audio: {status}")
+        self._queue.put(bytes(indata))
+
+    def __enter__(self):
+        import sounddevice as sd
+        self._stream = sd.RawInputStream(
+            samplerate=self.samplerate, blocksize=self.blocksize,
+            dtype='int16', channels=1, callback=self._callback
+        )
+        self._stream.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+
+    def read(self, timeout=None):
+        """Siguiente bloque de audio, o None si no llegó nada a tiempo"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class WavFileSource:
+    """Fuente de audio desde un WAV (16 bits mono), para pruebas sin micrófono.
+
+    Con `realtime=True` entrega los bloques al ritmo real de la grabación.
+    """
+
+    def __init__(self, path, blocksize=1600, realtime=False):
+        self.path = path
+        self.blocksize = blocksize
+        self.realtime = realtime
+        self._wav = None
+        self.started_at = None
+        self.eof = False
+        with wave.open(path, 'rb') as wav:
+            self.samplerate = wav.getframerate()
+
+    def __enter__(self):
+        self._wav = wave.open(self.path, 'rb')
+        if self._wav.getsampwidth() != 2 or self._wav.getnchannels() != 1:
+            raise ValueError(f"{self.path}: se espera audio PCM de 16 bits mono")
+        self._next_time = time.monotonic()
+        self.started_at = time.perf_counter()  # instante de la muestra 0, para medir latencias
+        return self
+
+    def __exit__(self, *exc):
+        self._wav.close()
+
+    def read(self, timeout=None):
+        data = self._wav.readframes(self.blocksize)
+        if not data:
+            self.eof = True
+            return None
+        if self.realtime:
+            self._next_time += len(data) / 2 / self.samplerate
+            time.sleep(max(0.0, self._next_time - time.monotonic()))
+        return data
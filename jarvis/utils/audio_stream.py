@@ -0,0 +1,241 @@
+import threading
+import time
+
+import numpy as np
+
+
+class RingBuffer:
+    """Buffer circular de muestras int16 preasignado.
+
+    Cada muestra se escribe dos veces (en i y en i + capacidad), así cualquier ventana
+    de hasta `capacity` muestras es contigua y se puede entregar como memoryview sin
+    copiar. Las posiciones son absolutas: la muestra n vive en n % capacidad.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros(capacity * 2, dtype=np.int16)
+        self.end = 0  # posición absoluta siguiente a la última muestra escrita
+
+    @property
+    def start(self):
+        """Muestra más vieja que todavía está en el buffer"""
+        return max(0, self.end - self.capacity)
+
+    def write(self, samples):
+        samples = samples[-self.capacity:]
+        n = len(samples)
+        pos = self.end % self.capacity
+        first = min(n, self.capacity - pos)
+        for offset in (0, self.capacity):
+            self._data[offset + pos:offset + pos + first] = samples[:first]
+        if first < n:
+            # Lo que no entra al final de la primera copia va al principio de ambas
+            rest = samples[first:]
+            self._data[:n - first] = rest
+            self._data[self.capacity:self.capacity + n - first] = rest
+        self.end += n
+
+    def view(self, start, end):
+        """memoryview (sin copia) de las muestras [start, end) en posiciones absolutas"""
+        if start < self.start or end > self.end or end - start > self.capacity:
+            raise IndexError("Ventana fuera del buffer")
+        pos = start % self.capacity
+        return memoryview(self._data[pos:pos + end - start])
+
+
+class AudioCapture:
+    """Hilo de captura único que vuelca una fuente de audio en un RingBuffer.
+
+    El dispositivo se abre una sola vez; los consumidores leen con `reader()`, cada
+    uno con su propio cursor, sin volver a abrir nada ni copiar audio.
+    """
+
+    def __init__(self, source, ring_seconds=30):
+        self.source = source
+        self.samplerate = source.samplerate
+        self.ring = RingBuffer(int(ring_seconds * self.samplerate))
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.eof = False
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self.source.__enter__()
+        self.samplerate = self.source.samplerate
+        self._thread = threading.Thread(target=self._capture, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+        self.source.__exit__(None, None, None)
+
+    def _capture(self):
+        while self._running:
+            block = self.source.read(timeout=0.5)
+            if block is None:
+                if self.source.eof:
+                    break
+                continue
+            with self._cond:
+                self.ring.write(np.frombuffer(block, dtype=np.int16))
+                self._cond.notify_all()
+        with self._cond:
+            self.eof = True
+            self._cond.notify_all()
+
+    def reader(self, from_now=True):
+        return AudioReader(self, self.ring.end if from_now else self.ring.start)
+
+    def wait_for(self, position, timeout=None):
+        """Espera hasta que haya audio más allá de `position`; False si venció el tiempo o se agotó la fuente"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.ring.end > position or self.eof, timeout) and self.ring.end > position
+
+
+class AudioReader:
+    """Cursor de lectura sobre la captura; se comporta como una fuente (read/eof/samplerate)"""
+
+    def __init__(self, capture, position):
+        self.capture = capture
+        self.position = position
+        self.samplerate = capture.samplerate
+        self.overruns = 0
+
+    @property
+    def eof(self):
+        return self.capture.eof and self.position >= self.capture.ring.end
+
+    def skip_to_now(self):
+        self.position = self.capture.ring.end
+
+    def read(self, timeout=None):
+        """Audio nuevo desde la última lectura como memoryview de int16, o None"""
+        if not self.capture.wait_for(self.position, timeout):
+            return None
+        ring = self.capture.ring
+        if self.position < ring.start:
+            # El consumidor se atrasó más que el tamaño del buffer: se pierde lo más viejo
+            self.overruns += 1
+            self.position = ring.start
+        end = ring.end
+        view = ring.view(self.position, end)
+        self.position = end
+        return view
+
+
+class Utterance:
+    """Segmento de voz detectado: posiciones absolutas y vista sin copia del audio"""
+
+    def __init__(self, start, end, audio, samplerate):
+        self.start = start
+        self.end = end
+        self.audio = audio
+        self.samplerate = samplerate
+
+    @property
+    def duration(self):
+        return (self.end - self.start) / self.samplerate
+
+    def to_bytes(self):
+        return self.audio.tobytes()
+
+
+class VoiceActivityDetector:
+    """Detecta enunciados por energía en tramas de 30 ms, leyendo el RingBuffer en el lugar.
+
+    La voz empieza tras `start_frames` tramas sobre el umbral y termina tras
+    `pause_threshold` segundos de silencio o al llegar a `phrase_time_limit`.
+    Lo que queda después del final de un enunciado se procesa en la siguiente llamada.
+    """
+
+    FRAME_MS = 30
+
+    def __init__(self, capture, energy_threshold=300, start_frames=3, pause_threshold=1.2,
+                 phrase_time_limit=7, preroll=0.3):
+        self.capture = capture
+        self.samplerate = capture.samplerate
+        self.frame = int(self.samplerate * self.FRAME_MS / 1000)
+        self.energy_threshold = energy_threshold
+        self.start_frames = start_frames
+        self.pause_frames = max(1, int(pause_threshold * 1000 / self.FRAME_MS))
+        self.max_samples = int(phrase_time_limit * self.samplerate)
+        self.preroll = int(preroll * self.samplerate)
+        self.position = capture.ring.end
+
+    def skip_to_now(self):
+        """Descarta el audio acumulado (p. ej. lo que se grabó mientras hablaba Jarvis)"""
+        self.position = self.capture.ring.end
+
+    def _frame_energies(self, view):
+        samples = np.asarray(view).reshape(-1, self.frame).astype(np.float32)
+        return np.sqrt(np.mean(samples * samples, axis=1))
+
+    def next_utterance(self, timeout=None, on_audio=None):
+        """Bloquea hasta el próximo enunciado completo; None si no empezó a tiempo.
+
+        Si se pasa `on_audio`, recibe el audio del enunciado a medida que llega (memoryviews
+        consecutivos), para reconocedores que decodifican en streaming.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        voiced_run = 0
+        silence_run = 0
+        speech_start = None
+        fed = None
+
+        def feed():
+            nonlocal fed
+            if on_audio is None or speech_start is None:
+                return
+            start = fed if fed is not None else max(speech_start - self.preroll, self.capture.ring.start)
+            if self.position > start:
+                on_audio(self.capture.ring.view(start, self.position))
+            fed = self.position
+
+        while True:
+            ring = self.capture.ring
+            if self.position < ring.start:
+                # Consumidor atrasado más que el buffer: se salta lo que ya no está
+                self.position = ring.start
+                if speech_start is not None:
+                    speech_start = max(speech_start, ring.start)
+                fed = None if fed is None else max(fed, ring.start)
+
+            available = (ring.end - self.position) // self.frame * self.frame
+            if not available:
+                wait = 0.5
+                if speech_start is None and deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                    if wait <= 0:
+                        return None
+                if not self.capture.wait_for(self.position + self.frame - 1, wait) and self.capture.eof:
+                    if speech_start is None:
+                        return None
+                    feed()
+                    return self._emit(speech_start, self.position)
+                continue
+
+            for energy in self._frame_energies(ring.view(self.position, self.position + available)):
+                self.position += self.frame
+                if speech_start is None:
+                    voiced_run = voiced_run + 1 if energy >= self.energy_threshold else 0
+                    if voiced_run >= self.start_frames:
+                        speech_start = self.position - voiced_run * self.frame
+                    continue
+
+                silence_run = 0 if energy >= self.energy_threshold else silence_run + 1
+                if silence_run >= self.pause_frames or self.position - speech_start >= self.max_samples:
+                    feed()
+                    return self._emit(speech_start, self.position)
+            feed()
+
+    def _emit(self, speech_start, end):
+        ring = self.capture.ring
+        start = max(speech_start - self.preroll, ring.start)
+        return Utterance(start, end, ring.view(start, end), self.samplerate)
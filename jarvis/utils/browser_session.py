@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from selenium import webdriver
+
+# Recursos que no hacen falta para leer resultados de búsqueda
+BLOCKED_RESOURCES = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+                     "*.woff", "*.woff2", "*.ttf", "*.otf"]
+
+
+class BrowserSession:
+    """Chrome compartido por WebController, iniciado en segundo plano recién cuando hace falta.
+
+    Mantiene una pestaña ya abierta por tipo de acción (p. ej. "buscar" y "youtube"),
+    cargada de antemano en `warm_urls` para que la conexión y la página base estén listas.
+    En las pestañas de `light_tabs` se bloquean imágenes y fuentes. El perfil de Chrome es
+    persistente: las cookies de consentimiento sobreviven entre sesiones y se recuerda en
+    qué sitios ya se aceptó el aviso (o no apareció en `consent_attempts` visitas).
+    """
+
+    def __init__(self, headless=False, profile_dir="navegador", warm_urls=None, light_tabs=("buscar",),
+                 page_load_timeout=15, launch_timeout=30, consent_attempts=3):
+        self.headless = headless
+        self.profile_dir = os.path.abspath(profile_dir) if profile_dir else None
+        self.warm_urls = warm_urls or {}
+        self.light_tabs = set(light_tabs)
+        self.page_load_timeout = page_load_timeout
+        self.launch_timeout = launch_timeout
+        self.consent_attempts = consent_attempts
+
+        self.driver = None
+        self.tabs = {}  # tipo de pestaña -> handle de la ventana
+        self.startup_time = None
+        self._started = False
+        self._ready = threading.Event()
+        self._start_lock = threading.Lock()
+        # Un solo driver: las acciones se turnan (switch_to es global al navegador)
+        self._action_lock = threading.Lock()
+        self._consented = self._load_consent()
+        self._consent_misses = {}  # sitio -> visitas en que no se pudo aceptar el aviso
+
+    def start(self):
+        """Inicia Chrome en segundo plano; no bloquea y solo actúa la primera vez"""
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._launch, daemon=True).start()
+
+    def wait_ready(self, timeout=None):
+        self.start()
+        return self._ready.wait(self.launch_timeout if timeout is None else timeout) and self.driver is not None
+
+    def _launch(self):
+        start = time.perf_counter()
+        try:
+            self.driver = self._create_driver()
+            for kind, url in self.warm_urls.items():
+                with self._action_lock:
+                    self._open_tab(kind, url)
+        except Exception as e:
+            print(f"Error al iniciar navegador: {e}")
+        finally:
+            self.startup_time = time.perf_counter() - start
+            self._ready.set()
+
+    def _create_driver(self):
+        options = webdriver.ChromeOptions()
+        if self.headless:
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size=1280,800")
+        else:
+            options.add_argument("--start-maximized")
+        if self.profile_dir:
+            options.add_argument(f"--user-data-dir={self.profile_dir}")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-notifications")
+        options.add_argument("--disable-popup-blocking")
+        options.add_argument("--mute-audio")
+        options.add_argument("--no-first-run")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        options.add_experimental_option('useAutomationExtension', False)
+        # Se sigue apenas el HTML está listo, sin esperar imágenes ni scripts diferidos
+        options.page_load_strategy = "eager"
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        return driver
+
+    def _open_tab(self, kind, url=None):
+        if self.tabs:
+            self.driver.switch_to.new_window('tab')
+        self.tabs[kind] = self.driver.current_window_handle
+        if kind in self.light_tabs:
+            try:
+                self.driver.execute_cdp_cmd("Network.enable", {})
+                self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCES})
+            except Exception as e:
+                print(f"No se pudo aligerar la pestaña '{kind}': {e}")
+        if url:
+            self.driver.get(url)
+
+    @contextmanager
+    def tab(self, kind):
+        """Da el driver con la pestaña `kind` al frente, de a una acción por vez"""
+        if not self.wait_ready():
+            raise RuntimeError("El navegador no está disponible")
+        with self._action_lock:
+            handle = self.tabs.get(kind)
+            if handle in self.driver.window_handles:
+                self.driver.switch_to.window(handle)
+            else:
+                self._open_tab(kind)
+            yield self.driver
+
+    def needs_consent(self, url):
+        """True mientras no se haya aceptado el aviso de cookies del sitio en este perfil"""
+        return urlparse(url).netloc not in self._consented
+
+    def record_consent(self, url, accepted):
+        """Anota si se pudo aceptar el aviso; si falla se vuelve a intentar en las próximas visitas"""
+        site = urlparse(url).netloc
+        if not accepted:
+            self._consent_misses[site] = self._consent_misses.get(site, 0) + 1
+            if self._consent_misses[site] < self.consent_attempts:
+                return
+            # El sitio nunca muestra el aviso (o ya se aceptó): no se espera más por él
+        self._consented.add(site)
+        self._save_consent()
+
+    def _consent_file(self):
+        return os.path.join(self.profile_dir, "jarvis_consentimientos.json") if self.profile_dir else None
+
+    def _load_consent(self):
+        path = self._consent_file()
+        try:
+            with open(path, encoding='utf-8') as f:
+                return set(json.load(f))
+        except (TypeError, OSError, ValueError):
+            return set()
+
+    def _save_consent(self):
+        path = self._consent_file()
+        if not path:
+            return
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(sorted(self._consented), f)
+        except OSError as e:
+            print(f"No se pudo guardar el estado del navegador: {e}")
+
+    def close(self):
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
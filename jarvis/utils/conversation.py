@@ -0,0 +1,78 @@
+import threading
+from collections import deque
+
+
+class ConversationManager:
+    """Memoria de la conversación con el modelo, dentro de un presupuesto de tokens.
+
+    El prompt empieza con un prefijo fijo (instrucciones + perfil del usuario) que no
+    cambia byte a byte entre reinicios, así el servidor reutiliza su caché de prompt.
+    Tras cada respuesta completa Ollama devuelve `context` (la conversación ya procesada);
+    mientras entre en el presupuesto, la consulta siguiente manda solo el turno nuevo.
+    Si no hay `context` o se excede el presupuesto, se rearma el prompt con los turnos
+    más recientes que entran y un resumen breve de los que se desalojaron.
+    """
+
+    def __init__(self, system_prompt, token_budget=1536, response_reserve=256, summary_chars=300,
+                 chars_per_token=4):
+        self.system_prompt = system_prompt
+        self.token_budget = token_budget
+        self.response_reserve = response_reserve
+        self.summary_chars = summary_chars
+        self.chars_per_token = chars_per_token
+        self.profile = ""
+        self.prefix = None  # se fija en cada reinicio
+        self.turns = deque()  # (pregunta, respuesta)
+        self.summary = deque()  # preguntas desalojadas, recortadas
+        self.context = None
+        self.resets = 0
+        self._lock = threading.Lock()
+
+    def estimate_tokens(self, text):
+        return len(text) // self.chars_per_token + 1
+
+    def set_profile(self, profile):
+        """Perfil del usuario para el prefijo; se aplica recién en el próximo reinicio"""
+        self.profile = profile
+
+    def build(self, text):
+        """Campos para /api/generate (prompt y, según el caso, context o system)"""
+        with self._lock:
+            needed = self.estimate_tokens(text) + self.response_reserve
+            if self.context is not None and len(self.context) + needed <= self.token_budget:
+                return {"prompt": text, "context": self.context}
+
+            self.context = None
+            self.resets += 1
+            self.prefix = f"{self.system_prompt}\n{self.profile}" if self.profile else self.system_prompt
+            self._evict(needed)
+            return {"system": self.prefix, "prompt": self._render_history() + text}
+
+    def record(self, text, response, context=None):
+        """Guarda el turno; `context` es el que devolvió Ollama (None si la respuesta quedó cortada)"""
+        with self._lock:
+            self.turns.append((text, response))
+            self.context = context
+
+    def reset(self):
+        with self._lock:
+            self.turns.clear()
+            self.summary.clear()
+            self.context = None
+
+    def _render_history(self):
+        lines = []
+        if self.summary:
+            lines.append("Antes hablamos de: " + "; ".join(self.summary) + ".")
+        for question, answer in self.turns:
+            lines.append(f"Usuario: {question}")
+            lines.append(f"Asistente: {answer}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def _evict(self, needed):
+        budget = self.token_budget - needed - self.estimate_tokens(self.prefix)
+        while self.turns and self.estimate_tokens(self._render_history()) > budget:
+            question, _ = self.turns.popleft()
+            self.summary.append(question[:60])
+            while sum(len(item) + 2 for item in self.summary) > self.summary_chars:
+                self.summary.popleft()
@@ -0,0 +1,321 @@
+"""Dobles de prueba para ejercitar Jarvis sin micrófono, parlantes, Ollama ni internet"""
+import json
+import os
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _split_tokens(text):
+    return re.findall(r'\S+\s*', text)
+
+
+def _count_tokens(text):
+    return (len(text) + 3) // 4  # ~4 caracteres por token
+
+
+class FakeOllamaServer:
+    """Servidor HTTP local que imita /api/generate de Ollama (NDJSON en streaming)"""
+
+    def __init__(self, response="Hola. Esto es una respuesta de prueba.", token_delay=0.0,
+                 first_token_delay=0.0, host="127.0.0.1", port=0, fail_first=0,
+                 prefill_per_token=0.0, prompt_cache=True):
+        self.response = response
+        self.token_delay = token_delay
+        self.first_token_delay = first_token_delay
+        self.fail_first = fail_first  # las primeras N consultas responden 503
+        # Costo de procesar el prompt; con `prompt_cache` el prefijo repetido de la consulta
+        # anterior no se vuelve a procesar, como en el caché KV del servidor
+        self.prefill_per_token = prefill_per_token
+        self.prompt_cache = prompt_cache
+        self._cached_text = ""
+        self.requests = []
+        self.connections = set()  # puertos de cliente vistos: cuántas conexiones TCP se abrieron
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # como Ollama: cada fragmento sale sin esperar al ACK
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                fake.requests.append({'path': self.path, 'body': body})
+                fake.connections.add(self.client_address[1])
+
+                if self.path != "/api/generate":
+                    self.send_error(404)
+                    return
+                if 'prompt' not in body:
+                    # Sin prompt Ollama solo carga el modelo (o renueva su keep_alive)
+                    self._send_json({'model': body.get('model'), 'response': "", 'done': True})
+                    return
+                if fake.fail_first > 0:
+                    fake.fail_first -= 1
+                    self.send_error(503)
+                    return
+
+                response = fake.response(body) if callable(fake.response) else fake.response
+                if body.get('stream', True):
+                    self._send_stream(body, response)
+                else:
+                    time.sleep(fake.first_token_delay + fake.token_delay * len(_split_tokens(response)))
+                    self._send_json({'model': body.get('model'), 'response': response, 'done': True})
+
+            def _send_json(self, payload):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_chunk(self, payload):
+                data = json.dumps(payload).encode('utf-8') + b"\n"
+                self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def _send_stream(self, body, response):
+                prompt_tokens, context = fake._prefill(body, response)
+                prefill = prompt_tokens * fake.prefill_per_token
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                try:
+                    time.sleep(fake.first_token_delay + prefill)
+                    tokens = _split_tokens(response)
+                    for token in tokens:
+                        self._send_chunk({'model': body.get('model'), 'response': token, 'done': False})
+                        time.sleep(fake.token_delay)
+                    self._send_chunk({
+                        'model': body.get('model'), 'response': "", 'done': True, 'context': context,
+                        'prompt_eval_count': prompt_tokens, 'prompt_eval_duration': int(prefill * 1e9),
+                        'eval_count': len(tokens)
+                    })
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # El cliente cortó la descarga (p. ej. por truncado de la respuesta)
+                    self.close_connection = True
+
+        return Handler
+
+    def _prefill(self, body, response):
+        """Tokens de prompt a procesar y `context` resultante (tokens simulados)"""
+        context = body.get('context') or []
+        if context:
+            # El contexto ya está procesado: solo se evalúa el turno nuevo
+            text = body.get('prompt', '')
+            cached = 0
+        else:
+            text = (body.get('system') or '') + '\n' + body.get('prompt', '')
+            cached = len(os.path.commonprefix([text, self._cached_text])) if self.prompt_cache else 0
+            context = []
+            self._cached_text = ''
+        prompt_tokens = _count_tokens(text[cached:])
+        total = len(context) + _count_tokens(text) + _count_tokens(response)
+        self._cached_text = self._cached_text + text + response
+        return prompt_tokens, list(range(total))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeWebServer:
+    """Servidor de páginas HTML estáticas (fixtures) que imitan Google y YouTube.
+
+    `/ruta?...` sirve `root/ruta.html` (`/` sirve index.html); imágenes y fuentes se
+    generan al vuelo y tardan `asset_delay`, como una descarga real. `requests` registra
+    cada ruta pedida, para contar qué recursos llegó a pedir el navegador. `page_padding`
+    agrega relleno al final de cada página, como el peso de las páginas reales;
+    `html_content_type` es el Content-Type con que se sirven las páginas.
+    """
+
+    CONTENT_TYPES = {".png": "image/png", ".jpg": "image/jpeg", ".woff2": "font/woff2", ".css": "text/css"}
+
+    def __init__(self, root, asset_delay=0.0, page_padding=0, html_content_type="text/html; charset=utf-8",
+                 host="127.0.0.1", port=0):
+        self.root = root
+        self.html_content_type = html_content_type
+        self.asset_delay = asset_delay
+        self.page_padding = page_padding
+        self.requests = []
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def assets_requested(self):
+        return [path for path in self.requests if os.path.splitext(path)[1] in self.CONTENT_TYPES]
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    # El cliente ya tenía lo que buscaba y cortó la descarga
+                    pass
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                fake.requests.append(path)
+                ext = os.path.splitext(path)[1]
+                if ext in fake.CONTENT_TYPES:
+                    time.sleep(fake.asset_delay)
+                    self._send(200, fake.CONTENT_TYPES[ext], b"\0" * 2048)
+                    return
+                name = "index" if path == "/" else path.strip("/")
+                try:
+                    with open(os.path.join(fake.root, name + ".html"), "rb") as f:
+                        page = f.read()
+                except OSError:
+                    self._send(404, "text/plain", b"no encontrado")
+                    return
+                padding = b"<!--" + b"x" * fake.page_padding + b"-->" if fake.page_padding else b""
+                self._send(200, fake.html_content_type, page + padding)
+
+            def _send(self, status, content_type, data):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeTTSBackend:
+    """TTS simulado: "habla" durante `seconds_per_char` por carácter y registra lo dicho"""
+
+    def __init__(self, seconds_per_char=0.0, synth_delay=0.0):
+        self.seconds_per_char = seconds_per_char
+        self.synth_delay = synth_delay
+        self.spoken = []       # (texto, completo)
+        self.started = []      # (texto, instante de inicio)
+        self._stop = threading.Event()
+
+    def say(self, text, interrupted=None):
+        interrupted = interrupted or threading.Event()
+        self._stop.clear()
+        self.started.append((text, time.perf_counter()))
+        deadline = time.perf_counter() + self.synth_delay + len(text) * self.seconds_per_char
+        while time.perf_counter() < deadline:
+            if interrupted.is_set() or self._stop.is_set():
+                self.spoken.append((text, False))
+                return
+            time.sleep(min(0.005, max(0.0, deadline - time.perf_counter())))
+        self.spoken.append((text, not interrupted.is_set()))
+
+    def stop(self):
+        self._stop.set()
+
+
+class FakeRecognizer:
+    """Reconocedor guionado: devuelve los textos de `script` en orden, uno por enunciado.
+
+    `delay` simula lo que tarda un reconocedor real en entregar el texto al terminar el enunciado.
+    """
+
+    def __init__(self, script, delay=0.0):
+        self.script = list(script)
+        self.delay = delay
+        self.results = []  # (texto, muestra final del enunciado)
+
+    def start(self, samplerate):
+        return _FakeRecognizerSession(self)
+
+
+class _FakeRecognizerSession:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def feed(self, pcm):
+        return None
+
+    def finish(self, utterance):
+        time.sleep(self.backend.delay)
+        text = self.backend.script.pop(0) if self.backend.script else None
+        self.backend.results.append((text, utterance.end if utterance is not None else None))
+        return text
+
+    def cancel(self):
+        pass
+
+
+class FakeWebController:
+    """Navegador simulado: cada acción tarda `action_delay` y queda registrada"""
+
+    def __init__(self, action_delay=0.0):
+        self.action_delay = action_delay
+        self.actions = []
+
+    def warm_up(self):
+        pass
+
+    def search_web(self, query):
+        time.sleep(self.action_delay)
+        self.actions.append(('search', query))
+
+    def play_youtube(self, query):
+        time.sleep(self.action_delay)
+        self.actions.append(('youtube', query))
+
+    def play_video(self, url):
+        time.sleep(self.action_delay)
+        self.actions.append(('video', url))
+        return True
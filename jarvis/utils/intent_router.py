@@ -0,0 +1,124 @@
+import re
+import threading
+
+# (intención, disparadores) en orden de prioridad: si un comando tiene varios, gana el primero.
+BUILTIN_INTENTS = [
+    ("cancelar", ["cancela", "cancelá", "basta", "olvídalo"]),
+    ("hora", ["hora", "qué hora es"]),
+    ("fecha", ["fecha", "qué día es hoy"]),
+    ("reproducir", ["reproduce", "reproducí", "pon", "poné", "abre video", "mirar"]),
+    ("buscar", ["busca", "buscá", "buscar"]),
+]
+SLOT_STRIP = " ,.;:¿?¡!"
+
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+
+def trie_pattern(phrases):
+    """Expresión regular en forma de trie: el costo casi no crece con la cantidad de frases"""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = True
+    return _node_pattern(trie)
+
+
+def _node_pattern(node):
+    branches = [re.escape(char) + _node_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    # Con `?` codicioso se prueba primero la frase más larga ("abre video" antes que "abre")
+    return f'(?:{body})?' if '' in node else body
+
+
+class Intent:
+    """Resultado del ruteo: intención (o None), datos extraídos y texto ya corregido"""
+
+    def __init__(self, name, text, trigger=None, slots=None):
+        self.name = name
+        self.text = text
+        self.trigger = trigger
+        self.slots = slots or {}
+
+    def __repr__(self):
+        return f"Intent({self.name!r}, trigger={self.trigger!r}, slots={self.slots!r})"
+
+
+class IntentRouter:
+    """Ruteo de comandos en una pasada con expresiones compiladas una sola vez.
+
+    Los disparadores fijos forman una única expresión con límites de palabra ("pon" ya
+    no coincide dentro de "ponte"); las correcciones aprendidas forman otra y los
+    patrones aprendidos de multimedia (media_patterns) una tercera. Esos patrones no
+    disparan nada por sí solos: solo marcan dónde empieza lo que hay que reproducir
+    después de un disparador de "reproducir". `update` recompila solo lo que cambió.
+    """
+
+    def __init__(self, corrections=None, media_patterns=None):
+        self._lock = threading.Lock()
+        # (expresión, tabla) se reemplazan juntas: route() nunca ve una mezcla de versiones
+        self._corrections = (None, {})
+        self._media = (None, ())
+        self.compilations = 0
+        phrases = {}
+        for name, triggers in BUILTIN_INTENTS:
+            for trigger in triggers:
+                phrases.setdefault(normalize(trigger), (len(phrases), name))
+        self._triggers = (self._compile(phrases), phrases)
+        self.update(corrections or {}, media_patterns or [])
+
+    def update(self, corrections=None, media_patterns=None):
+        """Recompila si cambiaron las correcciones o los patrones aprendidos"""
+        with self._lock:
+            if corrections is not None:
+                corrections = {normalize(wrong): correct for wrong, correct in corrections.items() if wrong.strip()}
+                if corrections != self._corrections[1]:
+                    regex = self._compile(corrections, re.IGNORECASE) if corrections else None
+                    self._corrections = (regex, corrections)
+
+            if media_patterns is not None:
+                patterns = tuple(dict.fromkeys(normalize(pattern) for pattern in media_patterns if pattern.strip()))
+                if patterns != self._media[1]:
+                    self._media = (self._compile(patterns) if patterns else None, patterns)
+
+    def _compile(self, phrases, flags=0):
+        self.compilations += 1
+        return re.compile(r'\b(?:' + trie_pattern(phrases) + r')\b', flags)
+
+    def correct(self, text):
+        """Aplica las correcciones aprendidas (palabras completas, sin distinguir mayúsculas)"""
+        corrections_re, corrections = self._corrections
+        if corrections_re is None:
+            return text
+        return corrections_re.sub(lambda match: corrections[match.group(0).lower()], text)
+
+    def route(self, text):
+        """Corrige el texto y devuelve la intención de mayor prioridad con sus datos"""
+        text = self.correct(text)
+        lowered = normalize(text)
+        triggers_re, phrases = self._triggers
+        best = None
+        for match in triggers_re.finditer(lowered):
+            priority = phrases[match.group(0)][0]
+            if best is None or priority < phrases[best.group(0)][0]:
+                best = match
+        if best is None:
+            return Intent(None, text)
+
+        name = phrases[best.group(0)][1]
+        slots = {}
+        if name in ("reproducir", "buscar"):
+            start = best.end()
+            media_re = self._media[0]
+            if name == "reproducir" and media_re is not None:
+                # Un patrón aprendido ("pon música") marca mejor dónde empieza lo pedido
+                learned = media_re.search(lowered, best.start())
+                if learned:
+                    start = learned.end()
+            slots['query'] = lowered[start:].strip(SLOT_STRIP)
+        return Intent(name, text, trigger=best.group(0), slots=slots)
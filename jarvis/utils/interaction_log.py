@@ -0,0 +1,180 @@
+import atexit
+import glob
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import threading
+import weakref
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:
+    zstd = None
+
+COMPRESSED_EXTENSIONS = {'.gz': gzip.open}
+if zstd:
+    COMPRESSED_EXTENSIONS['.zst'] = zstd.open
+
+# Escritores abiertos; un solo hook de atexit los cierra a todos sin mantenerlos vivos
+_open_writers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_writers():
+    for writer in list(_open_writers):
+        writer.close()
+
+
+class InteractionLogWriter:
+    """Log de interacciones en segmentos: escrituras por lotes, rotación y compresión.
+
+    Los registros se acumulan en memoria y se escriben juntos al llegar a `flush_records`,
+    cada `flush_interval` segundos o al cerrar. El segmento activo es siempre `path`;
+    al superar `segment_bytes` se renombra a `<path>.<n>` y se comprime en segundo plano.
+    Solo se conservan los últimos `max_segments` segmentos cerrados.
+    """
+
+    def __init__(self, path, segment_bytes=4 * 1024 * 1024, flush_records=32,
+                 flush_interval=5.0, max_segments=20):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.flush_records = flush_records
+        self.flush_interval = flush_interval
+        self.max_segments = max_segments
+        self.extension = '.zst' if zstd else '.gz'
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._file = None
+        self._closed = threading.Event()
+        self._compressing = []
+
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+        _open_writers.add(self)
+
+    def write(self, record):
+        with self._lock:
+            self._buffer.append(json.dumps(record))
+            if len(self._buffer) >= self.flush_records:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        _open_writers.discard(self)
+        with self._lock:
+            self._flush_locked()
+            if self._file:
+                self._file.close()
+                self._file = None
+        for thread in self._compressing:
+            thread.join()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8')
+
+        self._file.write("\n".join(self._buffer) + "\n")
+        self._file.flush()
+        self._buffer = []
+
+        if self._file.tell() >= self.segment_bytes:
+            self._rotate_locked()
+
+    def _rotate_locked(self):
+        self._file.close()
+        self._file = None
+
+        segment = f"{self.path}.{self._next_segment_number():06d}"
+        os.replace(self.path, segment)
+        thread = threading.Thread(target=self._compress, args=(segment,), daemon=True)
+        self._compressing = [t for t in self._compressing if t.is_alive()] + [thread]
+        thread.start()
+
+    def _next_segment_number(self):
+        numbers = [number for number, _ in list_segments(self.path)]
+        return max(numbers) + 1 if numbers else 1
+
+    def _compress(self, segment):
+        opener = COMPRESSED_EXTENSIONS[self.extension]
+        tmp_path = segment + self.extension + ".tmp"
+        with open(segment, 'rb') as src, opener(tmp_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, segment + self.extension)
+        try:
+            os.remove(segment)
+        except OSError:
+            # En Windows falla si otro proceso lo tiene abierto; list_segments prefiere el comprimido
+            pass
+        self._enforce_retention()
+
+    def _enforce_retention(self):
+        segments = list_segments(self.path)
+        for _, old in segments[:max(0, len(segments) - self.max_segments)]:
+            try:
+                os.remove(old)
+            except FileNotFoundError:
+                pass
+
+
+def list_segments(path):
+    """Segmentos cerrados de `path` como (número, archivo), del más viejo al más nuevo"""
+    pattern = re.compile(re.escape(os.path.basename(path)) + r"\.(\d+)(\.gz|\.zst)?$")
+    segments = {}
+    for candidate in glob.glob(glob.escape(path) + ".*"):
+        match = pattern.match(os.path.basename(candidate))
+        if not match:
+            continue
+        number = int(match.group(1))
+        # Si conviven el segmento sin comprimir y el comprimido, el comprimido está completo
+        if number not in segments or match.group(2):
+            segments[number] = candidate
+    return sorted(segments.items())
+
+
+def open_segment(path, mode='r'):
+    """Abre un segmento, comprimido o no, en modo texto ('r') o binario ('rb')"""
+    for extension, opener in COMPRESSED_EXTENSIONS.items():
+        if path.endswith(extension):
+            f = opener(path, 'rb')
+            return f if mode == 'rb' else io.TextIOWrapper(f, encoding='utf-8')
+    return open(path, mode, encoding=None if mode == 'rb' else 'utf-8')
+
+
+def iter_log_lines(path):
+    """Recorre todas las líneas del log, segmentos comprimidos incluidos, en orden"""
+    files = [segment for _, segment in list_segments(path)]
+    if os.path.exists(path):
+        files.append(path)
+    for file_path in files:
+        try:
+            with open_segment(file_path) as f:
+                for line in f:
+                    yield line.rstrip("\n")
+        except FileNotFoundError:
+            # Eliminado por retención mientras se leía
+            continue
+
+
+def iter_log_records(path):
+    for line in iter_log_lines(path):
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
@@ -1,69 +1,117 @@
 import json
-import os
-import pickle
 import numpy as np
-from collections import defaultdict
 from datetime import datetime
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.neighbors import NearestNeighbors
 import hashlib
+import re
+from utils.interaction_log import InteractionLogWriter
+from utils.log_tail import LogTailer
+from utils.preference_store import PreferenceStore, Preferences
+from utils.response_cache import ResponseCache, normalize_command
+
+# Palabras que no dicen nada del tema de un comando
+TOPIC_STOPWORDS = {"jarvis", "busca", "buscar", "reproduce", "explicame", "cuentame", "sobre", "quiero",
+                   "puedes", "podrias", "dime", "hablame", "como", "cuando", "donde", "cual", "cuales",
+                   "porque", "para", "tiene", "tengo", "esta", "estan", "hace", "hacer", "algo", "favor",
+                   "dato", "curioso", "gracias", "ahora", "mucho", "poco"}
+# Pedidos de multimedia, con palabras completas: "pon" no debe coincidir dentro de "respondas"
+MEDIA_COMMAND = re.compile(r'\b(?:reproduce|pon)\b')
 
 class LearningEngine:
-    def __init__(self, user_id="default"):
+    def __init__(self, user_id="default", data_dir="user_data", cache_max_bytes=32 * 1024 * 1024):
         self.user_id = hashlib.md5(user_id.encode()).hexdigest()
-        self.data_dir = "user_data"
-        self.data_file = f"{self.data_dir}/{self.user_id}_preferences.pkl"
+        self.data_dir = data_dir
+        self.data_file = f"{self.data_dir}/{self.user_id}_preferences.db"
         self.interaction_log = f"{self.data_dir}/{self.user_id}_interactions.log"
+        self.log_writer = InteractionLogWriter(self.interaction_log)
+        self.log_tailer = LogTailer(self.interaction_log, f"{self.data_dir}/{self.user_id}_interactions.cursor")
 
-        self.preferences = {
-            'frequent_commands': defaultdict(int),
-            'preferred_responses': {},
-            'corrections': {},
-            'dislikes': set(),
-            'preferred_topics': defaultdict(int),
-            'interaction_times': [],
-            'command_patterns': defaultdict(list),
-            'media_patterns': []
-        }
+        # El pickle del formato anterior se migra la primera vez
+        self.store = PreferenceStore(self.data_file, legacy_pickle=f"{self.data_dir}/{self.user_id}_preferences.pkl",
+                                     backup_path=f"{self.data_dir}/{self.user_id}_preferences.bak.db")
+        self.preferences = None
 
-        self.vectorizer = TfidfVectorizer(max_features=500)
-        self.knn = NearestNeighbors(n_neighbors=1, algorithm='ball_tree')
-        self.commands_db = []
+        # Con muchos usuarios cargados a la vez (servidor) conviene una caché más chica
+        self.response_cache = ResponseCache(max_bytes=cache_max_bytes)
+        # Sobrevive a reinicios y a que el servidor desaloje la sesión
+        self.cache_file = f"{self.data_dir}/{self.user_id}_respuestas.jsonl"
+        try:
+            self.response_cache.load(self.cache_file)
+        except (OSError, KeyError, TypeError) as e:
+            print(f"No se pudo leer la caché de respuestas: {e}")
+        self._listeners = []  # se llaman cuando se aprende algo (p. ej. para recompilar el ruteo)
 
         self.load_data()
 
     def load_data(self):
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'rb') as f:
-                self.preferences = pickle.load(f)
+        # interaction_times y command_patterns se leen recién cuando se usan
+        self.preferences = Preferences(self.store)
 
     def save_data(self):
-        os.makedirs(self.data_dir, exist_ok=True)
-        with open(self.data_file, 'wb') as f:
-            pickle.dump(self.preferences, f)
+        self.store.save(self.preferences)
+
+    def on_learn(self, callback):
+        """Registra `callback(preferences)`, que se llama cada vez que cambian las preferencias aprendidas"""
+        self._listeners.append(callback)
+
+    def _notify_learned(self):
+        for callback in self._listeners:
+            try:
+                callback(self.preferences)
+            except Exception as e:
+                print(f"Error al aplicar lo aprendido: {e}")
 
     def log_interaction(self, command, response, success):
-        os.makedirs(self.data_dir, exist_ok=True)
-        with open(self.interaction_log, 'a') as f:
-            log = json.dumps({
-                'timestamp': datetime.now().isoformat(),
-                'command': command,
-                'response': response,
-                'success': success
-            })
-            f.write(log + "\n")
+        self.log_writer.write({
+            'timestamp': datetime.now().isoformat(),
+            'command': command,
+            'response': response,
+            'success': success
+        })
+
+    def close(self):
+        """Vuelca al disco las interacciones pendientes y la caché de respuestas"""
+        self.log_writer.close()
+        self.store.close()
+        try:
+            self.response_cache.save(self.cache_file)
+        except OSError as e:
+            print(f"No se pudo guardar la caché de respuestas: {e}")
 
     def analyze_interaction_patterns(self):
-        if os.path.exists(self.interaction_log):
-            with open(self.interaction_log, 'r') as f:
-                for line in f:
-                    try:
-                        entry = json.loads(line)
-                        if any(cmd in entry['command'].lower() for cmd in ["reproduce", "pon"]):
-                            self._extract_media_pattern(entry['command'])
-                    except:
-                        continue
+        """Procesa solo las interacciones nuevas del log; guarda si algo cambió"""
+        changed = False
+        habits = False
+        for line in self.log_tailer.iter_lines():
+            try:
+                entry = json.loads(line)
+                habits |= self._record_habits(entry)
+                if MEDIA_COMMAND.search(entry['command'].lower()):
+                    changed |= self._extract_media_pattern(entry['command'])
+            except:
+                continue
+
+        if changed or habits:
             self.save_data()
+        if changed:
+            self._notify_learned()
+        self.log_tailer.save_cursor()
+        return changed
+
+    def _record_habits(self, entry):
+        """Cuándo habla el usuario y qué pide, para anticipar las próximas veces (ver WarmupScheduler)"""
+        # Con tildes, tal como lo rutea IntentRouter: así lo precalculado coincide con lo pedido
+        command = " ".join(entry['command'].lower().split())
+        if not command or not entry.get('success', True):
+            return False
+        moment = datetime.fromisoformat(entry['timestamp'])
+        self.preferences['interaction_times'].append(entry['timestamp'])
+        self.preferences['frequent_commands'][command] += 1
+        # Qué se pide a cada hora: command_patterns["07"] son los últimos comandos de las 7
+        self.preferences['command_patterns'][f"{moment.hour:02d}"].append(command)
+        for word in normalize_command(command).split():
+            if len(word) >= 5 and word not in TOPIC_STOPWORDS:
+                self.preferences['preferred_topics'][word] += 1
+        return True
 
     def _extract_media_pattern(self, command):
         words = command.lower().split()
@@ -76,18 +124,51 @@ class LearningEngine:
                     return True
         return False
 
+    def get_user_profile(self):
+        """Resumen del usuario que se agrega como contexto a las consultas al modelo"""
+        topics = self.preferences['preferred_topics']
+        return {
+            'favorite_topics': sorted(topics, key=topics.get, reverse=True)[:3],
+            'interaction_pattern': self._interaction_pattern()
+        }
+
+    def _interaction_pattern(self):
+        """Momento del día en que más se usa el asistente"""
+        periods = {'mañana': 0, 'tarde': 0, 'noche': 0}
+        for moment in self.preferences['interaction_times']:
+            try:
+                hour = datetime.fromisoformat(str(moment)).hour
+            except ValueError:
+                continue
+            periods['mañana' if 5 <= hour < 12 else 'tarde' if 12 <= hour < 19 else 'noche'] += 1
+        if not any(periods.values()):
+            return 'sin datos'
+        return max(periods, key=periods.get)
+
+    def remember_response(self, command, response):
+        """Guarda la respuesta del modelo para reutilizarla en comandos parecidos"""
+        self.response_cache.add(command, response)
+
+    def get_personalized_response(self, command):
+        if command in self.preferences['preferred_responses']:
+            return self.preferences['preferred_responses'][command]
+        return self.response_cache.lookup(command)
+
     def get_contextual_response(self, command, context):
         if command in self.preferences['preferred_responses']:
             return self.preferences['preferred_responses'][command]
 
         similar = self._find_similar_command(command)
         if similar:
-            response = self.preferences['preferred_responses'].get(similar)
+            response = self.preferences['preferred_responses'].get(similar) or self.response_cache.lookup(similar)
             if response:
                 return self._adapt_response(response, context)
 
         return None
 
+    def _find_similar_command(self, command):
+        return self.response_cache.nearest(command)
+
     def _adapt_response(self, response, context):
         if "[hora]" in response:
             current_time = datetime.now().strftime("%H:%M")
@@ -0,0 +1,217 @@
+import json
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.streaming import iter_ndjson_tokens
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class _SharedCall:
+    """Una generación en curso; todos los que pidieron el mismo prompt leen sus fragmentos"""
+
+    def __init__(self):
+        self.tokens = []
+        self.done = False
+        self.error = None
+        self.consumers = 0
+        self.abandoned = threading.Event()  # nadie la está leyendo: se corta la descarga
+        self.timing = {}
+        self.summary = {}  # último fragmento de Ollama: estadísticas y `context`
+        self._cond = threading.Condition()
+
+    def push(self, token):
+        with self._cond:
+            self.tokens.append(token)
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            self.error = error
+            self.done = True
+            self._cond.notify_all()
+
+    def read(self):
+        index = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: index < len(self.tokens) or self.done)
+                if index < len(self.tokens):
+                    token = self.tokens[index]
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            index += 1
+            yield token
+
+
+class OllamaClient:
+    """Cliente de /api/generate con conexiones persistentes y control de residencia del modelo.
+
+    - Una sesión de requests con pool: no se abre una conexión TCP por consulta.
+    - `keep_alive` le indica a Ollama cuánto tiempo mantener el modelo en memoria;
+      `keep_warm` lo renueva con una carga vacía, sin generar texto.
+    - Reintentos con espera exponencial ante errores de conexión o 5xx, solo antes del
+      primer fragmento (después no se puede repetir sin duplicar texto).
+    - Prompts idénticos en curso comparten una única llamada.
+    - `timings` guarda, por consulta: espera en cola, tiempo al primer fragmento (ttft),
+      total, fragmentos y fragmentos por segundo; `on_timing` los recibe al terminar cada una.
+    """
+
+    def __init__(self, url="http://localhost:11434", model="gemma:2b", timeout=15, connect_timeout=5,
+                 keep_alive=1800, retries=2, backoff=0.5, max_connections=4, on_timing=None):
+        self.url = url.rstrip("/") + "/api/generate"
+        self.model = model
+        self.timeout = (connect_timeout, timeout)  # el de lectura aplica entre fragmentos
+        self.keep_alive = keep_alive
+        self.retries = retries
+        self.backoff = backoff
+        self.on_timing = on_timing
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._slots = threading.Semaphore(max_connections)
+
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.last_request = None
+        self.timings = deque(maxlen=200)
+        self.deduplicated = 0
+
+    @property
+    def last_timing(self):
+        return self.timings[-1] if self.timings else None
+
+    def stream(self, prompt, system=None, context=None, on_done=None, **options):
+        """Genera la respuesta fragmento a fragmento; cerrar el generador libera la llamada.
+
+        `context` son los tokens que devolvió la llamada anterior: el servidor no vuelve a
+        procesar esa parte. `on_done` recibe el último fragmento (con el `context` nuevo)
+        si la generación terminó completa.
+        """
+        key = json.dumps([prompt, system, context, options], sort_keys=True, ensure_ascii=False)
+        with self._lock:
+            call = self._inflight.get(key)
+            if call is not None and not call.abandoned.is_set():
+                self.deduplicated += 1
+            else:
+                call = _SharedCall()
+                self._inflight[key] = call
+                payload = {"model": self.model, "prompt": prompt, "stream": True, "keep_alive": self.keep_alive}
+                if system is not None:
+                    payload["system"] = system
+                if context is not None:
+                    payload["context"] = context
+                if options:
+                    payload["options"] = options
+                threading.Thread(target=self._produce, args=(key, call, payload), daemon=True).start()
+            call.consumers += 1
+        return self._consume(key, call, on_done)
+
+    def generate(self, prompt, **options):
+        return "".join(self.stream(prompt, **options))
+
+    def _consume(self, key, call, on_done=None):
+        try:
+            yield from call.read()
+            if on_done and call.summary:
+                on_done(call.summary)
+        finally:
+            with self._lock:
+                call.consumers -= 1
+                if call.consumers == 0 and not call.done:
+                    call.abandoned.set()
+                    if self._inflight.get(key) is call:
+                        del self._inflight[key]
+
+    def _produce(self, key, call, payload):
+        queued = time.perf_counter()
+        try:
+            with self._slots:
+                start = time.perf_counter()
+                call.timing['queue'] = start - queued
+                self._request(call, payload, start)
+            call.finish()
+        except Exception as e:
+            call.finish(e)
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is call:
+                    del self._inflight[key]
+            self.last_request = time.monotonic()
+            if call.error is not None:
+                call.timing['error'] = str(call.error)
+                call.timing['timeout'] = isinstance(call.error, requests.Timeout)
+            self.timings.append(call.timing)
+            if self.on_timing:
+                self.on_timing(call.timing)
+
+    def _request(self, call, payload, start):
+        for attempt in range(self.retries + 1):
+            call.timing['retries'] = attempt
+            try:
+                with self.session.post(self.url, json=payload, stream=True, timeout=self.timeout) as response:
+                    if response.status_code in RETRY_STATUS and attempt < self.retries:
+                        time.sleep(self.backoff * 2 ** attempt)
+                        continue
+                    response.raise_for_status()
+                    self._read_tokens(call, response, start)
+                    return
+            except (requests.ConnectionError, requests.Timeout):
+                if call.tokens or attempt == self.retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+
+    def _read_tokens(self, call, response, start):
+        summary = call.summary
+        lines = response.iter_lines()
+        for token in iter_ndjson_tokens(lines, on_done=summary.update):
+            if not call.tokens:
+                call.timing['ttft'] = time.perf_counter() - start
+            call.push(token)
+            if call.abandoned.is_set():
+                call.timing['cancelled'] = True
+                break
+        else:
+            # Leer hasta el final del cuerpo deja la conexión libre para reutilizarla
+            for _ in lines:
+                pass
+
+        timing = call.timing
+        timing['total'] = time.perf_counter() - start
+        timing['tokens'] = summary.get('eval_count', len(call.tokens))
+        if 'prompt_eval_duration' in summary:
+            # Procesamiento del prompt (prefill): lo que ahorra reutilizar el contexto
+            timing['prompt_tokens'] = summary.get('prompt_eval_count', 0)
+            timing['prefill'] = summary['prompt_eval_duration'] / 1e9
+        if summary.get('eval_duration'):
+            # Cifras del servidor (nanosegundos): no incluyen la red
+            timing['tokens_per_s'] = timing['tokens'] / (summary['eval_duration'] / 1e9)
+        else:
+            generating = timing['total'] - timing.get('ttft', 0.0)
+            timing['tokens_per_s'] = timing['tokens'] / generating if generating > 0 else 0.0
+
+    def preload(self):
+        """Carga el modelo en memoria (o renueva su keep_alive) sin generar texto"""
+        response = self.session.post(self.url, json={"model": self.model, "keep_alive": self.keep_alive},
+                                     timeout=self.timeout)
+        response.raise_for_status()
+        self.last_request = time.monotonic()
+
+    def keep_warm(self):
+        """Renueva la residencia del modelo si el keep_alive está por vencer"""
+        if self.last_request is None:
+            self.preload()
+        elif isinstance(self.keep_alive, (int, float)) and self.keep_alive >= 0:
+            if time.monotonic() - self.last_request > self.keep_alive / 2:
+                self.preload()
+
+    def close(self):
+        self.session.close()
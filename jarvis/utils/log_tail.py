@@ -0,0 +1,144 @@
+import json
+import os
+
+from utils.interaction_log import list_segments, open_segment
+
+
+class LogTailer:
+    """Lee solo las líneas agregadas a un log desde la última lectura.
+
+    Recuerda (inodo, offset) en un archivo de cursor para retomar tras reiniciar, junto
+    con la primera línea del archivo, porque el sistema puede reutilizar el inodo de un
+    segmento ya borrado, y el número del último segmento cerrado que ya existía. Si el
+    log rotó (una o varias veces), el archivo que se estaba leyendo es el segmento
+    siguiente a ese número: termina de leerlo desde el offset guardado, lee enteros los
+    posteriores en orden y sigue con el archivo nuevo; si se truncó, empieza de cero.
+    No mantiene el archivo abierto entre lecturas para no bloquear la rotación.
+    """
+
+    BLOCK_SIZE = 1 << 20
+    HEAD_SIZE = 256
+
+    def __init__(self, path, cursor_path=None):
+        self.path = path
+        self.cursor_path = cursor_path
+        self._inode = None
+        self._head = b""
+        self._offset = 0
+        self._segment = None  # último segmento cerrado antes del archivo actual
+        self._saved_cursor = None
+        self._load_cursor()
+
+    def _load_cursor(self):
+        if not self.cursor_path or not os.path.exists(self.cursor_path):
+            return
+        try:
+            with open(self.cursor_path) as f:
+                cursor = json.load(f)
+            self._inode, self._offset = cursor['inode'], cursor['offset']
+            self._head = bytes.fromhex(cursor.get('head', ""))
+            self._segment = cursor.get('segment')
+            self._saved_cursor = self._cursor()
+        except (ValueError, KeyError, OSError):
+            self._inode, self._head, self._offset, self._segment = None, b"", 0, None
+
+    def _cursor(self):
+        return (self._inode, self._head, self._offset, self._segment)
+
+    def save_cursor(self):
+        """Persiste el cursor de forma atómica, solo si avanzó"""
+        cursor = self._cursor()
+        if not self.cursor_path or cursor == self._saved_cursor:
+            return False
+        tmp_path = self.cursor_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'inode': self._inode,
+                'head': self._head.hex(),
+                'offset': self._offset,
+                'segment': self._segment
+            }, f)
+        os.replace(tmp_path, self.cursor_path)
+        self._saved_cursor = cursor
+        return True
+
+    def iter_lines(self):
+        """Recorre las líneas completas nuevas (sin el salto de línea)"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            f = None
+
+        with f if f else open(os.devnull, 'rb'):
+            if self._inode is not None and (f is None or not self._is_same_file(f)):
+                # Rotación: lo que faltaba leer quedó en los segmentos cerrados desde entonces
+                yield from self._drain_segments()
+                self._inode, self._head, self._offset = None, b"", 0
+            elif f is not None and os.fstat(f.fileno()).st_size < self._offset:
+                self._head, self._offset = b"", 0
+
+            if f is None:
+                return
+            if self._inode is None:
+                self._inode = os.fstat(f.fileno()).st_ino
+                if self._segment is None:
+                    segments = list_segments(self.path)
+                    self._segment = segments[-1][0] if segments else 0
+            yield from self._drain(f)
+
+            if not self._head and self._offset:
+                f.seek(0)
+                self._head = f.readline(self.HEAD_SIZE)
+
+    def _drain_segments(self):
+        segments = [number for number, _ in list_segments(self.path)]
+        if self._segment is None:
+            # Cursor de una versión anterior: solo se sabe que es el último segmento
+            pending = segments[-1:]
+        else:
+            pending = [number for number in segments if number > self._segment]
+        for index, number in enumerate(pending):
+            if index or (self._segment is not None and number != self._segment + 1):
+                # Solo el segmento que se estaba leyendo se retoma desde el offset
+                self._offset = 0
+            rotated = self._open_segment(number)
+            if rotated:
+                with rotated:
+                    yield from self._drain(rotated)
+        if segments:
+            self._segment = segments[-1]
+
+    def _open_segment(self, number):
+        # Reintenta si la compresión en segundo plano reemplazó el segmento mientras tanto
+        for _ in range(3):
+            path = dict(list_segments(self.path)).get(number)
+            if path is None:
+                return None
+            try:
+                return open_segment(path, 'rb')
+            except FileNotFoundError:
+                continue
+        return None
+
+    def _is_same_file(self, f):
+        if os.fstat(f.fileno()).st_ino != self._inode:
+            return False
+        f.seek(0)
+        return f.read(len(self._head)) == self._head
+
+    def _drain(self, f):
+        f.seek(self._offset)
+        while True:
+            data = f.read(self.BLOCK_SIZE)
+            end = data.rfind(b"\n")
+            if end < 0:
+                # Sin líneas completas (o línea a medio escribir): se relee en el próximo ciclo
+                if len(data) < self.BLOCK_SIZE:
+                    return
+                data = data + f.readline()
+                end = data.rfind(b"\n")
+                if end < 0:
+                    return
+            self._offset += end + 1
+            f.seek(self._offset)
+            yield from data[:end].decode('utf-8', errors='replace').split("\n")
@@ -0,0 +1,260 @@
+import contextvars
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+# Tramo en curso del contexto actual: los tramos nuevos cuelgan de él (asyncio.to_thread lo hereda)
+_current = contextvars.ContextVar("metrics_span", default=None)
+
+
+class Histogram:
+    """Latencias en cubetas log-lineales (al estilo HDR): memoria acotada y error relativo fijo.
+
+    Cada potencia de dos se parte en `sub_buckets` cubetas iguales, así que un percentil
+    se ubica con un error relativo menor a 1/(2*sub_buckets) (0,8% con 64), sea de
+    microsegundos o de minutos.
+    """
+
+    def __init__(self, sub_buckets=64, unit=1e-6):
+        self.sub_buckets = sub_buckets
+        self.unit = unit
+        self.counts = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        mantissa, exponent = math.frexp(max(1.0, seconds / self.unit))  # valor = m * 2**e, m en [0.5, 1)
+        index = exponent * self.sub_buckets + int((mantissa - 0.5) * 2 * self.sub_buckets)
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.sum += seconds
+            self.min = seconds if self.min is None else min(self.min, seconds)
+            self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        """Segundos por debajo de los cuales cae el q% de las mediciones"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, math.ceil(q / 100 * self.count))
+            seen = 0
+            for index in sorted(self.counts):
+                seen += self.counts[index]
+                if seen >= rank:
+                    break
+            exponent, sub = divmod(index, self.sub_buckets)
+            width = 2.0 ** exponent / (2 * self.sub_buckets)
+            middle = (2.0 ** (exponent - 1) + (sub + 0.5) * width) * self.unit
+            return min(max(middle, self.min), self.max)
+
+    def snapshot(self):
+        summary = {"count": self.count, "sum": self.sum, "min": self.min or 0.0, "max": self.max}
+        for q in QUANTILES:
+            summary[f"p{q * 100:g}"] = self.percentile(q * 100)
+        return summary
+
+
+class Span:
+    """Un tramo medido (ASR, ruteo, LLM...); al terminar alimenta el histograma de su nombre"""
+
+    def __init__(self, metrics, name, attrs):
+        parent = _current.get()
+        self.metrics = metrics
+        self.name = name
+        self.attrs = attrs
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(64):016x}"
+        self.span_id = next(metrics._ids)
+        self.parent_id = parent.span_id if parent else None
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+        self._token = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+        return self
+
+    def mark(self, event):
+        """Anota cuántos ms después del inicio ocurrió `event` (p. ej. la primera oración)"""
+        self.attrs[f"{event}_ms"] = round((time.perf_counter() - self.start) * 1000, 3)
+        return self
+
+    def end(self):
+        if self.duration is None:
+            self.duration = time.perf_counter() - self.start
+            self.metrics._finish(self)
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _current.reset(self._token)
+        self.end()
+        return False
+
+
+class _NullSpan:
+    """Tramo que no mide nada: lo que se usa con las métricas apagadas"""
+
+    def set(self, **attrs):
+        return self
+
+    def mark(self, event):
+        return self
+
+    def end(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    """Tramos, histogramas de latencia y contadores del pipeline de voz.
+
+    `span(nombre)` mide un bloque y los tramos abiertos adentro quedan como hijos (un
+    turno completo comparte `trace_id`); `start` abre uno que se cierra a mano con
+    `end()`, p. ej. en otro hilo. Cada tramo cerrado alimenta el histograma de su nombre
+    y, si hay `trace_path`, agrega una línea JSON. `serve` publica todo en formato de
+    texto de Prometheus en localhost. Apagadas, cada llamada devuelve enseguida.
+    """
+
+    def __init__(self, enabled=True, trace_path=None, prefix="jarvis"):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.histograms = {}
+        self.counters = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._trace = open(trace_path, "a", encoding="utf-8") if enabled and trace_path else None
+        self._server = None
+
+    @classmethod
+    def from_config(cls, settings, prefix="jarvis"):
+        """Métricas según la sección "metrics" de la configuración (apagadas si no está)"""
+        metrics = cls(enabled=settings.get("enabled", False), trace_path=settings.get("trace_file"), prefix=prefix)
+        if metrics.enabled and settings.get("port"):
+            metrics.serve(settings["port"])
+        return metrics
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, attrs)
+
+    def start(self, name, **attrs):
+        return self.span(name, **attrs)
+
+    def observe(self, name, seconds):
+        if self.enabled and seconds is not None:
+            self.histogram(name).record(seconds)
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def _finish(self, span):
+        self.histogram(span.name).record(span.duration)
+        if self._trace is not None:
+            line = json.dumps({
+                "trace": span.trace_id, "span": span.span_id, "parent": span.parent_id, "name": span.name,
+                "start": span.wall_start, "ms": round(span.duration * 1000, 3), **span.attrs
+            }, ensure_ascii=False, default=str)
+            with self._lock:
+                self._trace.write(line + "\n")
+                self._trace.flush()
+
+    def snapshot(self):
+        with self._lock:
+            histograms = dict(self.histograms)
+            counters = dict(self.counters)
+        return {"histograms": {name: h.snapshot() for name, h in histograms.items()}, "counters": counters}
+
+    def prometheus(self):
+        """Todo en formato de texto de Prometheus: histogramas como summary, contadores como counter"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, summary in sorted(snapshot["histograms"].items()):
+            metric = self._metric_name(name) + "_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for q in QUANTILES:
+                lines.append(f'{metric}{{quantile="{q}"}} {summary[f"p{q * 100:g}"]:.6f}')
+            lines.append(f"{metric}_sum {summary['sum']:.6f}")
+            lines.append(f"{metric}_count {summary['count']}")
+        for name, value in sorted(snapshot["counters"].items()):
+            metric = self._metric_name(name) + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _metric_name(self, name):
+        return f"{self.prefix}_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """Publica GET /metrics en un hilo propio; solo escucha en la máquina local"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"No se pudo publicar las métricas en {host}:{port}: {e}")
+            return None
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metricas", daemon=True).start()
+        return self._server.server_address
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._trace is not None:
+            with self._lock:
+                self._trace.close()
+                self._trace = None
+
+
+NULL_METRICS = Metrics(enabled=False)
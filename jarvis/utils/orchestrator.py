@@ -0,0 +1,139 @@
+import asyncio
+import contextvars
+import threading
+
+
+class Orchestrator:
+    """Núcleo asíncrono de Jarvis: escucha, comandos y tareas de fondo corren a la vez.
+
+    `listen` es una función bloqueante (micrófono + reconocimiento) que se llama sin
+    pausa en un hilo propio y devuelve un evento o None. Los eventos llegan por una cola
+    al despachador, que los procesa con la corrutina `handle` mientras la escucha sigue.
+    Un evento nuevo reemplaza al que esté en curso: su tarea se cancela y se llama a
+    `on_supersede` (p. ej. para cortar la voz). Nada se sondea: todo espera en colas o eventos.
+    """
+
+    def __init__(self, listen, handle, on_supersede=None, background=()):
+        self.listen = listen
+        self.handle = handle
+        self.on_supersede = on_supersede
+        self.background = list(background)
+        self.current = None  # tarea del evento en curso
+        self._loop = None
+        self._events = None
+        self._stopped = None
+        self._closing = threading.Event()
+
+        self.handled = 0
+        self.superseded = 0
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        self._events = asyncio.Queue()
+        self._stopped = asyncio.Event()
+        self._closing.clear()
+        threading.Thread(target=self._listen_worker, daemon=True).start()
+
+        tasks = [asyncio.create_task(self._dispatch())]
+        tasks += [asyncio.create_task(job()) for job in self.background]
+        try:
+            await self._stopped.wait()
+        finally:
+            self._closing.set()
+            if self.current is not None:
+                tasks.append(self.current)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self):
+        """Detiene el orquestador; se puede llamar desde cualquier hilo"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopped.set)
+
+    def submit(self, event):
+        """Encola un evento desde cualquier hilo"""
+        try:
+            self._loop.call_soon_threadsafe(self._events.put_nowait, event)
+        except RuntimeError:
+            pass  # el loop ya terminó
+
+    def _listen_worker(self):
+        while not self._closing.is_set():
+            try:
+                event = self.listen()
+            except Exception as e:
+                print(f"Error en la escucha: {e}")
+                self._closing.wait(0.5)
+                continue
+            if event is not None and not self._closing.is_set():
+                self.submit(event)
+
+    async def _dispatch(self):
+        while True:
+            event = await self._events.get()
+            if self.current is not None and not self.current.done():
+                self.current.cancel()
+                self.superseded += 1
+                if self.on_supersede:
+                    self.on_supersede()
+                await asyncio.wait([self.current])
+            self.current = asyncio.create_task(self._handle(event))
+
+    async def _handle(self, event):
+        try:
+            await self.handle(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error al procesar {event!r}: {e}")
+        finally:
+            self.handled += 1
+
+
+async def iterate_in_thread(make_iterator):
+    """Recorre un iterador bloqueante en un hilo y entrega sus elementos al loop.
+
+    Si la tarea que consume se cancela, el hilo deja de iterar y cierra el iterador
+    (en el caso del modelo, eso corta la descarga HTTP). El hilo hereda el contexto de
+    la tarea, como asyncio.to_thread (p. ej. el tramo de métricas en curso).
+    """
+    loop = asyncio.get_running_loop()
+    items = asyncio.Queue()
+    cancelled = threading.Event()
+    finished = object()
+
+    def post(item):
+        try:
+            loop.call_soon_threadsafe(items.put_nowait, item)
+        except RuntimeError:
+            pass
+
+    def worker():
+        iterator = make_iterator()
+        try:
+            for item in iterator:
+                if cancelled.is_set():
+                    break
+                post((item, None))
+        except Exception as e:
+            post((None, e))
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close:
+                close()
+            post(finished)
+
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(worker,), daemon=True).start()
+    try:
+        while True:
+            entry = await items.get()
+            if entry is finished:
+                return
+            item, error = entry
+            if error is not None:
+                raise error
+            yield item
+    finally:
+        cancelled.set()
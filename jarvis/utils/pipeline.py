@@ -0,0 +1,153 @@
+from datetime import datetime
+
+from utils.streaming import iter_sentences
+
+
+def record_llm_timing(metrics, timing):
+    """Tiempos de cada consulta a Ollama (llega desde el hilo de la descarga)"""
+    metrics.observe("llm.cola", timing.get('queue'))
+    metrics.observe("llm.ttft", timing.get('ttft'))
+    metrics.observe("llm.total", timing.get('total'))
+    if timing.get('timeout'):
+        metrics.count("llm_timeouts")
+    elif 'error' in timing:
+        metrics.count("llm_errores")
+
+
+class CommandPipeline:
+    """Lo que Jarvis hace con un comando ya reconocido, sin voz: acciones rápidas, caché,
+    acciones web y respuesta del modelo. Lo comparten Jarvis (un usuario, micrófono local)
+    y las sesiones del servidor (un usuario por sesión).
+
+    Usa `router`, `learning` (puede ser None), `conversation`, `model`, `lookup`, `web`,
+    `metrics` y `user_name` de la instancia.
+    """
+
+    FALLBACK_RESPONSE = "Disculpa la demora, estoy teniendo dificultades. ¿Podrías repetir o reformular tu solicitud?"
+
+    def _check_quick_actions(self, text, route=None):
+        route = route or self.router.route(text)
+
+        if route.name == "hora":
+            current_time = datetime.now().strftime("%H:%M")
+            return f"Son las {current_time}, {self.user_name}."
+
+        if route.name == "fecha":
+            current_date = datetime.now().strftime("%d de %B de %Y")
+            return f"Hoy es {current_date}."
+
+        if self.learning:
+            with self.metrics.span("cache_respuestas") as span:
+                cached_response = self.learning.get_personalized_response(text)
+                span.set(acierto=bool(cached_response))
+            self.metrics.count("cache_respuestas_aciertos" if cached_response else "cache_respuestas_fallos")
+            if cached_response:
+                return cached_response
+
+        return None
+
+    def _stream_ai_sentences(self, text, sources=None):
+        processed_text = self._enhance_input(text)
+        self.conversation.set_profile(self._profile_line())
+        prompt = processed_text
+        if sources:
+            prompt = f"{processed_text}\nResultados de la búsqueda:\n{sources}\nResponde con esa información."
+        request = self.conversation.build(prompt)
+        done = {}
+        # Del pedido a la última oración; la cola y el ttft de Ollama llegan por record_llm_timing
+        span = self.metrics.start("llm", con_fuentes=bool(sources))
+        tokens = self.model.stream(request.pop("prompt"), on_done=done.update, **request)
+        spoken = []
+        try:
+            for sentence in self._enhance_sentences(iter_sentences(tokens)):
+                if not spoken:
+                    span.mark("primera_oracion")
+                spoken.append(sentence)
+                yield sentence
+        except Exception as e:
+            print(f"Error al generar respuesta: {e}")
+            span.set(error=type(e).__name__)
+        finally:
+            tokens.close()
+            span.set(oraciones=len(spoken)).end()
+            if spoken:
+                # Sin `context` (respuesta cortada) el próximo turno rearma el prompt desde el historial
+                self.conversation.record(processed_text, " ".join(spoken), done.get("context"))
+
+    def _prefetch_answer(self, text):
+        """Respuesta a un comando habitual calculada de antemano, fuera de la conversación"""
+        system = f"{self.conversation.system_prompt}\n{self._profile_line()}"
+        tokens = self.model.stream(self._enhance_input(text), system=system)
+        try:
+            return " ".join(self._enhance_sentences(iter_sentences(tokens))) or None
+        finally:
+            tokens.close()
+
+    def _enhance_input(self, text):
+        return self.router.correct(text)
+
+    def _profile_line(self):
+        """Perfil para el prefijo de la conversación (fijo entre turnos)"""
+        if not self.learning:
+            return f"[Usuario: {self.user_name}]"
+        user_profile = self.learning.get_user_profile()
+        return f"[Usuario: {self.user_name}, Temas favoritos: {', '.join(user_profile['favorite_topics'])}, Patrón de interacción: {user_profile['interaction_pattern']}]"
+
+    def _enhance_sentences(self, sentences):
+        """Formatea las oraciones a medida que llegan: nombre al principio, estilo aprendido y tope de 2 oraciones"""
+        emitted = 0
+        words = 0
+        held = []
+        for sentence in sentences:
+            if emitted == 0 and not sentence.startswith(self.user_name):
+                sentence = f"{self.user_name}, {sentence}"
+            sentence = self._apply_style(sentence)
+            words += len(sentence.split())
+
+            if emitted < 2:
+                emitted += 1
+                yield sentence
+                continue
+
+            # Más de 30 palabras: la respuesta se corta en 2 oraciones y se deja de generar
+            if words > 30:
+                return
+            held.append(sentence)
+
+        yield from held
+
+    def _apply_style(self, response):
+        if self.learning and self.learning.preferences.get('informal_style', False):
+            response = response.replace("puedo ayudarte", "te puedo ayudar")
+            response = response.replace("disculpa", "perdoná")
+        return response
+
+    def _execute_associated_actions(self, text, route=None):
+        route = route or self.router.route(text)
+        query = route.slots.get('query')
+        if not query or route.name not in ("reproducir", "buscar"):
+            return None
+
+        with self.metrics.span("web.accion", intencion=route.name):
+            return self._run_web_action(route.name, query)
+
+    def _run_web_action(self, intent, query):
+        if intent == "reproducir":
+            # El video se resuelve por HTTP; el navegador solo lo abre
+            url = self.lookup.resolve_video(query)
+            if not (url and self.web.play_video(url)):
+                self.web.play_youtube(query)
+            return f"Listo {self.user_name}, estoy reproduciendo {query} en YouTube."
+
+        self.web.search_web(query)
+        return f"Encontré esto sobre {query}. ¿Te sirve la información?"
+
+    def _search_sources(self, query):
+        """Resumen de los primeros resultados para el modelo; None si no se pudo buscar"""
+        with self.metrics.span("web.busqueda") as span:
+            hits = self.lookup.cache_hits
+            results = self.lookup.search(query)
+            cached = self.lookup.cache_hits > hits
+            span.set(resultados=len(results), cache=cached)
+        self.metrics.count("cache_web_aciertos" if cached else "cache_web_fallos")
+        return self.lookup.summarize(results) if results else None
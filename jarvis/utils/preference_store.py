@@ -0,0 +1,341 @@
+import json
+import os
+import pickle
+import shutil
+import sqlite3
+import threading
+from collections import defaultdict
+from collections.abc import MutableMapping
+
+# Tipo de cada sección de preferencias y si se carga recién al usarla
+SECTIONS = {
+    'frequent_commands': ('counter', False),
+    'preferred_responses': ('dict', False),
+    'corrections': ('dict', False),
+    'dislikes': ('set', False),
+    'preferred_topics': ('counter', False),
+    'interaction_times': ('list', True),
+    'command_patterns': ('dict', True),
+    'media_patterns': ('list', False),
+}
+SETTINGS = '_settings'  # valores sueltos, p. ej. 'informal_style'
+
+MAX_KEYS = 5000        # tope de claves por sección de tipo counter/dict/set
+MAX_ITEMS = 1000       # tope de elementos por lista
+MAX_PATTERN_ITEMS = 50  # tope por lista dentro de command_patterns
+
+
+class BoundedList(list):
+    """Lista con tope que recuerda la secuencia de su primer elemento.
+
+    append/extend solo agregan al final, así el guardado inserta las filas nuevas y
+    borra las descartadas; cualquier otra mutación marca la lista para reescribirla.
+    """
+
+    def __init__(self, items=(), maxlen=MAX_ITEMS, start_seq=0):
+        super().__init__(items)
+        self.maxlen = maxlen
+        self.start_seq = start_seq
+        self.rewrite = False
+        self._trim()
+
+    @property
+    def end_seq(self):
+        return self.start_seq + len(self)
+
+    def append(self, item):
+        super().append(item)
+        self._trim()
+
+    def extend(self, items):
+        super().extend(items)
+        self._trim()
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def _trim(self):
+        excess = len(self) - self.maxlen
+        if excess > 0:
+            super().__delitem__(slice(0, excess))
+            self.start_seq += excess
+
+
+def _marks_rewrite(name):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self.rewrite = True
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+for _name in ('__setitem__', '__delitem__', 'insert', 'remove', 'pop', 'clear', 'sort', 'reverse'):
+    setattr(BoundedList, _name, _marks_rewrite(_name))
+
+
+class PreferenceStore:
+    """Preferencias en SQLite (modo WAL): cada guardado escribe solo lo que cambió.
+
+    Cada sección se guarda como filas (sección, clave, valor JSON). Las escrituras son
+    transacciones, así que un corte a mitad de guardado no corrompe nada; el WAL se
+    compacta cada `checkpoint_every` guardados y al cerrar. Con `backup_path`, cada
+    compactación deja además una copia completa ahí, que se restaura si la base no se
+    puede abrir. Las secciones grandes (historial) se cargan recién cuando alguien las usa.
+    """
+
+    def __init__(self, path, legacy_pickle=None, checkpoint_every=50, backup_path=None):
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.backup_path = backup_path
+        self._saves = 0
+        self._lock = threading.RLock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        try:
+            self._connect()
+        except sqlite3.DatabaseError:
+            if not backup_path or not os.path.exists(backup_path):
+                raise
+            self._restore_backup()
+
+        self._shadow = {}  # sección -> {clave: copia del valor} tal como está en disco
+        self._list_end = {}  # sección de lista -> secuencia siguiente a la última fila guardada
+
+        if legacy_pickle and os.path.exists(legacy_pickle) and self._is_empty():
+            self._migrate(legacy_pickle)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS prefs ("
+                " section TEXT NOT NULL, key TEXT NOT NULL, value TEXT,"
+                " PRIMARY KEY (section, key)) WITHOUT ROWID"
+            )
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        self._conn = conn
+
+    def _restore_backup(self):
+        """Aparta la base dañada y vuelve a la última copia"""
+        print(f"No se pudo abrir {self.path}; se restaura la copia {self.backup_path}")
+        os.replace(self.path, self.path + ".danada")
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+        shutil.copyfile(self.backup_path, self.path)
+        self._connect()
+
+    def _is_empty(self):
+        return self._conn.execute("SELECT 1 FROM prefs LIMIT 1").fetchone() is None
+
+    def _migrate(self, legacy_pickle):
+        """Importa el pickle del formato anterior una sola vez"""
+        with open(legacy_pickle, 'rb') as f:
+            legacy = pickle.load(f)
+        preferences = Preferences(self)
+        for name, value in legacy.items():
+            preferences[name] = value
+        self.save(preferences)
+        os.replace(legacy_pickle, legacy_pickle + ".migrated")
+
+    def load_section(self, name):
+        kind = SECTIONS[name][0] if name in SECTIONS else None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM prefs WHERE section = ? ORDER BY key", (name,)
+            ).fetchall()
+        # Un solo json.loads por sección: mucho más rápido que decodificar fila por fila
+        items = json.loads("[" + ",".join(value for _, value in rows) + "]")
+
+        if kind == 'list':
+            start_seq = int(rows[0][0]) if rows else 0
+            self._list_end[name] = start_seq + len(items)
+            return BoundedList(items, start_seq=start_seq)
+
+        values = dict(zip((key for key, _ in rows), items))
+        self._shadow[name] = {key: _copy(value) for key, value in values.items()}
+        if kind == 'counter':
+            return defaultdict(int, values)
+        if kind == 'set':
+            return set(values)
+        if name == 'command_patterns':
+            return defaultdict(list, values)
+        return values
+
+    def load_settings(self):
+        return self.load_section(SETTINGS)
+
+    def save(self, preferences):
+        """Persiste los cambios de las secciones cargadas en una transacción"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for name, value in preferences.loaded_items():
+                    if name in SECTIONS and SECTIONS[name][0] == 'list':
+                        self._save_list(name, value)
+                    else:
+                        self._save_mapping(name, value)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            self._saves += 1
+            if self._saves % self.checkpoint_every == 0:
+                self.compact()
+
+    def _save_mapping(self, name, value):
+        kind = SECTIONS[name][0] if name in SECTIONS else 'dict'
+        if name != SETTINGS:
+            _trim_in_place(name, value, kind)
+        if kind == 'set':
+            value = dict.fromkeys(value)
+
+        shadow = self._shadow.setdefault(name, {})
+        changed = [
+            (str(key), item) for key, item in value.items()
+            if str(key) not in shadow or shadow[str(key)] != item
+        ]
+        removed = [key for key in shadow if key not in value]
+
+        if changed:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO prefs VALUES (?, ?, ?)",
+                [(name, key, json.dumps(item, ensure_ascii=False)) for key, item in changed]
+            )
+            shadow.update((key, _copy(item)) for key, item in changed)
+        if removed:
+            self._conn.executemany("DELETE FROM prefs WHERE section = ? AND key = ?", [(name, key) for key in removed])
+            for key in removed:
+                del shadow[key]
+
+    def _save_list(self, name, items):
+        if items.rewrite:
+            self._conn.execute("DELETE FROM prefs WHERE section = ?", (name,))
+            first_new = items.start_seq
+            items.rewrite = False
+        else:
+            self._conn.execute(
+                "DELETE FROM prefs WHERE section = ? AND key < ?", (name, _seq_key(items.start_seq))
+            )
+            first_new = max(self._list_end.get(name, 0), items.start_seq)
+
+        new_rows = [
+            (name, _seq_key(seq), json.dumps(items[seq - items.start_seq], ensure_ascii=False))
+            for seq in range(first_new, items.end_seq)
+        ]
+        if new_rows:
+            self._conn.executemany("INSERT OR REPLACE INTO prefs VALUES (?, ?, ?)", new_rows)
+        self._list_end[name] = items.end_seq
+
+    def compact(self):
+        """Vuelca el WAL a la base y lo trunca; renueva la copia de respaldo si hay una"""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            if self.backup_path:
+                self.snapshot(self.backup_path)
+
+    def snapshot(self, path):
+        """Copia consistente de la base; aparece en `path` de forma atómica"""
+        tmp_path = path + ".tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        with self._lock:
+            self._conn.execute("VACUUM INTO ?", (tmp_path,))
+        os.replace(tmp_path, path)
+
+    def close(self):
+        with self._lock:
+            self.compact()
+            self._conn.close()
+
+
+def _copy(value):
+    # Copia superficial: las listas de command_patterns se modifican en el lugar
+    return list(value) if isinstance(value, list) else value
+
+
+def _seq_key(seq):
+    return f"{seq:012d}"
+
+
+def _trim_in_place(name, value, kind):
+    """Aplica los topes sobre el objeto en memoria para que tampoco crezca ahí"""
+    if name == 'command_patterns':
+        for items in value.values():
+            del items[:-MAX_PATTERN_ITEMS]
+
+    excess = len(value) - MAX_KEYS
+    if excess <= 0:
+        return
+    if kind == 'counter':
+        drop = sorted(value, key=value.get)[:excess]  # los menos usados
+    else:
+        drop = list(value)[:excess]  # los más viejos (orden de inserción)
+    for key in drop:
+        if kind == 'set':
+            value.discard(key)
+        else:
+            del value[key]
+
+
+class Preferences(MutableMapping):
+    """Vista tipo dict de las preferencias que carga cada sección al primer acceso"""
+
+    def __init__(self, store, eager=True):
+        self._store = store
+        self._sections = {}
+        self._settings = None
+        if eager:
+            for name, (_, lazy) in SECTIONS.items():
+                if not lazy:
+                    self[name]
+
+    def __getitem__(self, name):
+        if name in SECTIONS:
+            if name not in self._sections:
+                self._sections[name] = self._store.load_section(name)
+            return self._sections[name]
+        settings = self._load_settings()
+        if name not in settings:
+            raise KeyError(name)
+        return settings[name]
+
+    def __setitem__(self, name, value):
+        if name in SECTIONS:
+            if SECTIONS[name][0] == 'list' and not isinstance(value, BoundedList):
+                value = BoundedList(value, start_seq=self._store._list_end.get(name, 0))
+                value.rewrite = True
+            self._sections[name] = value
+        else:
+            self._load_settings()[name] = value
+
+    def __delitem__(self, name):
+        if name in SECTIONS:
+            raise KeyError(f"La sección {name} no se puede borrar")
+        del self._load_settings()[name]
+
+    def __iter__(self):
+        yield from SECTIONS
+        yield from self._load_settings()
+
+    def __len__(self):
+        return len(SECTIONS) + len(self._load_settings())
+
+    def _load_settings(self):
+        if self._settings is None:
+            self._settings = self._store.load_settings()
+        return self._settings
+
+    def loaded_items(self):
+        """Secciones ya cargadas en memoria: las únicas que pueden haber cambiado"""
+        items = list(self._sections.items())
+        if self._settings is not None:
+            items.append((SETTINGS, self._settings))
+        return items
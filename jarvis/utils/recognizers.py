@@ -0,0 +1,109 @@
+import json
+import threading
+
+_vosk_models = {}
+_vosk_lock = threading.Lock()
+
+
+def load_vosk_model(path):
+    """Carga el modelo de Vosk una sola vez por ruta; lo comparten todos los reconocedores"""
+    with _vosk_lock:
+        if path not in _vosk_models:
+            from vosk import Model, SetLogLevel
+            SetLogLevel(-1)
+            _vosk_models[path] = Model(path)
+        return _vosk_models[path]
+
+
+class GoogleRecognizer:
+    """Reconocimiento en línea con recognize_google: espera el enunciado completo"""
+
+    def __init__(self, language="es-AR", recognizer=None):
+        import speech_recognition as sr
+        self._sr = sr
+        self.language = language
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def start(self, samplerate):
+        return _GoogleSession(self, samplerate)
+
+
+class _GoogleSession:
+    def __init__(self, backend, samplerate):
+        self.backend = backend
+        self.samplerate = samplerate
+
+    def feed(self, pcm):
+        return None  # sin resultados parciales
+
+    def finish(self, utterance):
+        sr = self.backend._sr
+        audio = sr.AudioData(utterance.to_bytes(), utterance.samplerate, 2)
+        try:
+            return self.backend.recognizer.recognize_google(audio, language=self.backend.language)
+        except sr.UnknownValueError:
+            return None
+
+    def cancel(self):
+        pass
+
+
+class VoskRecognizer:
+    """Reconocimiento local y en streaming con Vosk: decodifica mientras el usuario habla"""
+
+    def __init__(self, model_path="modelos/vosk-es"):
+        self.model = load_vosk_model(model_path)
+        self._idle = []  # reconocedores listos para reutilizar (crearlos tiene costo)
+        self._lock = threading.Lock()
+
+    def start(self, samplerate):
+        from vosk import KaldiRecognizer
+        with self._lock:
+            recognizer = self._idle.pop() if self._idle else None
+        if recognizer is None or recognizer[0] != samplerate:
+            recognizer = (samplerate, KaldiRecognizer(self.model, samplerate))
+        return _VoskSession(self, recognizer)
+
+    def _release(self, recognizer):
+        recognizer[1].Reset()
+        with self._lock:
+            self._idle.append(recognizer)
+
+
+class _VoskSession:
+    def __init__(self, backend, recognizer):
+        self.backend = backend
+        self._recognizer = recognizer
+        self._final = []
+
+    def feed(self, pcm):
+        """Entrega audio nuevo; devuelve el texto parcial reconocido hasta ahora"""
+        rec = self._recognizer[1]
+        if rec.AcceptWaveform(bytes(pcm)):
+            text = json.loads(rec.Result()).get("text", "")
+            if text:
+                self._final.append(text)
+            return " ".join(self._final)
+        partial = json.loads(rec.PartialResult()).get("partial", "")
+        return " ".join(self._final + ([partial] if partial else []))
+
+    def finish(self, utterance=None):
+        rec = self._recognizer[1]
+        text = json.loads(rec.FinalResult()).get("text", "")
+        if text:
+            self._final.append(text)
+        self.backend._release(self._recognizer)
+        return " ".join(self._final) or None
+
+    def cancel(self):
+        self.backend._release(self._recognizer)
+
+
+def create_recognizer(settings):
+    """Backend según la configuración; si Vosk no está disponible se usa Google"""
+    if settings.get("backend", "google") == "vosk":
+        try:
+            return VoskRecognizer(settings.get("model_path", "modelos/vosk-es"))
+        except Exception as e:
+            print(f"Reconocimiento local no disponible ({e}); se usará Google.")
+    return GoogleRecognizer(settings.get("language", "es-AR"))
@@ -0,0 +1,292 @@
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+
+# Palabras que no cambian qué se pregunta (ya normalizadas: sin tildes)
+FILLER_WORDS = {
+    "el", "la", "los", "las", "un", "una", "unos", "unas", "lo", "de", "del", "al", "a", "en", "y", "o",
+    "que", "es", "son", "me", "te", "se", "le", "nos", "mi", "tu", "su", "por", "favor", "porfa",
+    "jarvis", "oye", "hola", "gracias", "puedes", "podrias", "dime", "decime", "sobre", "acerca",
+}
+NUMBER_WORDS = {
+    "cero", "uno", "una", "dos", "tres", "cuatro", "cinco", "seis", "siete", "ocho", "nueve", "diez",
+    "once", "doce", "trece", "catorce", "quince", "veinte", "treinta", "cuarenta", "cincuenta", "cien",
+    "ciento", "mil", "millon", "millones", "primero", "segundo", "tercero", "medio",
+}
+STEM_CHARS = 5
+
+
+def command_signature(key):
+    """Lo que dos comandos parecidos deben compartir para dar la misma respuesta.
+
+    Los números (en cifras o en palabras) en el mismo orden y las mismas palabras de
+    contenido, recortadas a `STEM_CHARS` letras para tolerar plural y conjugación: así
+    "cuánto es 2 más 3" no reutiliza la respuesta de "cuánto es 2 más 2".
+    """
+    numbers = []
+    words = set()
+    for word in key.split():
+        if word.isdigit() or word in NUMBER_WORDS:
+            numbers.append(word)
+        elif word not in FILLER_WORDS:
+            words.add(word[:STEM_CHARS])
+    return tuple(numbers), frozenset(words)
+
+
+def normalize_command(text):
+    """Minúsculas, sin tildes ni puntuación, espacios colapsados"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+class _CacheEntry:
+    __slots__ = ('slot', 'response', 'created', 'size', 'signature')
+
+    def __init__(self, slot, response, created, size, signature):
+        self.slot = slot
+        self.response = response
+        self.created = created
+        self.size = size
+        self.signature = signature
+
+
+class ResponseCache:
+    """Caché semántica de respuestas: comandos parecidos reutilizan la respuesta sin pasar por el LLM.
+
+    Los comandos se vectorizan con un HashingVectorizer (sin ajuste previo, así la matriz
+    crece de forma incremental) y la búsqueda es un producto disperso contra todas las filas.
+    Las filas nuevas se acumulan en una cola y se apilan en bloque; las filas desalojadas
+    solo se marcan como muertas y se compactan cuando superan a las vivas. El parecido
+    de n-gramas no ve que "2 más 3" y "2 más 2" son preguntas distintas: de los
+    `CANDIDATES` más parecidos solo vale uno con la misma `command_signature`.
+    """
+
+    TAIL_ROWS = 256
+    COMPACT_MIN_DEAD = 1024
+    CANDIDATES = 8
+
+    def __init__(self, threshold=0.75, max_entries=10000, max_bytes=32 * 1024 * 1024,
+                 ttl=7 * 24 * 3600, n_features=2 ** 18):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, analyzer='char_wb', ngram_range=(3, 5),
+            alternate_sign=False, norm='l2', dtype=np.float32
+        )
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # comando normalizado -> _CacheEntry, en orden LRU
+        self._slot_keys = []           # fila de la matriz -> comando (None si está muerta)
+        self._alive = np.zeros(0, dtype=bool)
+        self._frozen = sp.csr_matrix((0, n_features), dtype=np.float32)
+        self._tail = []
+        self._dead = 0
+        self.bytes_used = 0
+
+        self.hits = 0
+        self.exact_hits = 0
+        self.misses = 0
+        self.lookup_time = 0.0
+        self.max_lookup_time = 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, command, now=None):
+        """Devuelve la respuesta cacheada más parecida o None si ninguna supera el umbral"""
+        start = time.perf_counter()
+        now = time.time() if now is None else now
+        key = normalize_command(command)
+        with self._lock:
+            response = self._lookup_exact(key, now)
+            if response is not None:
+                self.exact_hits += 1
+            else:
+                similar = self._nearest(key)
+                if similar is not None:
+                    response = self._lookup_exact(similar, now)
+
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        elapsed = time.perf_counter() - start
+        self.lookup_time += elapsed
+        self.max_lookup_time = max(self.max_lookup_time, elapsed)
+        return response
+
+    def nearest(self, command):
+        """Comando cacheado más parecido (normalizado) o None"""
+        key = normalize_command(command)
+        with self._lock:
+            if key in self._entries:
+                return key
+            return self._nearest(key)
+
+    def add(self, command, response, now=None):
+        key = normalize_command(command)
+        if not key or not response:
+            return
+        now = time.time() if now is None else now
+        with self._lock:
+            self._insert(key, response, now, self.vectorizer.transform([key]))
+            self._evict()
+
+    def save(self, path):
+        """Guarda las entradas vigentes (sin los vectores) en JSON Lines, de forma atómica"""
+        with self._lock:
+            records = [{'comando': key, 'respuesta': entry.response, 'creado': entry.created}
+                       for key, entry in self._entries.items()]
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, path)
+        return len(records)
+
+    def load(self, path, now=None):
+        """Agrega las entradas guardadas con `save` que no vencieron; vectoriza todas juntas"""
+        now = time.time() if now is None else now
+        records = []
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if now - record['creado'] <= self.ttl and record['comando'] and record['respuesta']:
+                        records.append(record)
+        except FileNotFoundError:
+            return 0
+        if not records:
+            return 0
+        rows = self.vectorizer.transform([record['comando'] for record in records])
+        with self._lock:
+            for i, record in enumerate(records):
+                self._insert(record['comando'], record['respuesta'], record['creado'], rows[i])
+            self._evict()
+        return len(records)
+
+    def _insert(self, key, response, now, row):
+        if key in self._entries:
+            self._remove(key)
+        slot = len(self._slot_keys)
+        self._slot_keys.append(key)
+        self._tail.append(row)
+        self._grow_alive(slot + 1)
+        self._alive[slot] = True
+
+        size = len(key) + len(response) + row.nnz * 8
+        self._entries[key] = _CacheEntry(slot, response, now, size, command_signature(key))
+        self.bytes_used += size
+
+        if len(self._tail) >= self.TAIL_ROWS:
+            self._flush_tail()
+
+    def purge_expired(self, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [k for k, e in self._entries.items() if now - e.created > self.ttl]
+            for key in expired:
+                self._remove(key)
+            self._maybe_compact()
+        return len(expired)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes_used,
+            'lookups': lookups,
+            'hits': self.hits,
+            'exact_hits': self.exact_hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'avg_lookup_ms': self.lookup_time / lookups * 1000 if lookups else 0.0,
+            'max_lookup_ms': self.max_lookup_time * 1000,
+        }
+
+    def _lookup_exact(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now - entry.created > self.ttl:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.response
+
+    def _nearest(self, key):
+        if not self._entries or not key:
+            return None
+        # Consulta densa: csr @ vector denso es O(nnz) y evita el producto disperso-disperso
+        query = self.vectorizer.transform([key]).toarray().ravel()
+
+        scores = np.zeros(len(self._slot_keys), dtype=np.float32)
+        n_frozen = self._frozen.shape[0]
+        if n_frozen:
+            scores[:n_frozen] = self._frozen @ query
+        if self._tail:
+            scores[n_frozen:] = sp.vstack(self._tail, format='csr') @ query
+        scores[~self._alive[:len(scores)]] = 0.0
+
+        count = min(self.CANDIDATES, len(scores))
+        candidates = np.argpartition(-scores, count - 1)[:count]
+        signature = command_signature(key)
+        for slot in candidates[np.argsort(-scores[candidates])]:
+            if scores[slot] < self.threshold:
+                return None
+            candidate = self._slot_keys[slot]
+            if self._entries[candidate].signature == signature:
+                return candidate
+        return None
+
+    def _flush_tail(self):
+        if self._tail:
+            self._frozen = sp.vstack([self._frozen] + self._tail, format='csr')
+            self._tail = []
+
+    def _grow_alive(self, size):
+        if size > len(self._alive):
+            grown = np.zeros(max(size, len(self._alive) * 2, 64), dtype=bool)
+            grown[:len(self._alive)] = self._alive
+            self._alive = grown
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._alive[entry.slot] = False
+        self._slot_keys[entry.slot] = None
+        self.bytes_used -= entry.size
+        self._dead += 1
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes_used > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._dead < self.COMPACT_MIN_DEAD or self._dead < len(self._entries):
+            return
+        self._flush_tail()
+        alive = np.flatnonzero(self._alive[:len(self._slot_keys)])
+        self._frozen = self._frozen[alive]
+        self._slot_keys = [self._slot_keys[i] for i in alive]
+        self._alive = np.ones(len(alive), dtype=bool)
+        for slot, key in enumerate(self._slot_keys):
+            self._entries[key].slot = slot
+        self._dead = 0
@@ -36,8 +36,15 @@ class ResponseManager:
     def get_processing_phrase(self, command_type='generic'):
         return random.choice(self.processing_phrases.get(command_type, self.processing_phrases['generic']))
 
-    def get_time_based_greeting(self):
-        hour = datetime.now().hour
+    def get_fixed_phrases(self):
+        """Todas las frases fijas, para pre-sintetizarlas"""
+        phrases = list(self.acknowledgements)
+        for options in self.processing_phrases.values():
+            phrases.extend(options)
+        return phrases + ["Buenos días", "Buenas tardes", "Buenas noches"]
+
+    def get_time_based_greeting(self, moment=None):
+        hour = (moment or datetime.now()).hour
         if 5 <= hour < 12:
             return "Buenos días"
         elif 12 <= hour < 19:
@@ -0,0 +1,154 @@
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class _Entry:
+    def __init__(self):
+        self.session = None
+        self.error = None
+        self.users = 0  # pedidos que la están usando: no se desaloja
+        self.ready = threading.Event()
+
+
+class SessionPool:
+    """Sesiones por usuario cargadas bajo demanda, con desalojo LRU y memoria acotada.
+
+    `factory(user_id)` construye la sesión (su LearningEngine, ruteo y conversación) y
+    `size(session)` estima cuántos bytes ocupa. Se mantienen a lo sumo `max_sessions`
+    sesiones y `max_bytes` en total; al pasarse se cierran (`close(session)`) las menos
+    usadas que nadie esté usando. Cada usuario se carga una sola vez aunque lleguen
+    varios pedidos juntos, y sin frenar a los demás usuarios mientras tanto. Si vuelve
+    mientras su sesión desalojada se está cerrando, la nueva se carga recién cuando
+    termina el cierre, así lee lo que la anterior dejó en disco.
+    """
+
+    def __init__(self, factory, max_sessions=32, max_bytes=256 * 1024 * 1024, size=None, close=None):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.size = size or (lambda session: 0)
+        self.close = close or (lambda session: None)
+        self._entries = OrderedDict()  # user_id -> _Entry, de la menos a la más usada
+        self._closing = {}  # user_id -> Event que se activa cuando termina de cerrarse su sesión
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    @contextmanager
+    def lease(self, user_id):
+        """La sesión del usuario mientras dure el bloque; no se desaloja en ese tiempo"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            load = entry is None
+            closing = self._closing.get(user_id)
+            if load:
+                entry = self._entries[user_id] = _Entry()
+                self.loads += 1
+            else:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+            entry.users += 1
+        try:
+            if load:
+                try:
+                    if closing is not None:
+                        closing.wait()
+                    entry.session = self.factory(user_id)
+                except Exception as e:
+                    entry.error = e
+                    with self._lock:
+                        if self._entries.get(user_id) is entry:
+                            del self._entries[user_id]
+                    raise
+                finally:
+                    entry.ready.set()
+            else:
+                entry.ready.wait()
+                if entry.error is not None:
+                    raise entry.error
+            yield entry.session
+        finally:
+            with self._lock:
+                entry.users -= 1
+            self._evict()
+
+    def visit(self, callback):
+        """Llama a `callback(session)` con cada sesión cargada, sin cambiar el orden de uso.
+
+        Mientras tanto la sesión no se desaloja; es para tareas de fondo (mantenimiento).
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+        for user_id, entry in entries:
+            with self._lock:
+                # Se saltea si se desalojó o todavía se está cargando
+                if self._entries.get(user_id) is not entry or entry.session is None:
+                    continue
+                entry.users += 1
+            try:
+                callback(entry.session)
+            finally:
+                with self._lock:
+                    entry.users -= 1
+        self._evict()
+
+    def bytes_used(self):
+        with self._lock:
+            entries = list(self._entries.values())
+        return sum(self.size(entry.session) for entry in entries if entry.session is not None)
+
+    def stats(self):
+        return {
+            "sessions": len(self._entries),
+            "bytes": self.bytes_used(),
+            "hits": self.hits,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
+
+    def _evict(self):
+        evicted = []
+        with self._lock:
+            total = sum(self.size(entry.session) for entry in self._entries.values() if entry.session is not None)
+            for user_id, entry in list(self._entries.items()):
+                if len(self._entries) <= self.max_sessions and total <= self.max_bytes:
+                    break
+                if entry.users or entry.session is None:
+                    continue
+                del self._entries[user_id]
+                total -= self.size(entry.session)
+                evicted.append(self._start_closing(user_id, entry.session))
+                self.evictions += 1
+        # Cerrar (volcar al disco) fuera del lock: no frena a los otros usuarios
+        self._finish_closing(evicted)
+
+    def close_all(self):
+        with self._lock:
+            closing = [self._start_closing(user_id, entry.session)
+                       for user_id, entry in self._entries.items() if entry.session is not None]
+            self._entries.clear()
+        self._finish_closing(closing)
+
+    def _start_closing(self, user_id, session):
+        # Con el lock tomado: desde ahora `lease` espera este cierre antes de recargar al usuario
+        done = self._closing[user_id] = threading.Event()
+        return user_id, session, done
+
+    def _finish_closing(self, closing):
+        for user_id, session, done in closing:
+            try:
+                self.close(session)
+            except Exception as e:
+                # Una sesión que no se pudo cerrar no debe dejar esperando a su usuario ni a las demás
+                print(f"Error al cerrar la sesión: {e}")
+            finally:
+                with self._lock:
+                    if self._closing.get(user_id) is done:
+                        del self._closing[user_id]
+                done.set()
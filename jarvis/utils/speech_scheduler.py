@@ -0,0 +1,151 @@
+import heapq
+import itertools
+import threading
+import time
+
+from utils.metrics import NULL_METRICS
+
+PRIORITY_FILLER = 0
+PRIORITY_NORMAL = 1
+PRIORITY_ANSWER = 2
+
+
+class SpeechItem:
+    def __init__(self, text, priority, filler, seq, span):
+        self.text = text
+        self.priority = priority
+        self.filler = filler
+        self.seq = seq
+        self.span = span  # abierto al encolar: cuelga del turno que pidió la frase
+        self.queued = time.perf_counter()
+        self.cancelled = False
+        self.interrupted = threading.Event()
+        self.done = threading.Event()
+
+    def __lt__(self, other):
+        # Mayor prioridad primero; a igual prioridad, en orden de llegada
+        return (-self.priority, self.seq) < (-other.priority, other.seq)
+
+
+class SpeechScheduler:
+    """Cola de voz con prioridades sobre un backend de TTS.
+
+    El backend implementa say(text, interrupted), bloqueante, que debe abandonar en cuanto
+    se activa el evento `interrupted`, y stop() para cortar el audio en curso.
+
+    Los rellenos ("Déjame pensar...") no se acumulan: si ya hay uno pendiente o sonando,
+    el nuevo se descarta, y cuando llega una respuesta se eliminan los pendientes y se
+    corta el que esté sonando. `barge_in` corta todo cuando el usuario empieza a hablar.
+    Cada frase registra en `metrics` su espera en la cola ("tts.cola") y su duración ("tts.voz").
+    """
+
+    def __init__(self, backend, interrupt_filler=True, metrics=None):
+        self.backend = backend
+        self.interrupt_filler = interrupt_filler
+        self.metrics = metrics or NULL_METRICS
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self.current = None
+
+        self.dropped_fillers = 0
+        self.barge_ins = 0
+
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    @property
+    def speaking(self):
+        return self.current is not None
+
+    def say(self, text, priority=PRIORITY_NORMAL, filler=False):
+        span = self.metrics.start("tts", caracteres=len(text), relleno=filler)
+        item = SpeechItem(text, priority, filler, next(self._seq), span)
+        with self._cond:
+            if filler and self._has_filler():
+                self.dropped_fillers += 1
+                item.cancelled = True
+                item.done.set()
+                span.set(descartada=True).end()
+                return item
+
+            if not filler:
+                self._drop_pending(lambda pending: pending.filler)
+                if self.interrupt_filler and self.current is not None and self.current.filler:
+                    self._stop_current()
+
+            heapq.heappush(self._heap, item)
+            self._cond.notify_all()
+        return item
+
+    def cancel_current(self):
+        with self._cond:
+            self._stop_current()
+
+    def clear(self):
+        """Descarta todo lo pendiente y corta lo que está sonando"""
+        with self._cond:
+            self._clear()
+
+    def barge_in(self):
+        with self._cond:
+            if self.current is None and not self._heap:
+                return False
+            self.barge_ins += 1
+            self._clear()
+            return True
+
+    def wait_idle(self, timeout=None):
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._heap and self.current is None, timeout)
+
+    def _clear(self):
+        self._drop_pending(lambda pending: True)
+        self._stop_current()
+
+    def _has_filler(self):
+        if self.current is not None and self.current.filler:
+            return True
+        return any(pending.filler for pending in self._heap)
+
+    def _drop_pending(self, predicate):
+        kept = []
+        for pending in self._heap:
+            if predicate(pending):
+                if pending.filler:
+                    self.dropped_fillers += 1
+                pending.cancelled = True
+                pending.done.set()
+                pending.span.set(descartada=True).end()
+            else:
+                kept.append(pending)
+        if len(kept) != len(self._heap):
+            heapq.heapify(kept)
+            self._heap = kept
+
+    def _stop_current(self):
+        if self.current is not None:
+            self.current.interrupted.set()
+            self.backend.stop()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._heap)
+                item = heapq.heappop(self._heap)
+                self.current = item
+            start = time.perf_counter()
+            self.metrics.observe("tts.cola", start - item.queued)
+            try:
+                self.backend.say(item.text, item.interrupted)
+            except Exception as e:
+                print(f"Error al hablar: {e}")
+                item.span.set(error=type(e).__name__)
+            finally:
+                self.metrics.observe("tts.voz", time.perf_counter() - start)
+                item.span.set(cola_ms=round((start - item.queued) * 1000, 1), interrumpida=item.interrupted.is_set())
+                item.span.end()
+                with self._cond:
+                    self.current = None
+                    item.done.set()
+                    self._cond.notify_all()
@@ -0,0 +1,152 @@
+import importlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class StartupProfiler:
+    """Tiempos de importación e inicialización de cada componente durante el arranque.
+
+    `measure` y `import_module` registran cuánto tardó cada paso y en qué hilo corrió;
+    `mark` anota hitos (p. ej. cuándo Jarvis ya puede escuchar). `save` agrega una línea
+    JSON por arranque para seguir la evolución entre versiones.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.records = []  # (componente, fase, segundos, hilo)
+        self.milestones = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()  # mediciones abiertas en este hilo
+
+    @contextmanager
+    def measure(self, component, phase="init"):
+        """Mide el bloque; lo medido adentro (p. ej. un import) se descuenta de este paso"""
+        stack = self._local.__dict__.setdefault("stack", [])
+        nested = [0.0]
+        stack.append(nested)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            with self._lock:
+                self.records.append((component, phase, elapsed - nested[0],
+                                     threading.current_thread().name))
+
+    def import_module(self, name, component=None):
+        """Importa el módulo midiendo el tiempo (lo ya importado por otro componente no cuenta)"""
+        with self.measure(component or name, "import"):
+            return importlib.import_module(name)
+
+    def mark(self, milestone):
+        self.milestones[milestone] = time.perf_counter() - self.start
+
+    def summary(self):
+        components = {}
+        with self._lock:
+            for component, phase, seconds, thread in self.records:
+                entry = components.setdefault(component, {"import": 0.0, "init": 0.0, "thread": thread})
+                entry[phase] += seconds
+        return components
+
+    def report(self):
+        print("Arranque (ms):")
+        print(f"  {'componente':<24} {'import':>8} {'init':>8}  hilo")
+        for component, entry in self.summary().items():
+            print(f"  {component:<24} {entry['import'] * 1000:8.0f} {entry['init'] * 1000:8.0f}  {entry['thread']}")
+        for milestone, seconds in self.milestones.items():
+            print(f"  {milestone}: {seconds * 1000:.0f} ms desde el inicio")
+
+    def save(self, path):
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "milestones": self.milestones,
+            "components": self.summary()
+        }
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"No se pudo guardar el perfil de arranque: {e}")
+
+
+class Component:
+    """Componente que se construye en un hilo aparte.
+
+    Mientras no está listo `value` es None: quien lo usa saltea la función que depende
+    de él o encola el trabajo con `when_ready`, que corre apenas termina de cargar.
+    """
+
+    def __init__(self, name, factory, profiler=None):
+        self.name = name
+        self.factory = factory
+        self.profiler = profiler
+        self.value = None
+        self.error = None
+        self._done = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @classmethod
+    def loaded(cls, name, value):
+        """Componente ya construido (p. ej. inyectado)"""
+        component = cls(name, None)
+        component.value = value
+        component._done.set()
+        return component
+
+    @property
+    def ready(self):
+        return self._done.is_set() and self.value is not None
+
+    def start(self):
+        if self._thread is None and not self._done.is_set():
+            self._thread = threading.Thread(target=self._load, name=f"carga-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def _load(self):
+        try:
+            if self.profiler:
+                with self.profiler.measure(self.name):
+                    value = self.factory()
+            else:
+                value = self.factory()
+        except Exception as e:
+            print(f"No se pudo iniciar {self.name}: {e}")
+            self.error = e
+            value = None
+        with self._lock:
+            self.value = value
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            self._run(callback)
+
+    def wait(self, timeout=None):
+        """Espera a que termine de cargar; devuelve el componente o None si falló o no llegó a tiempo"""
+        self._done.wait(timeout)
+        return self.value
+
+    def when_ready(self, callback):
+        """Llama a `callback(valor)` ya o cuando termine de cargar (nunca si falló)"""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        self._run(callback)
+
+    def _run(self, callback):
+        if self.value is None:
+            return
+        try:
+            callback(self.value)
+        except Exception as e:
+            print(f"Error al usar {self.name}: {e}")
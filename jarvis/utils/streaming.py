@@ -0,0 +1,46 @@
+import json
+import re
+
+# Fin de oración: puntuación seguida de espacio. Se conserva la puntuación.
+SENTENCE_END = re.compile(r'(?<=[.!?…])\s+')
+
+
+def iter_ndjson_tokens(lines, on_done=None):
+    """Convierte las líneas NDJSON de /api/generate en fragmentos de texto.
+
+    `on_done` recibe el último fragmento (con las estadísticas de la generación).
+    """
+    for line in lines:
+        if not line:
+            continue
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        try:
+            chunk = json.loads(line)
+        except ValueError:
+            continue
+        if chunk.get('error'):
+            raise RuntimeError(chunk['error'])
+        token = chunk.get('response', '')
+        if token:
+            yield token
+        if chunk.get('done'):
+            if on_done:
+                on_done(chunk)
+            break
+
+
+def iter_sentences(tokens):
+    """Agrupa los fragmentos en oraciones completas a medida que llegan"""
+    buffer = ""
+    for token in tokens:
+        buffer += token
+        parts = SENTENCE_END.split(buffer)
+        for sentence in parts[:-1]:
+            sentence = sentence.strip()
+            if sentence:
+                yield sentence
+        buffer = parts[-1]
+
+    if buffer.strip():
+        yield buffer.strip()
@@ -2,57 +2,215 @@ import speech_recognition as sr
 import pyttsx3
 import time
 import threading
-from queue import Queue
+from collections import deque
+from utils.audio_source import MicrophoneSource
+from utils.audio_stream import AudioCapture, VoiceActivityDetector
+from utils.recognizers import GoogleRecognizer
+from utils.speech_scheduler import SpeechScheduler, PRIORITY_NORMAL
+from utils.audio_cache import CachedSpeechBackend
+import numpy as np
+
+class Pyttsx3Backend:
+    """Backend de voz para SpeechScheduler sobre pyttsx3"""
+
+    def __init__(self, engine=None, rate=160, volume=0.9):
+        self.engine = engine
+        self.rate = rate
+        self.volume = volume
+        # pyttsx3 no admite dos runAndWait a la vez: hablar y pre-sintetizar se turnan
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        if engine is not None:
+            self._ready.set()
+
+    def start(self):
+        """Inicia pyttsx3 en segundo plano: enumerar las voces del sistema tarda"""
+        if not self._ready.is_set():
+            threading.Thread(target=self._init_engine, daemon=True).start()
+        return self
+
+    def _init_engine(self):
+        try:
+            engine = pyttsx3.init()
+            for voice in engine.getProperty('voices'):
+                if 'spanish' in voice.name.lower():
+                    engine.setProperty('voice', voice.id)
+                    break
+            engine.setProperty('rate', self.rate)
+            engine.setProperty('volume', self.volume)
+            self.engine = engine
+        except Exception as e:
+            print(f"Síntesis de voz no disponible ({e}); las respuestas se mostrarán en pantalla.")
+        finally:
+            self._ready.set()
+
+    def say(self, text, interrupted):
+        self._ready.wait()
+        with self._lock:
+            if interrupted.is_set():
+                return
+            if self.engine is None:
+                print(f"Jarvis: {text}")
+                return
+            self.engine.say(text)
+            self.engine.runAndWait()
+
+    def render(self, text, path):
+        """Sintetiza la frase a un archivo WAV sin reproducirla"""
+        self._ready.wait()
+        if self.engine is None:
+            raise RuntimeError("síntesis de voz no disponible")
+        with self._lock:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+
+    def voice_signature(self):
+        self._ready.wait()
+        if self.engine is None:
+            return (None, self.rate, self.volume)
+        return (self.engine.getProperty('voice'), self.engine.getProperty('rate'),
+                self.engine.getProperty('volume'))
+
+    def stop(self):
+        if self.engine is not None:
+            self.engine.stop()
 
 class VoiceEngine:
-    def __init__(self):
+    def __init__(self, audio_source=None, vad_energy_threshold=300, recognizer_backend=None,
+                 tts_backend=None, barge_in_threshold=1500, audio_cache=None, metrics=None):
         self.recognizer = sr.Recognizer()
         self.recognizer.pause_threshold = 1.2
         self.recognizer.energy_threshold = 3500
         self.recognizer.dynamic_energy_threshold = True
+        self.backend = recognizer_backend or GoogleRecognizer(recognizer=self.recognizer)
+        # Segundos entre el fin del enunciado y el texto reconocido (último listen)
+        self.last_recognition_latency = None
 
-        self.engine = pyttsx3.init()
-        self._configure_voice()
-
-        self.speech_queue = Queue()
-        self.speaking = False
-        self._start_speech_thread()
-
-    def _configure_voice(self):
-        voices = self.engine.getProperty('voices')
-        for voice in voices:
-            if 'spanish' in voice.name.lower():
-                self.engine.setProperty('voice', voice.id)
-                break
-        self.engine.setProperty('rate', 160)
-        self.engine.setProperty('volume', 0.9)
-
-    def _start_speech_thread(self):
-        def speech_worker():
-            while True:
-                text = self.speech_queue.get()
-                self.speaking = True
-                self.engine.say(text)
-                self.engine.runAndWait()
-                self.speaking = False
-                self.speech_queue.task_done()
-        thread = threading.Thread(target=speech_worker, daemon=True)
-        thread.start()
-
-    def listen(self, timeout=3):
-        with sr.Microphone() as source:
-            try:
-                print(f"Escuchando (timeout: {timeout}s)...")
-                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=7)
-                text = self.recognizer.recognize_google(audio, language="es-AR")
-                print(f"Usuario: {text}")
-                return text
-            except (sr.WaitTimeoutError, sr.UnknownValueError):
-                return None
-            except Exception as e:
-                print(f"Error en reconocimiento: {e}")
+        if tts_backend is None:
+            # El motor arranca en segundo plano; lo que se diga antes espera en la cola
+            tts_backend = Pyttsx3Backend().start()
+            if audio_cache is not None:
+                tts_backend = CachedSpeechBackend(tts_backend, audio_cache, metrics=metrics)
+        self.tts_backend = tts_backend
+        self.scheduler = SpeechScheduler(tts_backend, metrics=metrics)
+        # Energía por encima de la cual la voz del usuario corta lo que Jarvis está diciendo
+        # (más alta que la del VAD para no dispararse con el eco del parlante)
+        self.barge_in_threshold = barge_in_threshold
+        # Tramos de la captura (en muestras) durante los que Jarvis estaba hablando
+        self._speaking_spans = deque(maxlen=64)
+        self._last_barge_in = -1
+
+        # Captura única y permanente; se abre recién en la primera escucha
+        self.audio_source = audio_source
+        self.vad_energy_threshold = vad_energy_threshold
+        self.capture = None
+        self.vad = None
+        self._capture_lock = threading.Lock()
+
+    def prerender(self, phrases):
+        """Pre-sintetiza en segundo plano frases fijas, si el backend tiene caché de audio"""
+        if hasattr(self.tts_backend, 'prerender'):
+            self.tts_backend.prerender(phrases)
+
+    @property
+    def speaking(self):
+        return self.scheduler.speaking
+
+    def _ensure_capture(self):
+        with self._capture_lock:
+            if self.capture is None:
+                source = self.audio_source or MicrophoneSource()
+                self.capture = AudioCapture(source).start()
+                self.vad = VoiceActivityDetector(
+                    self.capture,
+                    energy_threshold=self.vad_energy_threshold,
+                    pause_threshold=self.recognizer.pause_threshold,
+                    phrase_time_limit=7
+                )
+                threading.Thread(target=self._barge_in_monitor, args=(self.capture.reader(),), daemon=True).start()
+        return self.capture
+
+    def _barge_in_monitor(self, reader, frames_needed=5):
+        """Registra cuándo habla Jarvis y, si el usuario habla encima, corta la voz y lo pendiente"""
+        frame = int(reader.samplerate * 0.03)
+        voiced_run = 0
+        while not reader.eof:
+            block = reader.read(timeout=0.2)
+            if block is None or not self.scheduler.speaking:
+                voiced_run = 0
+                continue
+            self._mark_speaking(reader.position - len(block), reader.position)
+            if not self.barge_in_threshold:
+                continue
+            samples = np.asarray(block)[:len(block) // frame * frame].reshape(-1, frame).astype(np.float32)
+            for energy in np.sqrt(np.mean(samples * samples, axis=1)):
+                voiced_run = voiced_run + 1 if energy >= self.barge_in_threshold else 0
+                if voiced_run >= frames_needed:
+                    if self.scheduler.barge_in():
+                        self._last_barge_in = reader.position
+                        print("(Interrumpido por el usuario)")
+                    voiced_run = 0
+                    break
+
+    def _mark_speaking(self, start, end):
+        if self._speaking_spans and self._speaking_spans[-1][1] >= start:
+            self._speaking_spans[-1] = (self._speaking_spans[-1][0], end)
+        else:
+            self._speaking_spans.append((start, end))
+
+    def _is_echo(self, utterance, tail=0.3):
+        """Voz que empezó y terminó mientras Jarvis hablaba, sin interrumpirlo: es el eco del parlante"""
+        speech_start = min(utterance.start + self.vad.preroll, utterance.end)
+        if self._last_barge_in >= speech_start:
+            return False
+        # El enunciado incluye la pausa final; `tail` tolera la reverberación tras callarse Jarvis
+        voiced_end = utterance.end - self.vad.pause_frames * self.vad.frame
+        margin = int(tail * utterance.samplerate)
+        return any(start <= speech_start < end and voiced_end <= end + margin
+                   for start, end in self._speaking_spans)
+
+    def audio_reader(self):
+        """Lector propio sobre la captura compartida (p. ej. para el detector de activación)"""
+        return self._ensure_capture().reader()
+
+    def discard_pending_audio(self):
+        self._ensure_capture()
+        self.vad.skip_to_now()
+
+    def listen(self, timeout=3, on_partial=None):
+        """Escucha un enunciado; `on_partial` recibe el texto parcial si el backend lo ofrece"""
+        self._ensure_capture()
+        print(f"Escuchando (timeout: {timeout}s)...")
+        session = self.backend.start(self.capture.samplerate)
+        last_partial = None
+
+        def on_audio(pcm):
+            nonlocal last_partial
+            partial = session.feed(pcm)
+            if partial and on_partial and partial != last_partial:
+                last_partial = partial
+                on_partial(partial)
+
+        try:
+            utterance = self.vad.next_utterance(timeout=timeout, on_audio=on_audio)
+            if utterance is None or self._is_echo(utterance):
+                session.cancel()
                 return None
+            end_of_speech = time.perf_counter()
+            text = session.finish(utterance)
+            self.last_recognition_latency = time.perf_counter() - end_of_speech
+        except Exception as e:
+            print(f"Error en reconocimiento: {e}")
+            return None
+
+        if text:
+            print(f"Usuario: {text}")
+        return text or None
 
-    def speak(self, text, async_mode=True):
+    def speak(self, text, async_mode=True, priority=PRIORITY_NORMAL, filler=False):
+        """Encola una frase; los rellenos (filler) se descartan si llega la respuesta"""
         print(f"Jarvis: {text}")
-        self.speech_queue.put(text)
\ No newline at end of file
+        item = self.scheduler.say(text, priority=priority, filler=filler)
+        if not async_mode:
+            item.done.wait()
+        return item
\ No newline at end of file
@@ -0,0 +1,74 @@
+import json
+from collections import deque
+
+import numpy as np
+
+
+class WakeWordDetector:
+    """Detector local de la palabra de activación sobre el flujo PCM continuo.
+
+    Dos etapas: una compuerta de energía descarta el silencio sin gastar CPU y solo
+    el audio con voz pasa a un KaldiRecognizer de Vosk restringido a una gramática
+    con la palabra clave, mucho más liviano que el reconocimiento completo.
+    """
+
+    def __init__(self, keyword, model, samplerate=16000, energy_threshold=300,
+                 preroll_blocks=3, hangover_blocks=5):
+        from vosk import KaldiRecognizer
+
+        self.keyword = keyword.lower()
+        self.energy_threshold = energy_threshold
+        self.hangover_blocks = hangover_blocks
+        self._recognizer = KaldiRecognizer(model, samplerate, json.dumps([self.keyword, "[unk]"]))
+        # Bloques previos a la voz, para no cortar el comienzo de la palabra
+        self._preroll = deque(maxlen=preroll_blocks)
+        self._quiet_blocks = hangover_blocks + 1
+
+        self.blocks_seen = 0
+        self.blocks_decoded = 0
+
+    def _is_voiced(self, block):
+        samples = np.frombuffer(block, dtype=np.int16).astype(np.float32)
+        return samples.size and np.sqrt(np.mean(samples * samples)) >= self.energy_threshold
+
+    def process(self, block):
+        """Procesa un bloque de audio; devuelve True cuando se dijo la palabra clave"""
+        # Vosk espera bytes; los lectores de la captura entregan memoryviews de int16
+        block = bytes(block)
+        self.blocks_seen += 1
+        if self._is_voiced(block):
+            self._quiet_blocks = 0
+        else:
+            self._quiet_blocks += 1
+
+        if self._quiet_blocks > self.hangover_blocks:
+            self._preroll.append(block)
+            return False
+
+        blocks = list(self._preroll) + [block]
+        self._preroll.clear()
+        for pending in blocks:
+            self.blocks_decoded += 1
+            if self._recognizer.AcceptWaveform(pending):
+                text = json.loads(self._recognizer.Result()).get("text", "")
+            else:
+                text = json.loads(self._recognizer.PartialResult()).get("partial", "")
+            if self.keyword in text.split():
+                self._recognizer.Reset()
+                return True
+        return False
+
+    def wait(self, source, timeout=None):
+        """Consume la fuente hasta oír la palabra clave; False si se agotó o venció el tiempo"""
+        elapsed = 0.0
+        while timeout is None or elapsed < timeout:
+            block = source.read(timeout=0.5)
+            if block is None:
+                if source.eof:
+                    return False
+                elapsed += 0.5
+                continue
+            elapsed += memoryview(block).nbytes / 2 / source.samplerate
+            if self.process(block):
+                return True
+        return False
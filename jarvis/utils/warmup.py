@@ -0,0 +1,163 @@
+import time
+from collections import Counter
+from datetime import datetime
+
+
+def _day_type(moment):
+    return "finde" if moment.weekday() >= 5 else "semana"
+
+
+class UsageModel:
+    """En qué franjas del día suele hablar el usuario, aprendido de `interaction_times`.
+
+    Para cada franja de `slot_minutes` guarda en qué fracción de sus días activos el
+    usuario usó el asistente en esa franja o en las `spread` vecinas (un hábito se corre
+    unos minutos de un día a otro), aparte para días de semana y fines de semana (si de
+    alguno hay menos de `min_days` días se usan todos juntos).
+    """
+
+    def __init__(self, times=(), slot_minutes=30, min_days=3, spread=1):
+        self.slot_minutes = slot_minutes
+        self.min_days = min_days
+        self.slots = 24 * 60 // slot_minutes
+        days = {"semana": set(), "finde": set()}
+        seen = {"semana": {}, "finde": {}}  # tipo de día -> franja -> fechas con actividad
+        for value in times:
+            try:
+                moment = datetime.fromisoformat(str(value))
+            except ValueError:
+                continue
+            kind = _day_type(moment)
+            days[kind].add(moment.date())
+            slot = self.slot(moment)
+            for neighbour in range(slot - spread, slot + spread + 1):
+                seen[kind].setdefault(neighbour % self.slots, set()).add(moment.date())
+
+        self.days = {kind: len(dates) for kind, dates in days.items()}
+        total = sum(self.days.values())
+        self.combined = [sum(len(seen[kind].get(slot, ())) for kind in seen) / total if total else 0.0
+                         for slot in range(self.slots)]
+        self.profiles = {
+            kind: [len(seen[kind].get(slot, ())) / self.days[kind] for slot in range(self.slots)]
+            for kind in seen if self.days[kind] >= min_days
+        }
+
+    @property
+    def trained(self):
+        return sum(self.days.values()) >= self.min_days
+
+    def slot(self, moment):
+        return (moment.hour * 60 + moment.minute) // self.slot_minutes
+
+    def probability(self, timestamp):
+        """Probabilidad de que el usuario hable en la franja de `timestamp` (segundos epoch)"""
+        moment = datetime.fromtimestamp(timestamp)
+        profile = self.profiles.get(_day_type(moment), self.combined)
+        return profile[self.slot(moment)]
+
+
+class WarmupScheduler:
+    """Precalienta solo cuando es probable que el usuario hable.
+
+    `tick()` se llama cada tantos segundos. Mantiene el modelo residente (`warm_model`)
+    mientras se espera actividad en los próximos `lead` segundos o mientras dura una
+    conversación (hasta `idle` segundos después de la última interacción); fuera de eso
+    deja que el keep_alive de Ollama venza. El navegador (`warm_browser`) se abre al
+    empezar la primera franja habitual. Al entrar en cada franja, `prefetch(comandos,
+    momento)` recibe los comandos que el usuario suele decir a esas horas para dejar las
+    respuestas calculadas de antemano. Sin `min_days` días de historial todavía no hay
+    hábitos: el modelo se mantiene siempre caliente, como antes.
+    """
+
+    def __init__(self, warm_model, warm_browser=None, prefetch=None, lead=600, idle=600, threshold=0.25,
+                 slot_minutes=30, min_days=3, prefetch_limit=5, clock=time.time):
+        self.warm_model = warm_model
+        self.warm_browser = warm_browser
+        self.prefetch = prefetch
+        self.lead = lead
+        self.idle = idle
+        self.threshold = threshold
+        self.slot_minutes = slot_minutes
+        self.min_days = min_days
+        self.prefetch_limit = prefetch_limit
+        self.clock = clock
+
+        self.usage = None  # None hasta ver las preferencias por primera vez
+        self.last_interaction = None
+        self._seen_times = None
+        self._patterns = {}
+        self._frequent = {}
+        self._browser_warm = False
+        self._prefetched_slot = None
+        self.counts = Counter()  # acciones realizadas: modelo, navegador, precarga
+
+    def update(self, preferences):
+        """Reaprende los hábitos si hay interacciones nuevas"""
+        times = preferences['interaction_times']
+        marker = getattr(times, 'end_seq', len(times))
+        if marker != self._seen_times or self.usage is None:
+            self._seen_times = marker
+            self.usage = UsageModel(list(times), self.slot_minutes, self.min_days)
+        self._patterns = preferences['command_patterns']
+        self._frequent = preferences['frequent_commands']
+
+    def note_interaction(self, now=None):
+        self.last_interaction = self.clock() if now is None else now
+
+    @property
+    def trained(self):
+        return self.usage is not None and self.usage.trained
+
+    def expected(self, now):
+        """¿Es probable que el usuario hable ahora o dentro de `lead` segundos?"""
+        return (self.usage.probability(now) >= self.threshold
+                or self.usage.probability(now + self.lead) >= self.threshold)
+
+    def in_conversation(self, now):
+        return self.last_interaction is not None and now - self.last_interaction < self.idle
+
+    def should_warm(self, now):
+        if not self.trained:
+            return True
+        return self.in_conversation(now) or self.expected(now)
+
+    def likely_commands(self, now, limit=None):
+        """Lo que el usuario suele pedir en las horas de la franja que empieza; repetidos al menos dos veces"""
+        limit = self.prefetch_limit if limit is None else limit
+        counts = Counter()
+        for moment in (now, now + self.lead):
+            counts.update(self._patterns.get(f"{datetime.fromtimestamp(moment).hour:02d}", ()))
+        ranked = [command for command, count in counts.most_common() if count >= 2]
+        for command, count in sorted(self._frequent.items(), key=lambda item: item[1], reverse=True):
+            if len(ranked) >= limit or count < 2:
+                break
+            if command not in ranked:
+                ranked.append(command)
+        return ranked[:limit]
+
+    def tick(self, now=None):
+        """Hace lo que corresponde a este momento; devuelve las acciones realizadas"""
+        now = self.clock() if now is None else now
+        actions = []
+        if not self.should_warm(now):
+            return actions
+        self.warm_model()
+        actions.append("modelo")
+
+        expected = self.trained and self.expected(now)
+        # Sin historial el navegador se abre enseguida, como antes; con hábitos, al llegar una franja
+        if self.warm_browser and not self._browser_warm and (expected or (self.usage is not None and not self.trained)):
+            self._browser_warm = True
+            self.warm_browser()
+            actions.append("navegador")
+
+        if self.prefetch and expected:
+            upcoming = now + self.lead
+            slot = (datetime.fromtimestamp(upcoming).date(), self.usage.slot(datetime.fromtimestamp(upcoming)))
+            if slot != self._prefetched_slot:
+                self._prefetched_slot = slot
+                self.prefetch(self.likely_commands(now), upcoming)
+                actions.append("precarga")
+
+        self.counts.update(actions)
+        return actions
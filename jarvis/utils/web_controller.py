@@ -1,69 +1,88 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import time
+from urllib.parse import quote_plus
+
+from utils.browser_session import BrowserSession
+
+SEARCH_URL = "https://www.google.com/search?q="
+YOUTUBE_URL = "https://www.youtube.com"
+
 
 class WebController:
-    def __init__(self):
-        self.driver = None
-        self._init_driver()
+    def __init__(self, session=None, search_url=SEARCH_URL, youtube_url=YOUTUBE_URL, wait_timeout=10,
+                 popup_timeout=3):
+        self.search_url = search_url
+        self.youtube_url = youtube_url.rstrip("/")
+        self.wait_timeout = wait_timeout
+        self.popup_timeout = popup_timeout
+        # El navegador no se abre acá: arranca en segundo plano con warm_up o la primera acción
+        self.session = session or BrowserSession(warm_urls={
+            "buscar": search_url.split("/search")[0],
+            "youtube": self.youtube_url
+        })
 
-    def _init_driver(self):
-        options = webdriver.ChromeOptions()
-        options.add_argument("--start-maximized")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-notifications")
-        options.add_argument("--disable-popup-blocking")
-        options.add_argument("--mute-audio")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        try:
-            self.driver = webdriver.Chrome(options=options)
-            self.driver.set_page_load_timeout(15)
-        except Exception as e:
-            print(f"Error al iniciar navegador: {e}")
+    def warm_up(self):
+        """Inicia el navegador en segundo plano si todavía no arrancó"""
+        self.session.start()
 
     def play_youtube(self, query):
-        if not self.driver:
-            return False
+        url = f"{self.youtube_url}/results?search_query={quote_plus(query)}"
         try:
-            search_url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
-            self.driver.get(search_url)
-            wait = WebDriverWait(self.driver, 10)
-            first_video = wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "ytd-video-renderer:first-child"))
-            )
-            first_video.click()
-            self._dismiss_popups()
-            fullscreen_btn = wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, ".ytp-fullscreen-button"))
-            )
-            fullscreen_btn.click()
+            with self.session.tab("youtube") as driver:
+                driver.get(url)
+                self._dismiss_popups(driver, url)
+                wait = WebDriverWait(driver, self.wait_timeout, poll_frequency=0.05)
+                first_video = wait.until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, "ytd-video-renderer:first-child"))
+                )
+                first_video.click()
+                fullscreen_btn = wait.until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, ".ytp-fullscreen-button"))
+                )
+                fullscreen_btn.click()
             return True
         except Exception as e:
             print(f"Error al reproducir YouTube: {e}")
             return False
 
-    def search_web(self, query):
-        if not self.driver:
+    def play_video(self, url):
+        """Abre un video ya resuelto (sin pasar por la página de resultados) en pantalla completa"""
+        try:
+            with self.session.tab("youtube") as driver:
+                driver.get(url)
+                self._dismiss_popups(driver, url)
+                WebDriverWait(driver, self.wait_timeout, poll_frequency=0.05).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, ".ytp-fullscreen-button"))
+                ).click()
+            return True
+        except Exception as e:
+            print(f"Error al reproducir el video: {e}")
             return False
+
+    def search_web(self, query):
+        url = self.search_url + quote_plus(query)
         try:
-            self.driver.get(f"https://www.google.com/search?q={query.replace(' ', '+')}")
-            self._dismiss_popups()
+            with self.session.tab("buscar") as driver:
+                driver.get(url)
+                self._dismiss_popups(driver, url)
             return True
-        except:
+        except Exception as e:
+            print(f"Error al buscar: {e}")
             return False
 
-    def _dismiss_popups(self):
+    def _dismiss_popups(self, driver, url):
+        """El aviso de cookies solo aparece hasta aceptarlo: el perfil persistente lo recuerda"""
+        if not self.session.needs_consent(url):
+            return
         try:
-            WebDriverWait(self.driver, 3).until(
+            WebDriverWait(driver, self.popup_timeout, poll_frequency=0.05).until(
                 EC.element_to_be_clickable((By.XPATH, "//*[contains(text(), 'Aceptar') or contains(text(), 'Acepto')]"))
             ).click()
-        except:
-            pass
+        except Exception:
+            self.session.record_consent(url, accepted=False)
+            return
+        self.session.record_consent(url, accepted=True)
 
     def close(self):
-        if self.driver:
-            self.driver.quit()
\ No newline at end of file
+        self.session.close()
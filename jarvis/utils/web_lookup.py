@@ -0,0 +1,217 @@
+import codecs
+import re
+import threading
+import time
+from collections import OrderedDict
+from html.parser import HTMLParser
+from urllib.parse import parse_qs, quote_plus, urljoin, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SEARCH_URL = "https://html.duckduckgo.com/html/?q="
+YOUTUBE_URL = "https://www.youtube.com"
+HEADERS = {"User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                         "Chrome/124.0 Safari/537.36",
+           "Accept-Language": "es-ES,es;q=0.9"}
+# En la página de resultados de YouTube el primer video aparece en ytInitialData
+VIDEO_ID = re.compile(r'(?:"videoId":"|/watch\?v=)([\w-]{11})')
+META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.IGNORECASE)
+
+
+class SearchResult:
+    def __init__(self, title, url, snippet=""):
+        self.title = title
+        self.url = url
+        self.snippet = snippet
+
+    def __repr__(self):
+        return f"SearchResult({self.title!r}, {self.url!r})"
+
+
+class ResultsParser(HTMLParser):
+    """Extrae título, enlace y resumen de la página HTML de resultados, a medida que llega"""
+
+    def __init__(self, base_url, limit=3, link_class="result__a", snippet_class="result__snippet"):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.limit = limit
+        self.link_class = link_class
+        self.snippet_class = snippet_class
+        self.results = []
+        self._field = None  # "title" o "snippet" mientras se lee su texto
+        self._depth = 0
+        self._text = []
+
+    @property
+    def done(self):
+        return len(self.results) >= self.limit
+
+    def handle_starttag(self, tag, attrs):
+        if self._field:
+            self._depth += 1
+            return
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+        if self.link_class in classes and not self.done:
+            self.results.append(SearchResult("", self._target(attrs.get("href", ""))))
+            self._field, self._depth, self._text = "title", 1, []
+        elif self.snippet_class in classes and self.results and not self.results[-1].snippet:
+            self._field, self._depth, self._text = "snippet", 1, []
+
+    def handle_endtag(self, tag):
+        if not self._field:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            setattr(self.results[-1], self._field, " ".join("".join(self._text).split()))
+            self._field = None
+
+    def handle_data(self, data):
+        if self._field:
+            self._text.append(data)
+
+    def _target(self, href):
+        url = urljoin(self.base_url, href)
+        # DuckDuckGo envuelve el destino en una redirección: /l/?uddg=<url>
+        target = parse_qs(urlparse(url).query).get("uddg")
+        return target[0] if target else url
+
+
+def page_encoding(response, head):
+    """Codificación de la página: la del encabezado, la de <meta charset> o la que se deduce del inicio.
+
+    Sin charset en Content-Type, requests supone ISO-8859-1 para text/html y los acentos
+    de una página en UTF-8 saldrían rotos. Si el inicio no es UTF-8 válido se usa
+    windows-1252, lo que hacen los navegadores en español (adivinar con chardet confunde
+    textos cortos en español con otras codificaciones y cambia la ñ).
+    """
+    declared = response.encoding if "charset=" in response.headers.get("Content-Type", "").lower() else None
+    match = META_CHARSET.search(head[:4096])
+    for name in (declared, match and match.group(1).decode("ascii")):
+        if name:
+            try:
+                return codecs.lookup(name).name
+            except LookupError:
+                pass
+    try:
+        # final=False: el bloque puede cortar un carácter de varios bytes
+        codecs.getincrementaldecoder("utf-8")().decode(head)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "cp1252"
+
+
+class WebLookup:
+    """Búsquedas y videos resueltos por HTTP, sin abrir el navegador.
+
+    Usa una sesión de requests con pool de conexiones y lee el HTML por partes: deja de
+    descargar en cuanto tiene los resultados que necesita. Las respuestas se guardan en una
+    caché con vencimiento (`ttl`), así repetir una consulta no vuelve a salir a la red.
+    """
+
+    def __init__(self, search_url=SEARCH_URL, youtube_url=YOUTUBE_URL, timeout=(3, 5), ttl=600,
+                 max_entries=256, max_bytes=2 * 1024 * 1024, chunk_size=16 * 1024):
+        self.search_url = search_url
+        self.youtube_url = youtube_url.rstrip("/")
+        self.timeout = timeout
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._cache = OrderedDict()  # (tipo, consulta) -> (vencimiento, valor)
+        self._lock = threading.Lock()
+        self.fetches = 0
+        self.cache_hits = 0
+        self.bytes_read = 0
+
+    def search(self, query, limit=3):
+        """Primeros resultados (título, enlace y resumen) de la búsqueda; lista vacía si falla"""
+        url = self.search_url + quote_plus(query)
+        return self._cached(("buscar", query.lower(), limit), lambda: self._fetch_results(url, limit), [])
+
+    def resolve_video(self, query):
+        """URL del primer video de YouTube para la consulta, o None"""
+        url = f"{self.youtube_url}/results?search_query={quote_plus(query)}"
+        video_id = self._cached(("video", query.lower()), lambda: self._fetch_video_id(url), None)
+        return f"{self.youtube_url}/watch?v={video_id}" if video_id else None
+
+    def summarize(self, results, snippet_chars=200):
+        """Resultados en texto breve para pasarle al modelo"""
+        return "\n".join(f"- {result.title}: {result.snippet[:snippet_chars]}" for result in results)
+
+    def _cached(self, key, fetch, empty):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry and entry[0] > now:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return entry[1]
+        try:
+            value = fetch()
+        except (requests.RequestException, ValueError) as e:
+            print(f"Error al consultar la web: {e}")
+            return empty
+        if value:
+            # Lo vacío no se guarda: puede ser una falla pasajera
+            with self._lock:
+                self._cache[key] = (now + self.ttl, value)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return value
+
+    def _chunks(self, url):
+        """Texto de la página por partes; cerrar el generador corta la descarga"""
+        self.fetches += 1
+        with self.session.get(url, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            decoder = None
+            received = 0
+            for data in response.iter_content(self.chunk_size):
+                if decoder is None:
+                    decoder = codecs.getincrementaldecoder(page_encoding(response, data))(errors="replace")
+                received += len(data)
+                self.bytes_read += len(data)
+                yield decoder.decode(data)
+                if received >= self.max_bytes:
+                    return
+
+    def _fetch_results(self, url, limit):
+        parser = ResultsParser(url, limit)
+        chunks = self._chunks(url)
+        try:
+            for chunk in chunks:
+                parser.feed(chunk)
+                # El último resultado se da por completo recién cuando aparece su resumen
+                if parser.done and parser.results[-1].snippet:
+                    break
+        finally:
+            chunks.close()
+        return [result for result in parser.results if result.title]
+
+    def _fetch_video_id(self, url):
+        tail = ""
+        chunks = self._chunks(url)
+        try:
+            for chunk in chunks:
+                text = tail + chunk
+                match = VIDEO_ID.search(text)
+                if match:
+                    return match.group(1)
+                # Una coincidencia puede quedar partida entre dos fragmentos
+                tail = text[-32:]
+        finally:
+            chunks.close()
+        return None
+
+    def close(self):
+        self.session.close()